@@ -0,0 +1 @@
+"""Synthetic report corpus and performance benchmarks."""
@@ -0,0 +1,407 @@
+"""
+Synthetic Stock and Free/Buy reports (and a matching master workbook) for benchmarks.
+
+The reports reproduce what the extractor has to cope with in real exports:
+doubled glyphs in headers and expiry dates, "المجموع" TOTAL rows after each
+national code, national codes continuing onto the next page without a new
+header, expired and expiring batches, zero balances and orphan items (item
+rows before the first national code header). Everything is driven by a
+seeded random generator, so a given type, page count and seed always
+produce the same report.
+
+Requires reportlab (benchmarks/requirements.txt). Arabic text needs a font
+with Arabic glyphs; without one, TOTAL rows are labelled "TOTAL" (the
+extractor still recognizes them by their empty item code cell).
+
+Usage:
+    From project root:
+        python -m benchmarks.generate_corpus --type Stock --pages 100 [--seed 1] [--out DIR] [--font PATH]
+        python -m benchmarks.generate_corpus --type Free --pages 10 --master master.xlsx
+"""
+
+import argparse
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Ensure the project root is in the path
+benchmarks_dir = Path(__file__).parent
+if str(benchmarks_dir.parent) not in sys.path:
+    sys.path.insert(0, str(benchmarks_dir.parent))
+
+from openpyxl import Workbook
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Table, TableStyle
+
+from src.config.extraction_config import ExtractionConfig, ExtractionType
+from src.config.settings import AppSettings
+
+# Expiry dates are generated around this date; benchmarks classify them against
+# it too, so results do not drift as the calendar moves on
+REFERENCE_DATE = date(2026, 1, 1)
+EXPIRY_HORIZON_MONTHS = 3
+
+TOTAL_LABEL = "المجموع"
+ROWS_PER_PAGE = 28
+FONT_NAME = "CorpusFont"
+FONT_SIZE = 7
+
+# Fonts with Arabic glyphs, tried in order when --font is not given
+FONT_CANDIDATES = (
+    r"C:\Windows\Fonts\arial.ttf",
+    r"C:\Windows\Fonts\tahoma.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/noto/NotoSansArabic-Regular.ttf",
+    "/usr/share/fonts/noto/NotoSansArabic-Regular.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+)
+
+# Report titles; Free and Buy share a layout and are told apart by their header
+TITLES = {
+    ExtractionType.STOCK: "Stock Balance Report",
+    ExtractionType.FREE: "Free Samples Report",
+    ExtractionType.BUY: "Purchase Report",
+}
+
+# Column widths (points) of each layout; wide enough that no text crosses a cell border
+STOCK_COLUMN_WIDTHS = [82, 38, 38, 38, 38, 38, 38, 50, 210, 95, 50]
+FREE_BUY_COLUMN_WIDTHS = [82, 45, 50, 45, 210, 95, 50, 45]
+
+_NAME_STEMS = (
+    "Paracetamol", "Amoxicillin", "Ibuprofen", "Omeprazole", "Metformin", "Atorvastatin",
+    "Cefuroxime", "Diclofenac", "Salbutamol", "Loratadine", "Ciprofloxacin", "Azithromycin",
+)
+_NAME_FORMS = ("Tab", "Cap", "Syrup", "Amp", "Susp", "Cream")
+_NAME_STRENGTHS = ("5mg", "10mg", "20mg", "250mg", "500mg", "1g")
+
+
+@dataclass
+class CorpusSpec:
+    """Parameters of one synthetic report."""
+    extraction_type: ExtractionType
+    pages: int = 1
+    seed: int = 1
+    rows_per_page: int = ROWS_PER_PAGE
+    expired_ratio: float = 0.10  # Share of item rows whose batch has expired
+    expiring_ratio: float = 0.05  # Share expiring within EXPIRY_HORIZON_MONTHS
+    zero_ratio: float = 0.05  # Share of item rows with a zero balance
+    orphans: int = 2  # Item rows before the first national code header
+
+    @property
+    def file_name(self) -> str:
+        """File name identifying the report's type, size and seed."""
+        return f"{self.extraction_type.value.lower()}_{self.pages}p_seed{self.seed}.pdf"
+
+
+@dataclass
+class CorpusReport:
+    """What was written to a synthetic report."""
+    path: str
+    spec: CorpusSpec
+    national_codes: List[str] = field(default_factory=list)  # In report order
+    balances: Dict[str, float] = field(default_factory=dict)  # Sum of non-expired batches per code
+    items: int = 0  # Item rows under a national code
+    expired: int = 0
+    expiring: int = 0
+    zero_balances: int = 0
+    orphans: int = 0
+    continuations: int = 0  # Pages starting in the middle of a national code
+
+
+def doubled(text: str) -> str:
+    """Render text the way the reporting system does (every glyph drawn twice)."""
+    return "".join(char * 2 for char in text)
+
+
+def find_arabic_font(path: Optional[str] = None) -> Optional[str]:
+    """
+    Find a TrueType font that can render Arabic text.
+
+    Args:
+        path: Font to use; when given, it is returned if it has Arabic glyphs
+
+    Returns:
+        Path of the font, or None if no candidate has Arabic glyphs
+    """
+    for candidate in ([path] if path else FONT_CANDIDATES):
+        if not os.path.isfile(candidate):
+            continue
+        try:
+            if ord(TOTAL_LABEL[0]) in TTFont(FONT_NAME, candidate).face.charToGlyph:
+                return candidate
+        except Exception:
+            # Unreadable or unsupported font file (e.g. a .ttc collection)
+            continue
+    return None
+
+
+def _national_codes(rng: random.Random, count: int) -> List[str]:
+    """Distinct national codes (XX-XXX-XXX)."""
+    codes = set()
+    while len(codes) < count:
+        codes.add(f"{rng.randint(1, 99):02d}-{rng.choice('ABCDEFGHKMZ')}{rng.randint(0, 99):02d}-{rng.randint(0, 999):03d}")
+    return rng.sample(sorted(codes), count)
+
+
+def _name(rng: random.Random) -> str:
+    """Product name such as "Ibuprofen 500mg Tab"."""
+    return f"{rng.choice(_NAME_STEMS)} {rng.choice(_NAME_STRENGTHS)} {rng.choice(_NAME_FORMS)}"
+
+
+def _expiry(rng: random.Random, spec: CorpusSpec) -> Tuple[str, str]:
+    """Expiry date (DD/MM/YYYY) of a batch and its status: "expired", "expiring" or "valid"."""
+    draw = rng.random()
+    if draw < spec.expired_ratio:
+        status, months = "expired", -rng.randint(1, 36)
+    elif draw < spec.expired_ratio + spec.expiring_ratio:
+        status, months = "expiring", rng.randint(0, EXPIRY_HORIZON_MONTHS - 1)
+    else:
+        status, months = "valid", rng.randint(EXPIRY_HORIZON_MONTHS, 60)
+    month_index = REFERENCE_DATE.year * 12 + REFERENCE_DATE.month - 1 + months
+    return f"{rng.randint(1, 28):02d}/{month_index % 12 + 1:02d}/{month_index // 12}", status
+
+
+def _filler(rng: random.Random) -> str:
+    """Value of a column the extractor does not read (never looks like an item code)."""
+    return f"{rng.uniform(0, 999):.2f}"
+
+
+class _RowBuilder:
+    """Table rows of one layout."""
+
+    def __init__(self, extraction_type: ExtractionType, rng: random.Random, total_label: str):
+        self.stock = extraction_type == ExtractionType.STOCK
+        self.width = len(STOCK_COLUMN_WIDTHS if self.stock else FREE_BUY_COLUMN_WIDTHS)
+        self.balance_column = ExtractionConfig.get_pdf_column(extraction_type)
+        self.rng = rng
+        self.total_label = total_label
+
+    def header(self, national_code: str, name: str) -> List[str]:
+        """National code header row (doubled name and code)."""
+        row = [""] * self.width
+        if self.stock:
+            row[8], row[9] = doubled(name), doubled(national_code)
+        else:
+            row[4], row[5] = doubled(name), doubled(national_code)
+        return row
+
+    def item(self, item_code: str, name: str, balance: int, expiry: str) -> List[str]:
+        """Item (batch) row: doubled expiry, balance, plain name and item code."""
+        rng = self.rng
+        if self.stock:
+            row = [doubled(expiry)] + [_filler(rng) for _ in range(6)] + [str(balance), name, "", item_code]
+        else:
+            row = [doubled(expiry), _filler(rng), str(balance), _filler(rng), name, "", item_code, _filler(rng)]
+        return row
+
+    def total(self, balance: int) -> List[str]:
+        """TOTAL row closing a national code: label and sum, no item code."""
+        row = [""] * self.width
+        row[self.balance_column] = str(balance)
+        row[8 if self.stock else 4] = self.total_label
+        return row
+
+
+def build_rows(spec: CorpusSpec, total_label: str = TOTAL_LABEL) -> Tuple[List[List[str]], CorpusReport]:
+    """
+    Generate the table rows of a report.
+
+    Rows are produced as one stream and cut into pages afterwards, so
+    national codes straddle page boundaries wherever the cut falls.
+
+    Args:
+        spec: Report parameters
+        total_label: Label of TOTAL rows
+
+    Returns:
+        (rows, report) - the rows in document order and what they contain
+    """
+    rng = random.Random(f"{spec.extraction_type.value}:{spec.seed}")
+    builder = _RowBuilder(spec.extraction_type, rng, total_label)
+    report = CorpusReport("", spec)
+    target = spec.pages * spec.rows_per_page
+    rows: List[List[str]] = []
+    under_code: List[bool] = []  # Whether each row is an item row under a national code
+    item_codes = iter(range(10000, 10000000))
+
+    def add_item(name: str, national_code: Optional[str] = None) -> int:
+        balance = 0 if rng.random() < spec.zero_ratio else rng.randint(1, 5000)
+        expiry, status = _expiry(rng, spec)
+        rows.append(builder.item(str(next(item_codes)), name, balance, expiry))
+        under_code.append(national_code is not None)
+        if national_code is not None:
+            # Orphans are skipped before their expiry or balance is read
+            if status != "expired":
+                report.balances[national_code] = report.balances.get(national_code, 0) + balance
+            report.items += 1
+            report.zero_balances += balance == 0 and status != "expired"
+            report.expired += status == "expired"
+            report.expiring += status == "expiring"
+        return balance
+
+    for _ in range(min(spec.orphans, target)):
+        add_item(_name(rng))
+        report.orphans += 1
+
+    # Enough codes for the target even if every group were a single row
+    codes = iter(_national_codes(rng, target))
+    while len(rows) < target:
+        national_code, name = next(codes), _name(rng)
+        report.national_codes.append(national_code)
+        rows.append(builder.header(national_code, name))
+        under_code.append(False)
+
+        total = 0
+        for _ in range(rng.choices((1, 2, 3, 4, 6), weights=(35, 30, 15, 12, 8))[0]):
+            if len(rows) >= target:
+                break
+            total += add_item(name, national_code)
+        if len(rows) < target:
+            rows.append(builder.total(total))
+            under_code.append(False)
+
+    report.continuations = sum(under_code[start] for start in range(spec.rows_per_page, len(rows), spec.rows_per_page))
+    return rows, report
+
+
+def write_report(spec: CorpusSpec, out_dir: str, font: Optional[str] = None) -> CorpusReport:
+    """
+    Write a synthetic report PDF.
+
+    Args:
+        spec: Report parameters
+        out_dir: Directory for the PDF (created if missing)
+        font: TrueType font with Arabic glyphs (searched for if not given)
+
+    Returns:
+        CorpusReport describing the written file
+    """
+    font_path = find_arabic_font(font)
+    if font_path:
+        pdfmetrics.registerFont(TTFont(FONT_NAME, font_path))
+        font_name, total_label = FONT_NAME, TOTAL_LABEL
+    else:
+        print("No font with Arabic glyphs found (use --font); TOTAL rows are labelled 'TOTAL'", file=sys.stderr)
+        font_name, total_label = "Helvetica", "TOTAL"
+
+    rows, report = build_rows(spec, total_label)
+    os.makedirs(out_dir, exist_ok=True)
+    report.path = os.path.join(out_dir, spec.file_name)
+
+    stock = spec.extraction_type == ExtractionType.STOCK
+    style = TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("FONTNAME", (0, 0), (-1, -1), font_name),
+        ("FONTSIZE", (0, 0), (-1, -1), FONT_SIZE),
+    ])
+    title_style = getSampleStyleSheet()["Title"]
+    story = [Paragraph(f"{TITLES[spec.extraction_type]} {REFERENCE_DATE.year}", title_style)]
+    for start in range(0, len(rows), spec.rows_per_page):
+        if start:
+            story.append(PageBreak())
+        table = Table(rows[start:start + spec.rows_per_page],
+                      colWidths=STOCK_COLUMN_WIDTHS if stock else FREE_BUY_COLUMN_WIDTHS)
+        table.setStyle(style)
+        story.append(table)
+
+    doc = SimpleDocTemplate(
+        report.path, pagesize=landscape(A4),
+        leftMargin=20, rightMargin=20, topMargin=20, bottomMargin=20,
+        title=TITLES[spec.extraction_type]
+    )
+    doc.build(story)
+    return report
+
+
+def write_master(path: str, national_codes: Sequence[str], rows: int = 0, seed: int = 1) -> int:
+    """
+    Write a master workbook for a set of reported national codes.
+
+    About 5% of the reported codes are left out (unmatched in the run) and
+    filler codes pad the sheet to the requested size. Target columns hold a
+    mix of empty cells and existing balances, so a save has both new and
+    changed cells.
+
+    Args:
+        path: Workbook path
+        national_codes: Codes found in the reports
+        rows: Minimum number of data rows
+        seed: Random seed
+
+    Returns:
+        Number of data rows written
+    """
+    rng = random.Random(f"master:{seed}")
+    settings = AppSettings()
+    codes = [code for code in national_codes if rng.random() >= 0.05]
+    known = set(national_codes)
+    for code in _national_codes(rng, max(rows - len(codes), 0) + len(known)):
+        if len(codes) >= rows:
+            break
+        if code not in known:
+            codes.append(code)
+    rng.shuffle(codes)
+
+    target_columns = {mapping.excel_column for mapping in ExtractionConfig.MAPPINGS.values()}
+    width = max(target_columns) + 1
+    header = ["Code", "Name"] + [""] * (width - 2)
+    for extraction_type, mapping in ExtractionConfig.MAPPINGS.items():
+        header[mapping.excel_column] = extraction_type.value
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    for _ in range(settings.EXCEL_START_ROW - 1):
+        ws.append(header)
+    for code in codes:
+        row = [None] * width
+        row[settings.CODE_COLUMN], row[1] = code, _name(rng)
+        for column in target_columns:
+            if rng.random() < 0.5:
+                row[column] = rng.randint(0, 5000)
+        ws.append(row)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    wb.save(path)
+    return len(codes)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and write a synthetic report."""
+    parser = argparse.ArgumentParser(description="Generate a synthetic Stock, Free or Buy report PDF.")
+    parser.add_argument("--type", default=ExtractionType.STOCK.value,
+                        choices=[extraction_type.value for extraction_type in ExtractionType])
+    parser.add_argument("--pages", type=int, default=10, help="Number of pages (1-1000, default: 10)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=os.path.join("benchmarks", "corpus"), help="Output directory")
+    parser.add_argument("--font", help="TrueType font with Arabic glyphs for the TOTAL labels")
+    parser.add_argument("--orphans", type=int, default=2, help="Item rows before the first national code")
+    parser.add_argument("--master", help="Also write a master workbook for the report's codes")
+    parser.add_argument("--master-rows", type=int, default=0, help="Minimum data rows of the master workbook")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.pages <= 1000:
+        parser.error("--pages must be between 1 and 1000")
+
+    spec = CorpusSpec(ExtractionType(args.type), pages=args.pages, seed=args.seed, orphans=args.orphans)
+    report = write_report(spec, args.out, args.font)
+    print(
+        f"{report.path}: {spec.pages} pages, {len(report.national_codes)} national codes, "
+        f"{report.items} items ({report.expired} expired, {report.expiring} expiring, "
+        f"{report.zero_balances} zero), {report.orphans} orphans, {report.continuations} page continuations"
+    )
+    if args.master:
+        rows = write_master(args.master, report.national_codes, args.master_rows, args.seed)
+        print(f"{args.master}: {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
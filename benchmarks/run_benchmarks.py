@@ -0,0 +1,390 @@
+"""
+Throughput and memory benchmarks of PDFExtractor, ExcelHandler, DataValidator
+and ExtractionData.add_balance on a code with many batches.
+
+Reports are generated by benchmarks.generate_corpus (and kept in the corpus
+directory, so later runs reuse them). Each benchmark is timed over several
+runs, keeping the best, then run once more under tracemalloc for its peak
+memory (tracing slows code down, so it is kept out of the timed runs).
+Extraction results are checked against what the generator wrote, so an
+optimization that changes the output shows up as a failed check rather
+than a speedup.
+
+Save the JSON report of a run and pass it as --baseline to a later run to
+see the change of every benchmark.
+
+Usage:
+    From project root:
+        python -m benchmarks.run_benchmarks [--pages 1 10 100] [--types Stock Free Buy] [--repeat 3]
+        python -m benchmarks.run_benchmarks --json before.json
+        python -m benchmarks.run_benchmarks --baseline before.json --json after.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Ensure the project root is in the path
+benchmarks_dir = Path(__file__).parent
+if str(benchmarks_dir.parent) not in sys.path:
+    sys.path.insert(0, str(benchmarks_dir.parent))
+
+import openpyxl
+import pdfplumber
+
+from benchmarks.generate_corpus import (
+    EXPIRY_HORIZON_MONTHS,
+    REFERENCE_DATE,
+    CorpusReport,
+    CorpusSpec,
+    build_rows,
+    write_master,
+    write_report,
+)
+from src.config.extraction_config import ExtractionType
+from src.models.extraction_data import ExtractionData
+from src.models.save_preview import SavePreview
+from src.services.data_validator import DataValidator, IncrementalValidator
+from src.services.excel_handler import ExcelHandler
+from src.services.expiry_policy import ExpiryPolicy
+from src.services.pdf_extractor import PDFExtractor
+from src.utils.run_metrics import Counter, RunMetrics
+
+# Largest difference between an extracted and a generated balance that still passes
+BALANCE_TOLERANCE = 1e-6
+
+
+class BenchmarkResult(NamedTuple):
+    """Measurements of one benchmark."""
+    name: str
+    seconds: float  # Best wall time of the timed runs
+    pages: int
+    rows: int  # Table rows, worksheet rows, matched codes or written cells
+    peak_bytes: int  # Peak traced memory of one run
+    check: str = "ok"  # "ok" or what differed from the expected output
+
+    @property
+    def pages_per_second(self) -> float:
+        """Pages processed per second (0 if the benchmark has no pages)."""
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows processed per second."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form of the result."""
+        return {
+            "name": self.name,
+            "seconds": round(self.seconds, 6),
+            "pages": self.pages,
+            "rows": self.rows,
+            "pages_per_second": round(self.pages_per_second, 2),
+            "rows_per_second": round(self.rows_per_second, 2),
+            "peak_bytes": self.peak_bytes,
+            "check": self.check,
+        }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Tuple[float, int, Any]:
+    """
+    Time a function and measure its peak memory.
+
+    Args:
+        func: Function to benchmark
+        repeat: Number of timed runs
+
+    Returns:
+        (best seconds, peak traced bytes, result of the last timed run)
+    """
+    best = float("inf")
+    result = None
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def load_report(spec: CorpusSpec, corpus_dir: str, font: Optional[str] = None) -> CorpusReport:
+    """
+    Generate a report, or describe it if it is already in the corpus.
+
+    Args:
+        spec: Report parameters
+        corpus_dir: Corpus directory
+        font: Font for the TOTAL labels of new reports
+
+    Returns:
+        CorpusReport of the file
+    """
+    path = os.path.join(corpus_dir, spec.file_name)
+    if not os.path.isfile(path):
+        return write_report(spec, corpus_dir, font)
+    # Generation is deterministic, so the rows tell what the file contains
+    _, report = build_rows(spec)
+    report.path = path
+    return report
+
+
+def _check_extraction(data: ExtractionData, metrics: RunMetrics, report: CorpusReport) -> str:
+    """Compare extraction results with what the generator wrote."""
+    expected = {
+        "items": (metrics.counters.get(Counter.ITEMS, 0), report.items),
+        "expired": (len(data.expired_items), report.expired),
+        "expiring": (len(data.expiring_soon_items), report.expiring),
+        "zero": (len(data.zero_balance_items), report.zero_balances),
+        "orphans": (len(data.orphan_items), report.orphans),
+    }
+    differences = [f"{name} {found}/{wanted}" for name, (found, wanted) in expected.items() if found != wanted]
+
+    # Every code's balance must be the sum of its non-expired batches
+    wrong = [
+        code for code in data.balances.keys() | report.balances.keys()
+        if code not in data.balances or code not in report.balances
+        or not math.isclose(data.balances[code], report.balances[code], abs_tol=BALANCE_TOLERANCE)
+    ]
+    if wrong:
+        differences.append(f"balances {len(wrong)} codes differ (e.g. {min(wrong)})")
+    return ", ".join(differences) or "ok"
+
+
+def bench_extraction(report: CorpusReport, policy: ExpiryPolicy, repeat: int) -> Tuple[BenchmarkResult, ExtractionData]:
+    """
+    Benchmark PDFExtractor on one report.
+
+    Args:
+        report: Report to extract
+        policy: Expiry policy (fixed reference date)
+        repeat: Number of timed runs
+
+    Returns:
+        (result, extraction data of the report)
+    """
+    spec = report.spec
+    metrics = RunMetrics()
+
+    def extract() -> ExtractionData:
+        nonlocal metrics
+        metrics = RunMetrics()
+        return PDFExtractor(spec.extraction_type, policy, metrics=metrics).extract_from_files([report.path])
+
+    seconds, peak, data = measure(extract, repeat)
+    result = BenchmarkResult(
+        f"extract {spec.extraction_type.value} {spec.pages}p",
+        seconds,
+        metrics.counters.get(Counter.PAGES, 0),
+        metrics.counters.get(Counter.ROWS, 0),
+        peak,
+        _check_extraction(data, metrics, report),
+    )
+    return result, data
+
+
+def bench_validation(name: str, data: ExtractionData, excel_codes: Set[str], repeat: int) -> BenchmarkResult:
+    """
+    Benchmark DataValidator matching of one extraction.
+
+    Args:
+        name: Benchmark name
+        data: Extraction data
+        excel_codes: Codes of the master workbook
+        repeat: Number of timed runs
+
+    Returns:
+        BenchmarkResult (rows are extracted national codes)
+    """
+    seconds, peak, result = measure(lambda: DataValidator.validate_and_match(data, excel_codes), repeat)
+    check = "ok" if len(result.matched_codes) + len(result.unmatched_by_code) else "nothing matched"
+    return BenchmarkResult(name, seconds, 0, len(data.balances), peak, check)
+
+
+def bench_add_balance(batches: int, repeat: int) -> BenchmarkResult:
+    """
+    Benchmark ExtractionData.add_balance for one national code with many batches.
+
+    Every call records a new item of the same code, so the cost of keeping
+    the code's item set de-duplicated shows up as the per-call time.
+
+    Args:
+        batches: Number of batches (distinct item codes) of the code
+        repeat: Number of timed runs
+
+    Returns:
+        BenchmarkResult (rows are add_balance calls)
+    """
+    national_code = "01-A00-001"
+    item_codes = [str(10000 + batch) for batch in range(batches)]
+
+    def add_all() -> ExtractionData:
+        data = ExtractionData()
+        for item_code in item_codes:
+            data.add_balance(national_code, 1.0, item_code, "Paracetamol 500mg Tab", "many_batches.pdf",
+                             extraction_type=ExtractionType.STOCK)
+        return data
+
+    seconds, peak, data = measure(add_all, repeat)
+    items = len(data.all_items.get(national_code, ()))
+    check = "ok" if items == batches and data.balances.get(national_code) == batches else f"items {items}/{batches}"
+    return BenchmarkResult(f"add_balance {batches}b", seconds, 0, batches, peak, check)
+
+
+def bench_excel(master: str, master_rows: int, extractions: List[ExtractionData], repeat: int) -> List[BenchmarkResult]:
+    """
+    Benchmark ExcelHandler reading the master index and saving balances.
+
+    Args:
+        master: Master workbook path
+        master_rows: Data rows of the workbook
+        extractions: Extraction data whose balances are saved
+        repeat: Number of timed runs
+
+    Returns:
+        Results of read_index and save_changes
+    """
+    handler = ExcelHandler(master)
+    seconds, peak, index = measure(handler.read_index, repeat)
+    check = "ok" if index.code_count == master_rows else f"codes {index.code_count}/{master_rows}"
+    results = [BenchmarkResult(f"excel read_index {master_rows}r", seconds, 0, master_rows, peak, check)]
+
+    balances_by_type: Dict[ExtractionType, Dict[str, float]] = {}
+    for data in extractions:
+        for extraction_type, balances in IncrementalValidator(data, index.codes).balances_by_type(
+                ExtractionType.STOCK).items():
+            balances_by_type.setdefault(extraction_type, {}).update(balances)
+    preview = SavePreview.build(index, balances_by_type)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        # save_changes writes a timestamped file; keep it out of the project
+        handler.settings.OUTPUT_FILE_PREFIX = os.path.join(work_dir, "benchmark")
+        seconds, peak, output_file = measure(lambda: handler.save_changes(preview), repeat)
+        check = "ok" if output_file or not preview.has_changes else "nothing written"
+        writes = len(preview.writes)
+        results.append(BenchmarkResult(f"excel save_changes {writes}c", seconds, 0, writes, peak, check))
+    return results
+
+
+def _format_table(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Results as an aligned text table.
+
+    With a baseline, each benchmark of the same name (and so the same
+    workload) gets its speedup: baseline seconds / current seconds.
+    """
+    header = f"{'benchmark':<26}{'pages':>7}{'rows':>8}{'seconds':>10}{'pages/s':>10}{'rows/s':>11}{'peak MiB':>10}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        line = (
+            f"{result.name:<26}{result.pages:>7}{result.rows:>8}{result.seconds:>10.3f}"
+            f"{result.pages_per_second:>10.1f}{result.rows_per_second:>11.1f}"
+            f"{result.peak_bytes / 1024 / 1024:>10.1f}"
+        )
+        if baseline:
+            previous = baseline.get(result.name)
+            line += f"{previous['seconds'] / result.seconds:>8.2f}x" if previous and result.seconds else f"{'-':>9}"
+        if result.check != "ok":
+            line += f"  CHECK FAILED: {result.check}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments, run the benchmarks and print (or save) the results."""
+    parser = argparse.ArgumentParser(description="Benchmark PDF extraction, Excel handling and validation.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100], help="Report sizes (default: 1 10 100)")
+    parser.add_argument("--types", nargs="+", default=[extraction_type.value for extraction_type in ExtractionType],
+                        choices=[extraction_type.value for extraction_type in ExtractionType])
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best is kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1000, 16000],
+                        help="Batches of the single code in the add_balance benchmark (default: 1000 16000)")
+    parser.add_argument("--master-rows", type=int, default=5000, help="Data rows of the master workbook (default: 5000)")
+    parser.add_argument("--corpus", default=os.path.join("benchmarks", "corpus"), help="Directory of generated reports")
+    parser.add_argument("--font", help="TrueType font with Arabic glyphs for new reports")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--verbose", action="store_true", help="Show extraction log output")
+    args = parser.parse_args(argv)
+
+    if any(not 1 <= pages <= 1000 for pages in args.pages):
+        parser.error("--pages must be between 1 and 1000")
+
+    # Orphan items are logged as warnings; keep them out of the measurements
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR, format="%(levelname)s: %(message)s")
+
+    baseline: Dict[str, Dict[str, Any]] = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {result["name"]: result for result in json.load(f)["results"]}
+
+    policy = ExpiryPolicy(REFERENCE_DATE, EXPIRY_HORIZON_MONTHS)
+    results: List[BenchmarkResult] = []
+    largest: List[Tuple[CorpusReport, ExtractionData]] = []
+
+    for type_name in args.types:
+        extraction_type = ExtractionType(type_name)
+        for pages in sorted(set(args.pages)):
+            report = load_report(CorpusSpec(extraction_type, pages=pages, seed=args.seed), args.corpus, args.font)
+            result, data = bench_extraction(report, policy, args.repeat)
+            results.append(result)
+            print(f"{result.name}: {result.seconds:.3f}s", file=sys.stderr)
+        largest.append((report, data))
+
+    national_codes = [code for report, _ in largest for code in report.national_codes]
+    master = os.path.join(args.corpus, f"master_{args.master_rows}_seed{args.seed}.xlsx")
+    master_rows = write_master(master, national_codes, args.master_rows, args.seed)
+    excel_codes = ExcelHandler(master).read_codes()
+
+    for report, data in largest:
+        spec = report.spec
+        results.append(bench_validation(
+            f"validate {spec.extraction_type.value} {spec.pages}p", data, excel_codes, args.repeat
+        ))
+    results.extend(bench_excel(master, master_rows, [data for _, data in largest], args.repeat))
+    for batches in sorted(set(args.batches)):
+        results.append(bench_add_balance(batches, args.repeat))
+
+    print(_format_table(results, baseline))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "created": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "pdfplumber": pdfplumber.__version__,
+                "openpyxl": openpyxl.__version__,
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "results": [result.to_dict() for result in results],
+            }, f, indent=2)
+        print(f"Results written to {args.json}", file=sys.stderr)
+
+    return 1 if any(result.check != "ok" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
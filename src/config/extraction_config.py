@@ -11,6 +11,10 @@ class ExtractionType(Enum):
     BUY = "Buy"
 
 
+# Type selector value meaning "detect the type of each PDF"
+AUTO_DETECT = "Auto"
+
+
 @dataclass
 class ColumnMapping:
     """Column indices for PDF and Excel operations."""
@@ -37,6 +41,13 @@ class ExtractionConfig:
         ),
     }
 
+    # Header words telling Free from Buy reports (they share one table layout).
+    # Matched case-insensitively against the text above the first table.
+    HEADER_KEYWORDS = {
+        ExtractionType.FREE: ("free", "مجاني", "مجانى"),
+        ExtractionType.BUY: ("buy", "purchase", "شراء", "مشتريات"),
+    }
+
     @classmethod
     def get_pdf_column(cls, extraction_type: ExtractionType) -> int:
         """
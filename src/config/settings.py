@@ -2,7 +2,10 @@
 
 import logging
 from dataclasses import dataclass
-from typing import Tuple
+from logging.handlers import RotatingFileHandler
+from typing import List, Tuple
+
+from src.utils.log_queue import start_queue_logging
 
 
 @dataclass
@@ -10,17 +13,35 @@ class LoggingConfig:
     """Logging configuration."""
     filename: str = 'extraction_log.txt'
     level: int = logging.INFO  # Changed from WARNING to show cross-page continuation messages
-    filemode: str = 'w'  # Overwrite log file each time
+    max_bytes: int = 5 * 1024 * 1024  # Rotate the log file at this size
+    backup_count: int = 3  # Rotated files kept (extraction_log.txt.1, ...)
     format: str = '%(asctime)s - %(levelname)s - %(message)s'
+    console: bool = False  # Also print messages (headless entry points)
+    # Libraries whose debug output (pdfminer logs every parser token) stays off in verbose mode
+    quiet_loggers: Tuple[str, ...] = ('pdfminer', 'pdfplumber', 'PIL')
 
     def configure(self) -> None:
-        """Apply logging configuration."""
-        logging.basicConfig(
-            filename=self.filename,
-            level=self.level,
-            filemode=self.filemode,
-            format=self.format
+        """
+        Apply logging configuration.
+
+        Records are queued by the logging thread and formatted and written
+        by a background listener, so verbose logging does not slow down
+        extraction. Third-party parsers are kept at WARNING.
+        """
+        file_handler = RotatingFileHandler(
+            self.filename,
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding='utf-8',
+            delay=True  # Not opened if logging is already configured
         )
+        file_handler.setFormatter(logging.Formatter(self.format))
+        handlers: List[logging.Handler] = [file_handler]
+        if self.console:
+            handlers.append(logging.StreamHandler())
+        start_queue_logging(handlers, self.level)
+        for name in self.quiet_loggers:
+            logging.getLogger(name).setLevel(max(self.level, logging.WARNING))
 
 
 @dataclass
@@ -45,3 +66,38 @@ class AppSettings:
 
     # Tree View Settings
     TREE_HEIGHT: int = 15
+
+    # Cache Settings
+    CACHE_DIR: str = ".magic_cache"  # Persistent caches (master index, ...)
+    SNAPSHOT_KEEP_RUNS: int = 5  # Saved runs kept for reopening and comparison
+
+    # History Settings
+    HISTORY_FILE: str = "balance_history.db"  # SQLite history of every run
+    HISTORY_RUNS: int = 30  # Runs shown in a code's history
+
+    # Delta Report Settings
+    DELTA_SWING_PERCENT: float = 50.0  # Relative change flagged as a large swing
+    DELTA_SWING_MIN_CHANGE: float = 10.0  # Smaller absolute changes are never flagged
+
+    # Source Viewer Settings
+    SOURCE_RENDER_RESOLUTION: int = 110  # DPI used to render PDF pages
+    SOURCE_PAGE_CACHE_SIZE: int = 8  # Rendered pages kept in memory (LRU)
+
+    # Expiry Settings
+    EXPIRY_HORIZON_MONTHS: int = 3  # Items expiring within this many months are "expiring soon"
+
+    # Near-match Suggestions
+    SUGGESTION_LIMIT: int = 3  # Suggestions shown per unmatched code
+    SUGGESTION_MAX_DISTANCE: int = 2  # Largest edit distance suggested
+
+    # Watch Mode Settings
+    WATCH_POLL_INTERVAL: float = 5.0  # Seconds between folder scans
+    WATCH_DEBOUNCE: float = 30.0  # Quiet seconds after the last change before writing
+    WATCH_MAX_DELAY: float = 300.0  # Write at the latest this long after the first unwritten change
+
+    # Job Server Settings
+    SERVER_HOST: str = "127.0.0.1"  # Use 0.0.0.0 to serve other machines
+    SERVER_PORT: int = 8765
+    SERVER_WORKERS: int = 2  # Worker processes parsing PDFs
+    SERVER_TOKEN: str = ""  # Shared secret clients send as "Authorization: Bearer <token>"
+    SERVER_ROOTS: Tuple[str, ...] = ()  # Folders jobs may read and write (default: working directory)
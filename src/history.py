@@ -0,0 +1,102 @@
+"""
+Balance history queries.
+
+Usage:
+    From project root:
+        python -m src.history runs [--limit N]
+        python -m src.history trend NATIONAL_CODE [--runs N] [--type Stock|Free|Buy]
+        python -m src.history issues (NATIONAL_CODE | --item ITEM_CODE) [--runs N] [--category CATEGORY]
+        python -m src.history metrics [--runs N] [--json]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Ensure src directory is in the path
+src_dir = Path(__file__).parent
+if str(src_dir.parent) not in sys.path:
+    sys.path.insert(0, str(src_dir.parent))
+
+from src.config.extraction_config import ExtractionType
+from src.config.settings import AppSettings
+from src.services.history_store import HistoryStore, IssueCategory
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and print the requested history."""
+    settings = AppSettings()
+    parser = argparse.ArgumentParser(description="Query the balance history of past runs.")
+    parser.add_argument("--db", default=settings.HISTORY_FILE, help=f"History file (default: {settings.HISTORY_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = commands.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    trend_parser = commands.add_parser("trend", help="Balance of a code over recent runs")
+    trend_parser.add_argument("national_code")
+    trend_parser.add_argument("--runs", type=int, default=10)
+    trend_parser.add_argument("--type", choices=[extraction_type.value for extraction_type in ExtractionType])
+
+    issues_parser = commands.add_parser("issues", help="Issue rows of a code over recent runs")
+    issues_parser.add_argument("national_code", nargs="?")
+    issues_parser.add_argument("--item", help="Look up an item code instead of a national code")
+    issues_parser.add_argument("--runs", type=int, default=10)
+    issues_parser.add_argument(
+        "--category",
+        choices=[IssueCategory.EXPIRED, IssueCategory.EXPIRING_SOON, IssueCategory.ZERO_BALANCE,
+                 IssueCategory.UNMATCHED, IssueCategory.DUPLICATE]
+    )
+
+    metrics_parser = commands.add_parser("metrics", help="Stage timings and counters of recent runs")
+    metrics_parser.add_argument("--runs", type=int, default=10)
+    metrics_parser.add_argument("--json", action="store_true", help="Print the run reports as JSON")
+
+    args = parser.parse_args(argv)
+    store = HistoryStore(args.db)
+
+    if args.command == "runs":
+        for run in store.runs(args.limit):
+            print(
+                f"{run.run_id:>6}  {run.run_time}  {run.run_type or '':<6} {run.pdf_count or 0:>3} PDF(s)  "
+                f"matched {run.matched or 0}, not in Excel {run.unmatched or 0}, missing {run.missing or 0}, "
+                f"expired {run.expired or 0}"
+            )
+
+    elif args.command == "trend":
+        extraction_type = ExtractionType(args.type) if args.type else None
+        previous = {}
+        for point in store.trend(args.national_code, args.runs, extraction_type):
+            last = previous.get(point.extraction_type)
+            change = "" if last is None else f"{point.balance - last:+g}"
+            previous[point.extraction_type] = point.balance
+            in_excel = "" if point.matched else "  (not in Excel)"
+            print(f"{point.run_time}  {point.extraction_type:<6} {point.balance:>12g} {change:>10}{in_excel}")
+
+    elif args.command == "metrics":
+        points = store.run_metrics(args.runs)
+        if args.json:
+            reports = [
+                dict(run_id=point.run_id, run_time=point.run_time, **point.metrics.to_dict())
+                for point in points
+            ]
+            print(json.dumps(reports, indent=2))
+        else:
+            for point in points:
+                print(f"{point.run_id:>6}  {point.run_time}  {point.metrics.summary()}")
+
+    else:
+        if not args.national_code and not args.item:
+            parser.error("issues needs a national code or --item")
+        for issue in store.issues(args.national_code, args.item, args.category, args.runs):
+            print(
+                f"{issue.run_time}  {issue.category:<14} {issue.national_code}  {issue.item_code or '':<7} "
+                f"{issue.expiry_date or '':<10} {issue.name or ''}  [{issue.pdf_filename or ''}]"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,13 +7,15 @@ This application extracts pharmaceutical balance data from PDF files
 and updates Excel spreadsheets with the extracted information.
 
 Usage:
-    From project root: python run_app.py
-    Or: python -m src.main
+    From project root: python run_app.py [--profile]
+    Or: python -m src.main [--profile]
 """
 
+import argparse
 import sys
 import os
 from pathlib import Path
+from typing import List, Optional
 
 # Ensure src directory is in the path
 src_dir = Path(__file__).parent
@@ -21,15 +23,27 @@ if str(src_dir.parent) not in sys.path:
     sys.path.insert(0, str(src_dir.parent))
 
 import tkinter as tk
+from src.config.settings import LoggingConfig
 from src.ui.main_window import BalanceUpdaterApp
+from src.utils.profiling import default_profile_dir, start_profiling
 import sv_ttk
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """Initialize and run the application."""
+    parser = argparse.ArgumentParser(description="Update master balances from PDF reports.")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Profile extraction, Excel and display stages; reports are written next to the log on exit"
+    )
+    # Unknown arguments are ignored: the windowed executable has no console to report them on
+    args, _ = parser.parse_known_args(argv)
+
     root = tk.Tk()
     sv_ttk.set_theme("light")
     app = BalanceUpdaterApp(root)
+    if args.profile:
+        start_profiling(default_profile_dir(LoggingConfig().filename))
     root.mainloop()
 
 
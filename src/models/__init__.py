@@ -1,6 +1,45 @@
 """Data models for the balance updater application."""
 
 from .extraction_data import ExtractionData, ExtractionResult
+from .extraction_events import (
+    BalanceEvent,
+    CodeOccurrenceEvent,
+    ExpiredEvent,
+    ExpiringSoonEvent,
+    ExtractionEvent,
+    FileCompletedEvent,
+    OrphanEvent,
+    ZeroBalanceEvent,
+)
+from .code_index import Suggestion, TrigramIndex
+from .duplicate_index import CodeOccurrence, DuplicateCategory, DuplicateIndex
 from .item import MedicineItem
+from .master_index import MasterIndex
+from .save_preview import CellChange, CellStatus, SavePreview
+from .source_index import SourceIndex, SourceKind, SourceLocation
 
-__all__ = ['ExtractionData', 'ExtractionResult', 'MedicineItem']
+__all__ = [
+    'ExtractionData',
+    'ExtractionResult',
+    'MedicineItem',
+    'MasterIndex',
+    'CellChange',
+    'CellStatus',
+    'SavePreview',
+    'CodeOccurrence',
+    'DuplicateCategory',
+    'DuplicateIndex',
+    'SourceIndex',
+    'SourceKind',
+    'SourceLocation',
+    'Suggestion',
+    'TrigramIndex',
+    'BalanceEvent',
+    'CodeOccurrenceEvent',
+    'ExpiredEvent',
+    'ExpiringSoonEvent',
+    'ExtractionEvent',
+    'FileCompletedEvent',
+    'OrphanEvent',
+    'ZeroBalanceEvent',
+]
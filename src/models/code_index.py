@@ -0,0 +1,197 @@
+"""Trigram index for finding codes that nearly match a given code."""
+
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+# Padding so that the first and last characters get their own trigrams
+_PAD = "\x00"
+
+
+class Suggestion(NamedTuple):
+    """A candidate code and its edit distance from the queried code."""
+    code: str
+    distance: int
+
+
+def trigrams(code: str) -> Set[str]:
+    """
+    Get the distinct padded trigrams of a code.
+
+    Args:
+        code: Code to split
+
+    Returns:
+        Set of three-character strings
+    """
+    padded = f"{_PAD}{_PAD}{code}{_PAD}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    Levenshtein distance between two strings, bounded by max_distance.
+
+    Args:
+        a: First string
+        b: Second string
+        max_distance: Largest distance of interest
+
+    Returns:
+        The distance, or None if it exceeds max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,  # deletion
+                current[j - 1] + 1,  # insertion
+                previous[j - 1] + (char_a != char_b)  # substitution
+            ))
+        # Every later row is at least the minimum of this one
+        if min(current) > max_distance:
+            return None
+        previous = current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class TrigramIndex:
+    """
+    Inverted index from trigrams to codes, for near-match lookups.
+
+    A single edit destroys at most three trigrams of a code, so any code
+    within distance k shares all but 3k of the query's trigrams. Candidates
+    are found by counting posting-list hits (a C-level Counter pass) and only
+    those reaching that count are verified with a bounded edit distance.
+
+    copy() is cheap: posting lists are shared and copied on the first write.
+    """
+
+    def __init__(self, codes: Iterable[str] = ()):
+        """
+        Initialize index.
+
+        Args:
+            codes: Initial codes to index
+        """
+        self._postings: Dict[str, Set[str]] = {}
+        self._codes: Set[str] = set()
+        # Trigrams whose posting list is shared with a copy (copied before a change)
+        self._shared: Set[str] = set()
+        for code in codes:
+            self.add(code)
+
+    def __len__(self) -> int:
+        """Number of indexed codes."""
+        return len(self._codes)
+
+    def __contains__(self, code: str) -> bool:
+        """Check whether a code is indexed."""
+        return code.upper() in self._codes
+
+    def copy(self) -> "TrigramIndex":
+        """
+        Copy the index; both stay independent, sharing posting lists until written.
+
+        Returns:
+            New TrigramIndex with the same codes
+        """
+        clone = TrigramIndex()
+        clone._postings = dict(self._postings)
+        clone._codes = set(self._codes)
+        clone._shared = set(self._postings)
+        self._shared = set(self._postings)
+        return clone
+
+    def add(self, code: str) -> None:
+        """
+        Add a code to the index.
+
+        Args:
+            code: Code to add
+        """
+        code = code.upper()
+        if code in self._codes:
+            return
+        self._codes.add(code)
+        for gram in trigrams(code):
+            posting = self._writable(gram)
+            if posting is None:
+                self._postings[gram] = {code}
+            else:
+                posting.add(code)
+
+    def discard(self, code: str) -> None:
+        """
+        Remove a code from the index if present.
+
+        Args:
+            code: Code to remove
+        """
+        code = code.upper()
+        if code not in self._codes:
+            return
+        self._codes.discard(code)
+        for gram in trigrams(code):
+            posting = self._writable(gram)
+            if posting is not None:
+                posting.discard(code)
+                if not posting:
+                    del self._postings[gram]
+
+    def _writable(self, gram: str) -> Optional[Set[str]]:
+        """Get a trigram's posting list for changing it, unsharing it first."""
+        posting = self._postings.get(gram)
+        if posting is not None and gram in self._shared:
+            self._shared.discard(gram)
+            posting = self._postings[gram] = set(posting)
+        return posting
+
+    def search(self, code: str, max_distance: int) -> List[Suggestion]:
+        """
+        Find every indexed code within an edit distance (excluding the code itself).
+
+        Args:
+            code: Code to look up
+            max_distance: Largest edit distance to report
+
+        Returns:
+            Suggestions sorted by distance, then code
+        """
+        code = code.upper()
+        query_grams = trigrams(code)
+        min_shared = len(query_grams) - 3 * max_distance
+
+        postings = self._postings
+        hits = Counter(chain.from_iterable(postings.get(gram, ()) for gram in query_grams))
+        hits.pop(code, None)
+
+        found = []
+        for candidate, shared in hits.items():
+            if shared < min_shared:
+                continue
+            distance = edit_distance(code, candidate, max_distance)
+            if distance is not None:
+                found.append(Suggestion(candidate, distance))
+        found.sort(key=lambda suggestion: (suggestion.distance, suggestion.code))
+        return found
+
+    def suggest(self, code: str, limit: int = 3, max_distance: int = 2) -> List[Suggestion]:
+        """
+        Get the closest indexed codes to a code.
+
+        Args:
+            code: Code to look up
+            limit: Maximum number of suggestions
+            max_distance: Largest edit distance to consider
+
+        Returns:
+            Up to ``limit`` suggestions, closest first
+        """
+        return self.search(code, max_distance)[:limit]
@@ -0,0 +1,168 @@
+"""Index of national code occurrences used to detect duplicate codes."""
+
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from src.models.records import DuplicateRecord, intern_text
+
+
+class DuplicateCategory(Enum):
+    """Where the repeated occurrences of a national code were found."""
+    WITHIN_TABLE = "Within table"
+    CROSS_TABLE = "Cross table"
+    CROSS_FILE = "Cross file"
+
+
+class CodeOccurrence(NamedTuple):
+    """One national code header row, with its position in the source PDF."""
+    item_code: str
+    name: str
+    pdf_filename: str
+    page: int  # 1-based page number
+    table: int  # 1-based table number on the page
+    row: int  # 1-based row number in the table
+
+
+class DuplicateIndex:
+    """
+    Occurrences of every national code across all tables and files.
+
+    Occurrences are only appended while extracting; categories are derived
+    in one linear pass when a report is requested.
+
+    A code repeated only across files is normal (one report per ward or
+    month), so cross-file occurrences are kept apart from the duplicates.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._occurrences: Dict[str, List[CodeOccurrence]] = {}
+        self._by_category: Optional[Dict[DuplicateCategory, List[DuplicateRecord]]] = None
+        self._duplicates: Optional[List[DuplicateRecord]] = None
+
+    def add(self, national_code: str, occurrence: CodeOccurrence) -> None:
+        """
+        Record an occurrence of a national code.
+
+        Args:
+            national_code: National code (XX-XXX-XXX format)
+            occurrence: Where the code was found
+        """
+        national_code = intern_text(national_code.upper())
+        self._occurrences.setdefault(national_code, []).append(occurrence)
+        self._by_category = self._duplicates = None
+
+    def occurrences(self, national_code: str) -> List[CodeOccurrence]:
+        """
+        Get all occurrences of a national code, in extraction order.
+
+        Args:
+            national_code: National code to look up
+
+        Returns:
+            List of occurrences (empty if the code was never seen)
+        """
+        return list(self._occurrences.get(national_code.upper(), []))
+
+    def categories(self, national_code: str) -> Set[DuplicateCategory]:
+        """
+        Get the duplicate categories that apply to a national code.
+
+        Args:
+            national_code: National code to look up
+
+        Returns:
+            Set of categories (empty if the code is not duplicated)
+        """
+        return {
+            DuplicateCategory(record.category)
+            for record in self.report()
+            if record.national_code == national_code.upper()
+        }
+
+    def duplicates(self) -> List[DuplicateRecord]:
+        """
+        List the occurrences of codes repeated within a file (table or cross table).
+
+        Returns:
+            List of DuplicateRecord, ordered by category, then extraction order
+        """
+        if self._duplicates is None:
+            by_category = self._categorize()
+            self._duplicates = (
+                by_category[DuplicateCategory.WITHIN_TABLE] + by_category[DuplicateCategory.CROSS_TABLE]
+            )
+        return self._duplicates
+
+    def cross_file(self) -> List[DuplicateRecord]:
+        """
+        List the occurrences of codes repeated only in other files (informational).
+
+        Returns:
+            List of DuplicateRecord, in extraction order
+        """
+        return self._categorize()[DuplicateCategory.CROSS_FILE]
+
+    def report(self) -> List[DuplicateRecord]:
+        """
+        List every occurrence of every repeated code with its category.
+
+        Returns:
+            List of DuplicateRecord, ordered by category, then extraction order
+        """
+        return [record for records in self._categorize().values() for record in records]
+
+    def by_category(self) -> Dict[DuplicateCategory, List[DuplicateRecord]]:
+        """
+        Group the occurrences of repeated codes by category.
+
+        Returns:
+            Dictionary mapping category -> records (every category present)
+        """
+        return {category: list(records) for category, records in self._categorize().items()}
+
+    def _categorize(self) -> Dict[DuplicateCategory, List[DuplicateRecord]]:
+        """
+        Classify every occurrence of every repeated code, in one linear pass.
+
+        Each occurrence is classified by its closest repeat: another occurrence
+        in the same table, else in another table of the same file, else in
+        another file.
+
+        Returns:
+            Dictionary mapping category -> records in extraction order (cached)
+        """
+        if self._by_category is not None:
+            return self._by_category
+
+        by_category: Dict[DuplicateCategory, List[DuplicateRecord]] = {
+            category: [] for category in DuplicateCategory
+        }
+
+        for national_code, occurrences in self._occurrences.items():
+            if len(occurrences) < 2:
+                continue
+
+            # Count occurrences per table and per file for this code
+            per_table: Dict[Tuple[str, int, int], int] = {}
+            per_file: Dict[str, int] = {}
+            for occ in occurrences:
+                table_key = (occ.pdf_filename, occ.page, occ.table)
+                per_table[table_key] = per_table.get(table_key, 0) + 1
+                per_file[occ.pdf_filename] = per_file.get(occ.pdf_filename, 0) + 1
+
+            for occ in occurrences:
+                if per_table[(occ.pdf_filename, occ.page, occ.table)] > 1:
+                    category = DuplicateCategory.WITHIN_TABLE
+                elif per_file[occ.pdf_filename] > 1:
+                    category = DuplicateCategory.CROSS_TABLE
+                else:
+                    category = DuplicateCategory.CROSS_FILE
+
+                by_category[category].append(DuplicateRecord(
+                    national_code, occ.item_code, occ.name, occ.pdf_filename,
+                    category.value, occ.page, occ.table, occ.row
+                ))
+
+        self._by_category = by_category
+        return by_category
@@ -1,7 +1,31 @@
 """Data structures for extraction results."""
 
+import os
 from dataclasses import dataclass, field
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional
+
+from src.config.extraction_config import ExtractionType
+from src.models.extraction_events import (
+    BalanceEvent,
+    CodeOccurrenceEvent,
+    ExpiredEvent,
+    ExpiringSoonEvent,
+    ExtractionEvent,
+    FileCompletedEvent,
+    OrphanEvent,
+    ZeroBalanceEvent,
+)
+from src.models.code_index import Suggestion
+from src.models.duplicate_index import CodeOccurrence, DuplicateIndex
+from src.models.source_index import SourceIndex, SourceKind, SourceLocation
+from src.models.records import (
+    DuplicateRecord,
+    ExpiryRecord,
+    ItemRecord,
+    UnmatchedRecord,
+    ZeroBalanceRecord,
+    intern_text,
+)
 
 
 @dataclass
@@ -11,28 +35,137 @@ class ExtractionData:
     # Maps national code -> balance
     balances: Dict[str, float] = field(default_factory=dict)
 
-    # Maps national code -> item code (for unmatched report) - DEPRECATED: use all_items
-    item_codes: Dict[str, str] = field(default_factory=dict)
+    # Maps extraction type -> national code -> balance (balances split by report type)
+    balances_by_type: Dict[ExtractionType, Dict[str, float]] = field(default_factory=dict)
 
-    # Maps national code -> item name (for unmatched report) - DEPRECATED: use all_items
-    item_names: Dict[str, str] = field(default_factory=dict)
+    # Maps PDF filename -> extraction type it was extracted as
+    file_types: Dict[str, ExtractionType] = field(default_factory=dict)
 
-    # Maps national code -> PDF filename (for unmatched report) - DEPRECATED: use all_items
-    pdf_sources: Dict[str, str] = field(default_factory=dict)
-
-    # Maps national code -> list of ALL items (item_code, name, pdf_filename)
-    all_items: Dict[str, List[Tuple[str, str, str]]] = field(default_factory=dict)
+    # Maps national code -> ALL items (item_code, name, pdf_filename), kept as an
+    # insertion-ordered set (dict keys with None values) for O(1) de-duplication
+    all_items: Dict[str, Dict[ItemRecord, None]] = field(default_factory=dict)
 
     # Items with expiry issues: (national_code, item_code, name, expiry_date, pdf_filename)
-    expired_items: List[Tuple[str, str, str, str, str]] = field(default_factory=list)
+    expired_items: List[ExpiryRecord] = field(default_factory=list)
+
+    # Items expiring within the near-expiry horizon (still counted in balances):
+    # (national_code, item_code, name, expiry_date, pdf_filename)
+    expiring_soon_items: List[ExpiryRecord] = field(default_factory=list)
 
-    # Duplicate codes: List of (national_code, item_code, name, pdf_filename) for ALL occurrences
-    duplicates: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    # Every national code occurrence with its file/page/table/row (duplicates are derived from it)
+    duplicate_index: DuplicateIndex = field(default_factory=DuplicateIndex)
 
     # Items with zero or no balance: (national_code, item_code, name, pdf_filename)
-    zero_balance_items: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    zero_balance_items: List[ZeroBalanceRecord] = field(default_factory=list)
+
+    # Items found without a national code header: (item_code, name, pdf_filename)
+    orphan_items: List[ItemRecord] = field(default_factory=list)
+
+    # Page/table/row (and bbox) of every balance, expired and zero balance record
+    sources: SourceIndex = field(default_factory=SourceIndex)
+
+    # Maps PDF filename -> full path (to open the source of a record)
+    source_files: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def duplicates(self) -> List[DuplicateRecord]:
+        """Duplicate codes: ALL occurrences of codes repeated within a file, with category and location."""
+        return self.duplicate_index.duplicates()
+
+    @property
+    def cross_file_duplicates(self) -> List[DuplicateRecord]:
+        """Occurrences of codes repeated only across files (informational, not duplicates)."""
+        return self.duplicate_index.cross_file()
+
+    @property
+    def item_codes(self) -> Dict[str, str]:
+        """Maps national code -> item code (computed from all_items) - DEPRECATED: use all_items."""
+        return self._latest_item_field(0)
+
+    @property
+    def item_names(self) -> Dict[str, str]:
+        """Maps national code -> item name (computed from all_items) - DEPRECATED: use all_items."""
+        return self._latest_item_field(1)
+
+    @property
+    def pdf_sources(self) -> Dict[str, str]:
+        """Maps national code -> PDF filename (computed from all_items) - DEPRECATED: use all_items."""
+        return self._latest_item_field(2)
+
+    def _latest_item_field(self, index: int) -> Dict[str, str]:
+        """Build national code -> last non-empty value of one ItemRecord field."""
+        latest = {}
+        for national_code, items in self.all_items.items():
+            for item in items:
+                if item[index]:
+                    latest[national_code] = item[index]
+        return latest
+
+    @classmethod
+    def from_events(cls, events: Iterable[ExtractionEvent]) -> "ExtractionData":
+        """
+        Build extraction data by reducing a stream of extraction events.
+
+        Args:
+            events: Events from PDFExtractor.iter_events (or a replay of them)
 
-    def add_balance(self, national_code: str, balance: float, item_code: str = "", item_name: str = "", pdf_filename: str = "") -> None:
+        Returns:
+            Populated ExtractionData
+        """
+        extraction_data = cls()
+        for event in events:
+            extraction_data.apply(event)
+        return extraction_data
+
+    def apply(self, event: ExtractionEvent) -> None:
+        """
+        Fold one extraction event into this container.
+
+        Args:
+            event: Event to apply (file markers are ignored)
+        """
+        if isinstance(event, BalanceEvent):
+            self.add_balance(
+                event.national_code, event.balance, event.item_code, event.name, event.pdf_filename,
+                event.location, event.extraction_type
+            )
+        elif isinstance(event, ZeroBalanceEvent):
+            self.add_zero_balance_item(
+                event.national_code, event.item_code, event.name, event.pdf_filename, event.location
+            )
+        elif isinstance(event, ExpiredEvent):
+            self.add_expired_item(
+                event.national_code, event.item_code, event.name, event.expiry_date, event.pdf_filename, event.location
+            )
+        elif isinstance(event, ExpiringSoonEvent):
+            self.add_expiring_soon_item(
+                event.national_code, event.item_code, event.name, event.expiry_date, event.pdf_filename, event.location
+            )
+        elif isinstance(event, CodeOccurrenceEvent):
+            self.add_code_occurrence(
+                event.national_code, event.item_code, event.name, event.pdf_filename,
+                event.page, event.table, event.row
+            )
+        elif isinstance(event, OrphanEvent):
+            self.orphan_items.append(
+                ItemRecord(event.item_code, intern_text(event.name), intern_text(event.pdf_filename))
+            )
+        elif isinstance(event, FileCompletedEvent):
+            pdf_filename = os.path.basename(event.pdf_file)
+            self.source_files[pdf_filename] = event.pdf_file
+            if event.extraction_type is not None:
+                self.file_types[pdf_filename] = event.extraction_type
+
+    def add_balance(
+        self,
+        national_code: str,
+        balance: float,
+        item_code: str = "",
+        item_name: str = "",
+        pdf_filename: str = "",
+        location: Optional[SourceLocation] = None,
+        extraction_type: Optional[ExtractionType] = None
+    ) -> None:
         """
         Add or update balance for a code.
 
@@ -42,31 +175,38 @@ class ExtractionData:
             item_code: Item code (4-6 digits)
             item_name: Item name
             pdf_filename: Name of the PDF file where this was found
+            location: Where in the PDF the balance was read (optional)
+            extraction_type: Report type of the PDF (optional)
         """
-        national_code = national_code.upper()
+        national_code = intern_text(national_code.upper())
+        if location:
+            self.sources.add(SourceKind.BALANCE, national_code, item_code, pdf_filename, location)
         if national_code in self.balances:
             self.balances[national_code] += balance
         else:
             self.balances[national_code] = balance
 
-        # Store item code, name, and PDF source for reporting (DEPRECATED - kept for compatibility)
-        if item_code:
-            self.item_codes[national_code] = item_code
-        if item_name:
-            self.item_names[national_code] = item_name
-        if pdf_filename:
-            self.pdf_sources[national_code] = pdf_filename
+        if extraction_type is not None:
+            typed_balances = self.balances_by_type.setdefault(extraction_type, {})
+            typed_balances[national_code] = typed_balances.get(national_code, 0) + balance
 
         # Track ALL items for this national code (for detailed reporting)
         if item_code or item_name:
-            if national_code not in self.all_items:
-                self.all_items[national_code] = []
-            item_tuple = (item_code, item_name, pdf_filename)
-            # Only add if not already present (avoid duplicates)
-            if item_tuple not in self.all_items[national_code]:
-                self.all_items[national_code].append(item_tuple)
-
-    def add_expired_item(self, national_code: str, item_code: str, name: str, expiry_date: str, pdf_filename: str = "") -> None:
+            items = self.all_items.get(national_code)
+            if items is None:
+                items = self.all_items[national_code] = {}
+            # Re-adding an existing item keeps its original position (no duplicates)
+            items[ItemRecord(item_code, intern_text(item_name), intern_text(pdf_filename))] = None
+
+    def add_expired_item(
+        self,
+        national_code: str,
+        item_code: str,
+        name: str,
+        expiry_date: str,
+        pdf_filename: str = "",
+        location: Optional[SourceLocation] = None
+    ) -> None:
         """
         Record an expired item.
 
@@ -76,25 +216,77 @@ class ExtractionData:
             name: Item name
             expiry_date: Expiry date string
             pdf_filename: Name of the PDF file where this item was found
+            location: Where in the PDF the item was found (optional)
         """
-        self.expired_items.append((national_code.upper(), item_code, name, expiry_date, pdf_filename))
-
-    def add_duplicate(self, national_code: str, item_code: str, name: str, pdf_filename: str = "") -> None:
+        if location:
+            self.sources.add(SourceKind.EXPIRED, national_code, item_code, pdf_filename, location)
+        self.expired_items.append(ExpiryRecord(
+            intern_text(national_code.upper()), item_code, intern_text(name), expiry_date, intern_text(pdf_filename)
+        ))
+
+    def add_expiring_soon_item(
+        self,
+        national_code: str,
+        item_code: str,
+        name: str,
+        expiry_date: str,
+        pdf_filename: str = "",
+        location: Optional[SourceLocation] = None
+    ) -> None:
         """
-        Record a duplicate code occurrence.
-
-        Each call adds ONE occurrence. Multiple calls for the same national code
-        will create multiple entries showing ALL items with that code.
+        Record an item that expires within the near-expiry horizon.
 
         Args:
             national_code: National code (XX-XXX-XXX format)
             item_code: Item code (4-6 digits)
             name: Item name
+            expiry_date: Expiry date string
             pdf_filename: Name of the PDF file where this item was found
+            location: Where in the PDF the item was found (optional)
         """
-        self.duplicates.append((national_code.upper(), item_code, name, pdf_filename))
+        if location:
+            self.sources.add(SourceKind.EXPIRING_SOON, national_code, item_code, pdf_filename, location)
+        self.expiring_soon_items.append(ExpiryRecord(
+            intern_text(national_code.upper()), item_code, intern_text(name), expiry_date, intern_text(pdf_filename)
+        ))
+
+    def add_code_occurrence(
+        self,
+        national_code: str,
+        item_code: str,
+        name: str,
+        pdf_filename: str,
+        page: int,
+        table: int,
+        row: int
+    ) -> None:
+        """
+        Record one occurrence of a national code header.
+
+        Codes that occur more than once are reported in ``duplicates``.
 
-    def add_zero_balance_item(self, national_code: str, item_code: str, name: str, pdf_filename: str = "") -> None:
+        Args:
+            national_code: National code (XX-XXX-XXX format)
+            item_code: Item code on (or directly under) the header row
+            name: Item name
+            pdf_filename: Name of the PDF file where this code was found
+            page: Page number (1-based)
+            table: Table number on the page (1-based)
+            row: Row number in the table (1-based)
+        """
+        self.duplicate_index.add(
+            national_code,
+            CodeOccurrence(item_code, intern_text(name), intern_text(pdf_filename), page, table, row)
+        )
+
+    def add_zero_balance_item(
+        self,
+        national_code: str,
+        item_code: str,
+        name: str,
+        pdf_filename: str = "",
+        location: Optional[SourceLocation] = None
+    ) -> None:
         """
         Record an item with zero or missing balance.
 
@@ -103,31 +295,67 @@ class ExtractionData:
             item_code: Item code (4-6 digits)
             name: Item name
             pdf_filename: Name of the PDF file where this item was found
+            location: Where in the PDF the item was found (optional)
         """
-        self.zero_balance_items.append((national_code.upper(), item_code, name, pdf_filename))
+        if location:
+            self.sources.add(SourceKind.ZERO_BALANCE, national_code, item_code, pdf_filename, location)
+        self.zero_balance_items.append(ZeroBalanceRecord(
+            intern_text(national_code.upper()), item_code, intern_text(name), intern_text(pdf_filename)
+        ))
 
 
 @dataclass
 class ExtractionResult:
     """Result of matching extraction data with Excel file."""
 
-    # Codes that matched and were found in Excel
+    # Codes that matched and were found in Excel (balance summed over report types)
     matched_codes: Dict[str, float] = field(default_factory=dict)
 
-    # Codes found in PDF but not in Excel: (national_code, item_code, name, balance, pdf_filename)
-    unmatched_codes: List[Tuple[str, str, str, float, str]] = field(default_factory=list)
+    # Balance of each matched code per report type; each goes to its own column.
+    # Empty for a code whose balances carry no report type.
+    matched_by_type: Dict[str, Dict[ExtractionType, float]] = field(default_factory=dict)
 
-    # Codes in Excel but not found in PDF
-    missing_codes: List[str] = field(default_factory=list)
+    # Codes found in PDF but not in Excel, indexed by national code:
+    # code -> [(national_code, item_code, name, balance, pdf_filename), ...]
+    unmatched_by_code: Dict[str, List[UnmatchedRecord]] = field(default_factory=dict)
+
+    # Codes in Excel but not found in PDF (dict used as an insertion-ordered set)
+    missing: Dict[str, None] = field(default_factory=dict)
+
+    # Near-match Excel codes for each unmatched code, closest first
+    suggestions: Dict[str, List[Suggestion]] = field(default_factory=dict)
 
     # Expired items from extraction: (national_code, item_code, name, expiry_date, pdf_filename)
-    expired_items: List[Tuple[str, str, str, str, str]] = field(default_factory=list)
+    expired_items: List[ExpiryRecord] = field(default_factory=list)
+
+    # Items expiring soon: (national_code, item_code, name, expiry_date, pdf_filename)
+    expiring_soon_items: List[ExpiryRecord] = field(default_factory=list)
 
-    # Duplicate codes from extraction: (national_code, item_code, name, pdf_filename) - ALL occurrences
-    duplicates: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    # Duplicate codes from extraction: (national_code, item_code, name, pdf_filename,
+    # category, page, table, row) - ALL occurrences of codes repeated within a file
+    duplicates: List[DuplicateRecord] = field(default_factory=list)
+
+    # Codes repeated only across files (informational), same layout as duplicates
+    cross_file_duplicates: List[DuplicateRecord] = field(default_factory=list)
 
     # Items with zero or no balance: (national_code, item_code, name, pdf_filename)
-    zero_balance_items: List[Tuple[str, str, str, str]] = field(default_factory=list)
+    zero_balance_items: List[ZeroBalanceRecord] = field(default_factory=list)
+
+    # Provenance of extracted records, shared with the ExtractionData
+    sources: SourceIndex = field(default_factory=SourceIndex)
+
+    # Maps PDF filename -> full path
+    source_files: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def unmatched_codes(self) -> List[UnmatchedRecord]:
+        """All unmatched rows (one per item/batch), in extraction order."""
+        return [record for records in self.unmatched_by_code.values() for record in records]
+
+    @property
+    def missing_codes(self) -> List[str]:
+        """Codes in Excel not found in PDF."""
+        return list(self.missing)
 
     @property
     def matched_count(self) -> int:
@@ -137,23 +365,33 @@ class ExtractionResult:
     @property
     def missing_count(self) -> int:
         """Number of codes in Excel not found in PDF."""
-        return len(self.missing_codes)
+        return len(self.missing)
 
     @property
     def unmatched_count(self) -> int:
-        """Number of codes in PDF not found in Excel."""
-        return len(self.unmatched_codes)
+        """Number of unmatched rows (codes in PDF not found in Excel)."""
+        return sum(len(records) for records in self.unmatched_by_code.values())
 
     @property
     def expired_count(self) -> int:
         """Number of expired items."""
         return len(self.expired_items)
 
+    @property
+    def expiring_soon_count(self) -> int:
+        """Number of items expiring soon."""
+        return len(self.expiring_soon_items)
+
     @property
     def duplicate_count(self) -> int:
         """Number of duplicate codes."""
         return len(self.duplicates)
 
+    @property
+    def cross_file_count(self) -> int:
+        """Number of occurrences of codes repeated only across files."""
+        return len(self.cross_file_duplicates)
+
     @property
     def zero_balance_count(self) -> int:
         """Number of items with zero balance."""
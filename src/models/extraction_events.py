@@ -0,0 +1,85 @@
+"""Typed events produced while extracting PDFs (see PDFExtractor.iter_events)."""
+
+from typing import Callable, NamedTuple, Optional, Union
+
+from src.config.extraction_config import ExtractionType
+from src.models.source_index import SourceLocation
+
+
+class BalanceEvent(NamedTuple):
+    """A balance read for one item (batch) of a national code."""
+    national_code: str
+    item_code: str
+    name: str
+    balance: float
+    pdf_filename: str
+    location: Optional[SourceLocation] = None
+    extraction_type: Optional[ExtractionType] = None  # Report type of the PDF (routes the balance)
+
+
+class ExpiredEvent(NamedTuple):
+    """An item skipped because its expiry date has passed."""
+    national_code: str
+    item_code: str
+    name: str
+    expiry_date: str
+    pdf_filename: str
+    location: Optional[SourceLocation] = None
+
+
+class ExpiringSoonEvent(NamedTuple):
+    """An item that is still valid but expires within the near-expiry horizon."""
+    national_code: str
+    item_code: str
+    name: str
+    expiry_date: str
+    pdf_filename: str
+    location: Optional[SourceLocation] = None
+
+
+class ZeroBalanceEvent(NamedTuple):
+    """An item whose balance is zero or missing."""
+    national_code: str
+    item_code: str
+    name: str
+    pdf_filename: str
+    location: Optional[SourceLocation] = None
+
+
+class CodeOccurrenceEvent(NamedTuple):
+    """A national code header row; duplicates are derived from these occurrences."""
+    national_code: str
+    item_code: str
+    name: str
+    pdf_filename: str
+    page: int
+    table: int
+    row: int
+
+
+class OrphanEvent(NamedTuple):
+    """An item row found without any national code header (skipped)."""
+    item_code: str
+    name: str
+    pdf_filename: str
+    row: int
+
+
+class FileCompletedEvent(NamedTuple):
+    """Marks the end of one PDF file in the stream."""
+    pdf_file: str
+    extraction_type: Optional[ExtractionType] = None  # Report type the file was extracted as
+
+
+ExtractionEvent = Union[
+    BalanceEvent,
+    ExpiredEvent,
+    ExpiringSoonEvent,
+    ZeroBalanceEvent,
+    CodeOccurrenceEvent,
+    OrphanEvent,
+    FileCompletedEvent,
+]
+
+# Callback receiving events as they are produced
+EventSink = Callable[[ExtractionEvent], None]
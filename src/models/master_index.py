@@ -0,0 +1,56 @@
+"""Index of the master workbook: national code -> rows and existing values."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from src.utils.file_fingerprint import FileFingerprint
+
+
+@dataclass
+class MasterIndex:
+    """Code index of the master Excel workbook, built once and cached."""
+
+    # Path of the workbook this index was built from
+    file_path: str = ""
+
+    # Maps national code -> Excel row numbers (1-based; a code may repeat)
+    code_rows: Dict[str, List[int]] = field(default_factory=dict)
+
+    # Maps Excel column (0-based) -> row number -> existing cell value (non-empty cells only)
+    column_values: Dict[int, Dict[int, Any]] = field(default_factory=dict)
+
+    # Identity of the workbook the rows and values were read from (set by the cache)
+    fingerprint: Optional[FileFingerprint] = None
+
+    @property
+    def codes(self) -> Set[str]:
+        """Set of national codes in the workbook."""
+        return set(self.code_rows)
+
+    @property
+    def code_count(self) -> int:
+        """Number of distinct national codes."""
+        return len(self.code_rows)
+
+    def add_row(self, code: str, row_number: int) -> None:
+        """
+        Record that a code appears on a row.
+
+        Args:
+            code: National code (normalized to upper case)
+            row_number: Excel row number (1-based)
+        """
+        self.code_rows.setdefault(code, []).append(row_number)
+
+    def get_value(self, column: int, row_number: int) -> Optional[Any]:
+        """
+        Get the existing value of a cell.
+
+        Args:
+            column: Excel column (0-based)
+            row_number: Excel row number (1-based)
+
+        Returns:
+            Cell value, or None if the cell is empty or the column is not indexed
+        """
+        return self.column_values.get(column, {}).get(row_number)
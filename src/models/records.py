@@ -0,0 +1,69 @@
+"""Compact record types stored in ExtractionData and ExtractionResult.
+
+Records are NamedTuples: they have no per-instance ``__dict__`` (``__slots__ = ()``),
+unpack exactly like the plain tuples they replace, and are hashable so they
+can be de-duplicated cheaply. Repeated strings (national codes, item names,
+PDF filenames) are interned by ExtractionData so each distinct value is
+stored once no matter how many records refer to it.
+"""
+
+import sys
+from typing import NamedTuple
+
+
+class ItemRecord(NamedTuple):
+    """One item (batch) seen under a national code."""
+    item_code: str
+    name: str
+    pdf_filename: str
+
+
+class ExpiryRecord(NamedTuple):
+    """An expired item."""
+    national_code: str
+    item_code: str
+    name: str
+    expiry_date: str
+    pdf_filename: str
+
+
+class DuplicateRecord(NamedTuple):
+    """One occurrence of a duplicated national code."""
+    national_code: str
+    item_code: str
+    name: str
+    pdf_filename: str
+    category: str  # DuplicateCategory value
+    page: int
+    table: int
+    row: int
+
+
+class ZeroBalanceRecord(NamedTuple):
+    """An item with zero or missing balance."""
+    national_code: str
+    item_code: str
+    name: str
+    pdf_filename: str
+
+
+class UnmatchedRecord(NamedTuple):
+    """An extracted item whose national code is not in the Excel file."""
+    national_code: str
+    item_code: str
+    name: str
+    balance: float
+    pdf_filename: str
+
+
+def intern_text(text: str) -> str:
+    """
+    Intern a string so equal values share one object.
+
+    Args:
+        text: String to intern (None/empty returned unchanged)
+
+    Returns:
+        The canonical instance of the string
+    """
+    return sys.intern(text) if text else text
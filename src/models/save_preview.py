@@ -0,0 +1,104 @@
+"""Preview of a master workbook save: which target cells change."""
+
+from dataclasses import dataclass, field
+from numbers import Number
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from src.config.extraction_config import ExtractionConfig, ExtractionType
+from src.models.master_index import MasterIndex
+from src.utils.file_fingerprint import FileFingerprint
+
+
+class CellStatus:
+    """How a target cell compares with the balance about to be written."""
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    NEW = "new"  # Cell is currently empty
+
+
+class CellChange(NamedTuple):
+    """One target cell of a save."""
+    national_code: str
+    extraction_type: str
+    row: int  # Excel row number (1-based)
+    column: int  # Excel column (0-based)
+    previous: Any  # Current cell value, None if empty
+    value: float
+    status: str  # CellStatus value
+
+
+@dataclass
+class SavePreview:
+    """Target cells of a save, compared with the values already in the workbook."""
+
+    # Path of the workbook the preview was read from
+    file_path: str = ""
+
+    # Identity of that workbook when its index was built; the save checks it is
+    # unchanged, since the rows of the cells come from the index
+    fingerprint: Optional[FileFingerprint] = None
+
+    # Every target cell, ordered by type, code then row
+    cells: List[CellChange] = field(default_factory=list)
+
+    @classmethod
+    def build(cls, index: MasterIndex, balances_by_type: Dict[ExtractionType, Dict[str, float]]) -> 'SavePreview':
+        """
+        Compare balances with the cached values of their target cells.
+
+        Every row of a repeated code is a separate target cell. Codes that
+        are not in the workbook have no cell and are left out.
+
+        Args:
+            index: Cached master index (holds the target columns' existing values)
+            balances_by_type: Dictionary of extraction type -> (code -> balance)
+
+        Returns:
+            SavePreview of the target cells
+        """
+        preview = cls(index.file_path, fingerprint=index.fingerprint)
+        for extraction_type in sorted(balances_by_type, key=lambda t: t.value):
+            column = ExtractionConfig.get_excel_column(extraction_type)
+            values = index.column_values.get(column, {})
+            balances = balances_by_type[extraction_type]
+
+            for national_code in sorted(balances):
+                value = balances[national_code]
+                for row in index.code_rows.get(national_code, ()):
+                    previous = values.get(row)
+                    if previous is None:
+                        status = CellStatus.NEW
+                    elif (isinstance(previous, Number) and not isinstance(previous, bool)
+                          and float(previous) == value):
+                        status = CellStatus.UNCHANGED
+                    else:
+                        status = CellStatus.CHANGED
+                    preview.cells.append(CellChange(
+                        national_code, extraction_type.value, row, column, previous, value, status
+                    ))
+        return preview
+
+    @property
+    def changed(self) -> List[CellChange]:
+        """Cells whose value differs from the balance."""
+        return [cell for cell in self.cells if cell.status == CellStatus.CHANGED]
+
+    @property
+    def unchanged(self) -> List[CellChange]:
+        """Cells that already hold the balance."""
+        return [cell for cell in self.cells if cell.status == CellStatus.UNCHANGED]
+
+    @property
+    def new(self) -> List[CellChange]:
+        """Empty cells that will be filled."""
+        return [cell for cell in self.cells if cell.status == CellStatus.NEW]
+
+    @property
+    def writes(self) -> List[CellChange]:
+        """Cells a save needs to write (changed and new)."""
+        return [cell for cell in self.cells if cell.status != CellStatus.UNCHANGED]
+
+    @property
+    def has_changes(self) -> bool:
+        """Whether saving would modify the workbook."""
+        return any(cell.status != CellStatus.UNCHANGED for cell in self.cells)
@@ -0,0 +1,123 @@
+"""Compact index of where each extracted record came from in the source PDFs."""
+
+import math
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.models.records import intern_text
+
+# Bounding box in PDF points: (x0, top, x1, bottom)
+BBox = Tuple[float, float, float, float]
+
+
+class SourceLocation(NamedTuple):
+    """Position of a table row in a PDF."""
+    page: int  # 1-based page number
+    table: int  # 1-based table number on the page
+    row: int  # 1-based row number in the table
+    bbox: Optional[BBox] = None  # Row bounding box, when the backend provides one
+
+
+class SourceKind:
+    """Kinds of records that carry provenance."""
+    BALANCE = "balance"
+    EXPIRED = "expired"
+    EXPIRING_SOON = "expiring_soon"
+    ZERO_BALANCE = "zero_balance"
+
+
+class SourceEntry(NamedTuple):
+    """A provenance lookup result."""
+    item_code: str
+    pdf_filename: str
+    location: SourceLocation
+
+
+class SourceIndex:
+    """
+    Provenance of balance, expiry and zero-balance records.
+
+    Coordinates are stored column-wise in typed arrays (a few bytes per
+    record instead of a tuple object each); item codes and filenames are
+    shared references to interned strings.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._pages = array('H')
+        self._tables = array('H')
+        self._rows = array('I')
+        self._bboxes = array('f')  # 4 floats per entry, NaN when unknown
+        self._item_codes: List[str] = []
+        self._files: List[str] = []
+        self._by_code: Dict[Tuple[str, str], List[int]] = {}
+
+    def __len__(self) -> int:
+        """Number of recorded locations."""
+        return len(self._rows)
+
+    def add(
+        self,
+        kind: str,
+        national_code: str,
+        item_code: str,
+        pdf_filename: str,
+        location: SourceLocation
+    ) -> None:
+        """
+        Record where a record was found.
+
+        Args:
+            kind: SourceKind value
+            national_code: National code (XX-XXX-XXX format)
+            item_code: Item code
+            pdf_filename: Name of the PDF file
+            location: Page/table/row (and bbox) of the record
+        """
+        entry = len(self._rows)
+        self._pages.append(location.page)
+        self._tables.append(location.table)
+        self._rows.append(location.row)
+        self._bboxes.extend(location.bbox if location.bbox else (math.nan,) * 4)
+        self._item_codes.append(item_code)
+        self._files.append(intern_text(pdf_filename))
+        key = (kind, intern_text(national_code.upper()))
+        self._by_code.setdefault(key, []).append(entry)
+
+    def find(
+        self,
+        kind: str,
+        national_code: str,
+        item_code: Optional[str] = None,
+        pdf_filename: Optional[str] = None
+    ) -> List[SourceEntry]:
+        """
+        Look up the locations of a national code's records.
+
+        Args:
+            kind: SourceKind value
+            national_code: National code to look up
+            item_code: Optional item code filter
+            pdf_filename: Optional PDF filename filter
+
+        Returns:
+            Matching entries in extraction order
+        """
+        results = []
+        for entry in self._by_code.get((kind, national_code.upper()), []):
+            if item_code is not None and self._item_codes[entry] != item_code:
+                continue
+            if pdf_filename is not None and self._files[entry] != pdf_filename:
+                continue
+            results.append(SourceEntry(self._item_codes[entry], self._files[entry], self._location(entry)))
+        return results
+
+    def _location(self, entry: int) -> SourceLocation:
+        """Rebuild the SourceLocation of an entry."""
+        bbox = tuple(self._bboxes[entry * 4:entry * 4 + 4])
+        return SourceLocation(
+            self._pages[entry],
+            self._tables[entry],
+            self._rows[entry],
+            None if math.isnan(bbox[0]) else bbox
+        )
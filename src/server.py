@@ -0,0 +1,77 @@
+"""
+Job server mode.
+
+Runs extraction, matching and export jobs for other workstations over
+local HTTP/JSON, so PDFs are parsed once on one machine.
+
+Usage:
+    From project root:
+        python -m src.server [--host HOST] [--port PORT] [--workers N] [--token TOKEN] [--root DIR ...] [--verbose]
+
+Clients must send the shared token (--token, the MAGIC_SERVER_TOKEN
+environment variable or SERVER_TOKEN; a random one is generated and
+printed if none is set), and jobs may only use files under the --root
+folders (default: the working directory).
+
+Example:
+    curl -X POST http://127.0.0.1:8765/jobs -H "Authorization: Bearer TOKEN" \\
+        -d '{"kind": "match", "pdf_files": ["..."], "excel_file": "..."}'
+    curl -H "Authorization: Bearer TOKEN" http://127.0.0.1:8765/jobs/<id>/events
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import secrets
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Ensure src directory is in the path
+src_dir = Path(__file__).parent
+if str(src_dir.parent) not in sys.path:
+    sys.path.insert(0, str(src_dir.parent))
+
+from src.config.settings import AppSettings, LoggingConfig
+from src.services.job_server import JobServer
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and serve until interrupted."""
+    settings = AppSettings()
+    parser = argparse.ArgumentParser(description="Serve extraction jobs over local HTTP.")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help=f"Interface (default: {settings.SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help=f"Port (default: {settings.SERVER_PORT})")
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS,
+        help=f"Worker processes (default: {settings.SERVER_WORKERS})"
+    )
+    parser.add_argument(
+        "--token", default=os.environ.get("MAGIC_SERVER_TOKEN") or settings.SERVER_TOKEN,
+        help="Shared token clients must send (default: MAGIC_SERVER_TOKEN, or a generated one)"
+    )
+    parser.add_argument(
+        "--root", action="append", dest="roots",
+        help="Folder jobs may read and write; repeat for several (default: the working directory)"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Log debug details of every row")
+    args = parser.parse_args(argv)
+
+    LoggingConfig(level=logging.DEBUG if args.verbose else logging.INFO, console=True).configure()
+
+    token = args.token
+    if not token:
+        token = secrets.token_urlsafe(24)
+        # Printed, not logged, so it does not end up in the log file
+        print(f"Job server token: {token}", file=sys.stderr)
+
+    try:
+        asyncio.run(JobServer(args.host, args.port, args.workers, token=token, roots=args.roots).serve())
+    except KeyboardInterrupt:
+        logging.info("Job server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
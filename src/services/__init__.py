@@ -1,8 +1,37 @@
 """Service layer for business logic."""
 
 from .pdf_extractor import PDFExtractor
-from .excel_handler import ExcelHandler
-from .data_validator import DataValidator
+from .excel_handler import ExcelHandler, MasterChangedError
+from .data_validator import DataValidator, IncrementalValidator
 from .export_service import ExportService
+from .master_index_cache import MasterIndexCache
+from .extraction_pipeline import ExtractionPipeline
+from .expiry_policy import ExpiryPolicy, ExpiryStatus
+from .layout_detector import LayoutDetector, UndetectedLayoutError
+from .run_snapshot import RunSnapshot, SnapshotStore
+from .folder_watcher import FolderWatcher
+from .job_server import JobServer
+from .history_store import HistoryStore
+from .delta_report import DeltaReport, compute_delta
 
-__all__ = ['PDFExtractor', 'ExcelHandler', 'DataValidator', 'ExportService']
+__all__ = [
+    'PDFExtractor',
+    'ExcelHandler',
+    'MasterChangedError',
+    'DataValidator',
+    'IncrementalValidator',
+    'ExportService',
+    'MasterIndexCache',
+    'ExtractionPipeline',
+    'ExpiryPolicy',
+    'ExpiryStatus',
+    'LayoutDetector',
+    'UndetectedLayoutError',
+    'RunSnapshot',
+    'SnapshotStore',
+    'FolderWatcher',
+    'JobServer',
+    'HistoryStore',
+    'DeltaReport',
+    'compute_delta',
+]
@@ -1,8 +1,400 @@
 """Data validation service - single responsibility: validate and match data."""
 
-from typing import Set, Dict, List, Tuple
+import copy
+import dataclasses
+from typing import Dict, Iterable, List, Optional, Set
 
+from src.config.extraction_config import ExtractionType
+from src.config.settings import AppSettings
+from src.models.code_index import Suggestion, TrigramIndex
 from src.models.extraction_data import ExtractionData, ExtractionResult
+from src.models.records import ItemRecord, UnmatchedRecord
+
+
+# Match status of a national code
+_MATCHED = "matched"
+_UNMATCHED = "unmatched"
+_MISSING = "missing"
+
+
+class IncrementalValidator:
+    """
+    Keeps an ExtractionResult in sync with changing extraction and Excel data.
+
+    The full match is computed once with set operations; afterwards only the
+    codes that changed are re-classified, so adding a PDF, switching the master
+    workbook or applying a manual edit costs time proportional to the change.
+
+    Each unmatched code gets near-match suggestions from a trigram index over
+    the Excel codes. A second index over the unmatched codes finds the
+    suggestions affected when Excel codes are added.
+    """
+
+    def __init__(
+        self,
+        extraction_data: ExtractionData,
+        excel_codes: Iterable[str],
+        suggestion_limit: Optional[int] = None,
+        max_distance: Optional[int] = None
+    ):
+        """
+        Initialize validator and compute the initial match.
+
+        Args:
+            extraction_data: Extraction data; later additions are picked up by refresh()
+            excel_codes: Codes found in Excel file
+            suggestion_limit: Suggestions per unmatched code (defaults to settings)
+            max_distance: Largest edit distance suggested (defaults to settings)
+        """
+        settings = AppSettings()
+        self.suggestion_limit = suggestion_limit if suggestion_limit is not None else settings.SUGGESTION_LIMIT
+        self.max_distance = max_distance if max_distance is not None else settings.SUGGESTION_MAX_DISTANCE
+
+        self.extraction_data = extraction_data
+        self.excel_codes: Set[str] = set(excel_codes)
+        # Manually entered balances: code -> report type -> balance
+        self.manual_balances: Dict[str, Dict[ExtractionType, float]] = {}
+        self.result = ExtractionResult()
+
+        # Accepted suggestions: PDF code -> Excel code, and the reverse
+        self.aliases: Dict[str, str] = {}
+        self._alias_sources: Dict[str, Set[str]] = {}
+
+        # Near-match lookups in both directions (derived; not pickled)
+        self._excel_trigrams: Optional[TrigramIndex] = TrigramIndex(self.excel_codes)
+        self._unmatched_trigrams: Optional[TrigramIndex] = TrigramIndex()
+        self._suggested_for: Dict[str, Set[str]] = {}  # Excel code -> unmatched codes suggesting it
+
+        balances = extraction_data.balances
+        matched = balances.keys() & self.excel_codes
+        for national_code, balance in balances.items():
+            if national_code in matched:
+                self.result.matched_codes[national_code] = balance
+                self.result.matched_by_type[national_code] = self._typed_balance(national_code)
+            else:
+                self.result.unmatched_by_code[national_code] = self._unmatched_rows(national_code)
+                self._add_unmatched(national_code)
+        self.result.missing = dict.fromkeys(self.excel_codes - balances.keys())
+        self._sync_issues()
+
+    def copy(self) -> "IncrementalValidator":
+        """
+        Copy the match state so it can be changed while the original is displayed.
+
+        Only the mutable match state is copied. The extraction data and the
+        issue lists pointing into it are shared, and the trigram indexes
+        share their posting lists until written, so the cost is proportional
+        to the number of codes rather than to the extracted data.
+
+        Returns:
+            An independent validator over the same extraction data
+        """
+        clone = copy.copy(self)
+        clone.excel_codes = set(self.excel_codes)
+        clone.manual_balances = {code: dict(typed) for code, typed in self.manual_balances.items()}
+        clone.result = dataclasses.replace(
+            self.result,
+            matched_codes=dict(self.result.matched_codes),
+            matched_by_type=dict(self.result.matched_by_type),
+            unmatched_by_code=dict(self.result.unmatched_by_code),
+            missing=dict(self.result.missing),
+            suggestions=dict(self.result.suggestions)
+        )
+        clone.aliases = dict(self.aliases)
+        clone._alias_sources = {code: set(sources) for code, sources in self._alias_sources.items()}
+        clone._excel_trigrams = self._excel_index.copy()
+        clone._unmatched_trigrams = self._unmatched_index.copy()
+        clone._suggested_for = {code: set(codes) for code, codes in self._suggested_for.items()}
+        return clone
+
+    def __getstate__(self) -> Dict:
+        """Pickle without the trigram indexes; they are rebuilt on first use."""
+        state = self.__dict__.copy()
+        state["_excel_trigrams"] = state["_unmatched_trigrams"] = None
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        """Restore a pickled validator (indexes are rebuilt lazily)."""
+        self.__dict__.update(state)
+
+    @property
+    def _excel_index(self) -> TrigramIndex:
+        """Trigram index over the Excel codes."""
+        if self._excel_trigrams is None:
+            self._excel_trigrams = TrigramIndex(self.excel_codes)
+        return self._excel_trigrams
+
+    @property
+    def _unmatched_index(self) -> TrigramIndex:
+        """Trigram index over the unmatched codes."""
+        if self._unmatched_trigrams is None:
+            self._unmatched_trigrams = TrigramIndex(self.result.unmatched_by_code)
+        return self._unmatched_trigrams
+
+    def refresh(self, codes: Iterable[str] = ()) -> ExtractionResult:
+        """
+        Re-classify codes whose extraction data changed (e.g. one more PDF was added).
+
+        Args:
+            codes: National codes with new or updated balances
+
+        Returns:
+            The updated ExtractionResult
+        """
+        for national_code in codes:
+            self._reclassify(national_code)
+        self._sync_issues()
+        return self.result
+
+    def set_excel_codes(self, excel_codes: Iterable[str]) -> ExtractionResult:
+        """
+        Switch to a different master workbook.
+
+        Args:
+            excel_codes: Codes found in the new Excel file
+
+        Returns:
+            The updated ExtractionResult
+        """
+        excel_codes = set(excel_codes)
+        return self.update_excel_codes(
+            added=excel_codes - self.excel_codes,
+            removed=self.excel_codes - excel_codes
+        )
+
+    def update_excel_codes(
+        self,
+        added: Iterable[str] = (),
+        removed: Iterable[str] = ()
+    ) -> ExtractionResult:
+        """
+        Apply codes added to or removed from the master workbook.
+
+        Args:
+            added: Codes now present in Excel
+            removed: Codes no longer present in Excel
+
+        Returns:
+            The updated ExtractionResult
+        """
+        changed: List[str] = []
+        stale_suggestions: Set[str] = set()
+
+        for code in added:
+            self.excel_codes.add(code)
+            self._excel_index.add(code)
+            changed.append(code)
+            # Unmatched codes close to the new code may now suggest it
+            stale_suggestions.update(
+                suggestion.code for suggestion in self._unmatched_index.search(code, self.max_distance)
+            )
+
+        for code in removed:
+            self.excel_codes.discard(code)
+            self._excel_index.discard(code)
+            changed.append(code)
+            stale_suggestions.update(self._suggested_for.pop(code, ()))
+            # Accepted suggestions pointing at a removed code no longer apply
+            for source in self._alias_sources.pop(code, ()):
+                del self.aliases[source]
+                changed.append(source)
+
+        for code in changed:
+            self._reclassify(code)
+        for code in stale_suggestions:
+            if code in self.result.unmatched_by_code:
+                self._update_suggestions(code)
+        return self.result
+
+    def apply_manual_balance(
+        self,
+        code: str,
+        balance: float,
+        extraction_type: ExtractionType
+    ) -> ExtractionResult:
+        """
+        Record a manually entered balance; it survives later refreshes.
+
+        Only the balance of the given report type (and so its Excel column)
+        is replaced; the code's other types keep their extracted balances.
+
+        Args:
+            code: Code to update
+            balance: New balance value
+            extraction_type: Report type whose balance is entered
+
+        Returns:
+            The updated ExtractionResult
+        """
+        code = code.upper()
+        self.manual_balances.setdefault(code, {})[extraction_type] = balance
+        self._reclassify(code)
+        return self.result
+
+    def accept_suggestion(self, code: str, excel_code: str) -> ExtractionResult:
+        """
+        Treat an unmatched PDF code as an existing Excel code.
+
+        The PDF code's balance is added to the Excel code's, and the PDF code
+        leaves the unmatched list. The mapping survives later refreshes.
+
+        Args:
+            code: Unmatched national code from the PDFs
+            excel_code: Excel code it should have been
+
+        Returns:
+            The updated ExtractionResult
+
+        Raises:
+            ValueError: If excel_code is not in the master workbook
+        """
+        code, excel_code = code.upper(), excel_code.upper()
+        if excel_code not in self.excel_codes:
+            raise ValueError(f"{excel_code} is not in the Excel file")
+
+        self.aliases[code] = excel_code
+        self._alias_sources.setdefault(excel_code, set()).add(code)
+        self._reclassify(code)
+        return self.result
+
+    def balances_by_type(self, default_type: ExtractionType) -> Dict[ExtractionType, Dict[str, float]]:
+        """
+        Split the matched balances by the report type of the PDFs they came from.
+
+        Accepted suggestions follow the type of the aliased code's PDFs, and
+        manual balances replace only the type they were entered for.
+
+        Args:
+            default_type: Type for balances extracted without a report type
+
+        Returns:
+            Dictionary mapping extraction type -> national code -> balance
+        """
+        typed: Dict[ExtractionType, Dict[str, float]] = {}
+        for national_code, by_type in self.result.matched_by_type.items():
+            if not by_type:
+                typed.setdefault(default_type, {})[national_code] = self.result.matched_codes[national_code]
+            for extraction_type, balance in by_type.items():
+                typed.setdefault(extraction_type, {})[national_code] = balance
+        return typed
+
+    def _reclassify(self, national_code: str) -> None:
+        """Move one code to the matched, unmatched or missing bucket."""
+        balances = self.extraction_data.balances
+
+        if national_code in self.aliases:
+            # Counted under its Excel code instead
+            self._set_status(national_code, None, None)
+            self._reclassify(self.aliases[national_code])
+            return
+
+        typed: Dict[ExtractionType, float] = {}
+        if (national_code in self.manual_balances or national_code in balances
+                or national_code in self._alias_sources):
+            typed = self._typed_balance(national_code)
+            balance = sum(typed.values()) if typed else balances.get(national_code, 0) + sum(
+                balances.get(source, 0) for source in self._alias_sources.get(national_code, ())
+            )
+            manual = national_code in self.manual_balances
+            status = _MATCHED if manual or national_code in self.excel_codes else _UNMATCHED
+        elif national_code in self.excel_codes:
+            status, balance = _MISSING, None
+        else:
+            status, balance = None, None
+
+        self._set_status(national_code, status, balance, typed)
+
+    def _typed_balance(self, national_code: str) -> Dict[ExtractionType, float]:
+        """Balance of a code and the codes aliased to it per report type, manual entries applied."""
+        codes = (national_code, *self._alias_sources.get(national_code, ()))
+        typed: Dict[ExtractionType, float] = {}
+        for extraction_type, balances in self.extraction_data.balances_by_type.items():
+            found = [balances[code] for code in codes if code in balances]
+            if found:
+                typed[extraction_type] = sum(found)
+        typed.update(self.manual_balances.get(national_code, {}))
+        return typed
+
+    def _set_status(
+        self,
+        national_code: str,
+        status: Optional[str],
+        balance: Optional[float],
+        typed: Optional[Dict[ExtractionType, float]] = None
+    ) -> None:
+        """Place a code in one bucket (or none), keeping its position if unchanged."""
+        result = self.result
+
+        # Only drop the code from buckets it no longer belongs to, so codes
+        # whose status is unchanged keep their position
+        if status != _MATCHED:
+            result.matched_codes.pop(national_code, None)
+            result.matched_by_type.pop(national_code, None)
+        if status != _UNMATCHED and national_code in result.unmatched_by_code:
+            del result.unmatched_by_code[national_code]
+            self._remove_unmatched(national_code)
+        if status != _MISSING:
+            result.missing.pop(national_code, None)
+
+        if status == _MATCHED:
+            result.matched_codes[national_code] = balance
+            result.matched_by_type[national_code] = typed or {}
+        elif status == _UNMATCHED:
+            is_new = national_code not in result.unmatched_by_code
+            result.unmatched_by_code[national_code] = self._unmatched_rows(national_code)
+            if is_new:
+                self._add_unmatched(national_code)
+        elif status == _MISSING:
+            result.missing[national_code] = None
+
+    def _unmatched_rows(self, national_code: str) -> List[UnmatchedRecord]:
+        """One unmatched row per item (batch) of a code not in Excel."""
+        balance = self.extraction_data.balances[national_code]
+        items = self.extraction_data.all_items.get(national_code) or [ItemRecord("", "", "")]
+        return [
+            UnmatchedRecord(national_code, item_code, item_name, balance, pdf_filename)
+            for item_code, item_name, pdf_filename in items
+        ]
+
+    def _add_unmatched(self, national_code: str) -> None:
+        """Index a newly unmatched code and look up its suggestions."""
+        self._unmatched_index.add(national_code)
+        self._update_suggestions(national_code)
+
+    def _remove_unmatched(self, national_code: str) -> None:
+        """Forget a code that is no longer unmatched."""
+        self._unmatched_index.discard(national_code)
+        self._unlink_suggestions(national_code, self.result.suggestions.pop(national_code, ()))
+
+    def _update_suggestions(self, national_code: str) -> None:
+        """(Re)compute the near-match suggestions of an unmatched code."""
+        self._unlink_suggestions(national_code, self.result.suggestions.get(national_code, ()))
+
+        suggestions = self._excel_index.suggest(national_code, self.suggestion_limit, self.max_distance)
+        if suggestions:
+            self.result.suggestions[national_code] = suggestions
+            for suggestion in suggestions:
+                self._suggested_for.setdefault(suggestion.code, set()).add(national_code)
+        else:
+            self.result.suggestions.pop(national_code, None)
+
+    def _unlink_suggestions(self, national_code: str, suggestions: Iterable[Suggestion]) -> None:
+        """Drop a code from the reverse map of the Excel codes it suggested."""
+        for suggestion in suggestions:
+            suggested_for = self._suggested_for.get(suggestion.code)
+            if suggested_for is not None:
+                suggested_for.discard(national_code)
+
+    def _sync_issues(self) -> None:
+        """Point the result's issue lists at the current extraction data (no copying)."""
+        data = self.extraction_data
+        self.result.expired_items = data.expired_items
+        self.result.expiring_soon_items = data.expiring_soon_items
+        self.result.duplicates = data.duplicates
+        self.result.cross_file_duplicates = data.cross_file_duplicates
+        self.result.zero_balance_items = data.zero_balance_items
+        self.result.sources = data.sources
+        self.result.source_files = data.source_files
 
 
 class DataValidator:
@@ -23,57 +415,40 @@ class DataValidator:
         Returns:
             ExtractionResult with matched, unmatched, and missing codes
         """
-        result = ExtractionResult()
-
-        # Copy issues from extraction data
-        result.expired_items = extraction_data.expired_items.copy()
-        result.duplicates = extraction_data.duplicates.copy()
-        result.zero_balance_items = extraction_data.zero_balance_items.copy()
-
-        # Match codes
-        for national_code, balance in extraction_data.balances.items():
-            if national_code in excel_codes:
-                result.matched_codes[national_code] = balance
-            else:
-                # Code not in Excel - add ALL items for this national code
-                items = extraction_data.all_items.get(national_code, [("", "", "")])
-
-                # Create one entry per item (shows all batches)
-                for item_code, item_name, pdf_filename in items:
-                    result.unmatched_codes.append((national_code, item_code, item_name, balance, pdf_filename))
-
-        # Find missing codes (in Excel but not in PDF)
-        for code in excel_codes:
-            if code not in extraction_data.balances:
-                result.missing_codes.append(code)
-
-        return result
+        return IncrementalValidator(extraction_data, excel_codes).result
 
     @staticmethod
     def update_manual_balance(
         extraction_result: ExtractionResult,
         code: str,
-        balance: float
+        balance: float,
+        extraction_type: ExtractionType
     ) -> ExtractionResult:
         """
         Update a balance with manual entry.
 
+        Prefer IncrementalValidator.apply_manual_balance when a validator is
+        available, so the edit survives later re-matching.
+
         Args:
             extraction_result: Current extraction result
             code: Code to update
             balance: New balance value
+            extraction_type: Report type whose balance is entered
 
         Returns:
             Updated extraction result
         """
         code = code.upper()
 
-        # Add or update in matched codes
-        extraction_result.matched_codes[code] = balance
+        # Add or update in matched codes; the code's other types are kept
+        by_type = dict(extraction_result.matched_by_type.get(code, {}))
+        by_type[extraction_type] = balance
+        extraction_result.matched_by_type[code] = by_type
+        extraction_result.matched_codes[code] = sum(by_type.values())
 
         # Remove from missing codes if present
-        if code in extraction_result.missing_codes:
-            extraction_result.missing_codes.remove(code)
+        extraction_result.missing.pop(code, None)
 
         return extraction_result
 
@@ -93,6 +468,8 @@ class DataValidator:
             'missing': result.missing_count,
             'unmatched': result.unmatched_count,
             'expired': result.expired_count,
+            'expiring_soon': result.expiring_soon_count,
             'duplicates': result.duplicate_count,
+            'cross_file': result.cross_file_count,
             'zero_balance': result.zero_balance_count,
         }
@@ -0,0 +1,148 @@
+"""Delta report - compares a run's balances with a previous run or the master workbook."""
+
+from dataclasses import dataclass, field
+from numbers import Number
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from src.config.extraction_config import ExtractionConfig, ExtractionType
+from src.config.settings import AppSettings
+from src.models.master_index import MasterIndex
+
+# Balances per report type: extraction type -> national code -> balance
+TypedBalances = Dict[ExtractionType, Dict[str, float]]
+
+
+class DeltaKind:
+    """How a code's balance differs from the baseline."""
+    CHANGED = "changed"
+    NEW = "new"  # Not in the baseline
+    DISAPPEARED = "disappeared"  # In the baseline only
+
+
+class DeltaRecord(NamedTuple):
+    """One code's balance change under one report type."""
+    national_code: str
+    extraction_type: str
+    previous: Optional[float]
+    current: Optional[float]
+    change: Optional[float]
+    change_percent: Optional[float]  # None when the previous balance is missing or zero
+    kind: str  # DeltaKind value
+    large_swing: bool
+
+
+@dataclass
+class DeltaReport:
+    """Differences between a run and a baseline (unchanged balances are left out)."""
+
+    # Human-readable description of the baseline (e.g. "run 12 (2026-10-12T09:30:00)")
+    baseline: str
+
+    # Changed, new and disappeared balances, ordered by type then code
+    records: List[DeltaRecord] = field(default_factory=list)
+
+    # Number of balances equal in both
+    unchanged_count: int = 0
+
+    @property
+    def large_swings(self) -> List[DeltaRecord]:
+        """Changes at or above the swing thresholds."""
+        return [record for record in self.records if record.large_swing]
+
+    @property
+    def new_codes(self) -> List[DeltaRecord]:
+        """Balances without a baseline value."""
+        return [record for record in self.records if record.kind == DeltaKind.NEW]
+
+    @property
+    def disappeared_codes(self) -> List[DeltaRecord]:
+        """Baseline balances missing from the run."""
+        return [record for record in self.records if record.kind == DeltaKind.DISAPPEARED]
+
+    @property
+    def changed_count(self) -> int:
+        """Number of balances that changed value."""
+        return sum(1 for record in self.records if record.kind == DeltaKind.CHANGED)
+
+
+def compute_delta(
+    current: TypedBalances,
+    previous: TypedBalances,
+    baseline: str,
+    swing_percent: Optional[float] = None,
+    swing_min_change: Optional[float] = None
+) -> DeltaReport:
+    """
+    Compare balances with a baseline.
+
+    Codes are joined through hash lookups (set intersections and
+    differences of the two code sets per type), so the cost is linear in the
+    number of codes.
+
+    Args:
+        current: Balances of the run being reviewed
+        previous: Baseline balances
+        baseline: Description of the baseline
+        swing_percent: Relative change flagged as a large swing (defaults to settings)
+        swing_min_change: Smallest absolute change flagged as a large swing (defaults to settings)
+
+    Returns:
+        DeltaReport of the differences
+    """
+    settings = AppSettings()
+    swing_percent = settings.DELTA_SWING_PERCENT if swing_percent is None else swing_percent
+    swing_min_change = settings.DELTA_SWING_MIN_CHANGE if swing_min_change is None else swing_min_change
+
+    report = DeltaReport(baseline)
+    for extraction_type in sorted(current.keys() | previous.keys(), key=lambda t: t.value):
+        now = current.get(extraction_type, {})
+        before = previous.get(extraction_type, {})
+        type_name = extraction_type.value
+
+        for national_code in sorted(now.keys() | before.keys()):
+            new_balance = now.get(national_code)
+            old_balance = before.get(national_code)
+            if new_balance is None:
+                change = -old_balance
+                report.records.append(DeltaRecord(
+                    national_code, type_name, old_balance, None, change, None, DeltaKind.DISAPPEARED,
+                    abs(change) >= swing_min_change
+                ))
+            elif old_balance is None:
+                report.records.append(DeltaRecord(
+                    national_code, type_name, None, new_balance, new_balance, None, DeltaKind.NEW,
+                    abs(new_balance) >= swing_min_change
+                ))
+            elif new_balance == old_balance:
+                report.unchanged_count += 1
+            else:
+                change = new_balance - old_balance
+                percent = change / abs(old_balance) * 100 if old_balance else None
+                large = abs(change) >= swing_min_change and (percent is None or abs(percent) >= swing_percent)
+                report.records.append(DeltaRecord(
+                    national_code, type_name, old_balance, new_balance, change, percent, DeltaKind.CHANGED, large
+                ))
+    return report
+
+
+def master_balances(index: MasterIndex, extraction_types: Iterable[ExtractionType]) -> TypedBalances:
+    """
+    Read the values currently in the master workbook's target columns.
+
+    Args:
+        index: Cached master index (holds the target columns' existing values)
+        extraction_types: Types whose columns to read
+
+    Returns:
+        Numeric cell values per type (empty and non-numeric cells are left out)
+    """
+    typed: TypedBalances = {}
+    for extraction_type in extraction_types:
+        values = index.column_values.get(ExtractionConfig.get_excel_column(extraction_type), {})
+        balances = typed[extraction_type] = {}
+        for national_code, rows in index.code_rows.items():
+            # A repeated code is written to every row; its first row is representative
+            value = values.get(rows[0])
+            if isinstance(value, Number) and not isinstance(value, bool):
+                balances[national_code] = float(value)
+    return typed
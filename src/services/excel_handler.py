@@ -1,14 +1,23 @@
 """Excel file operations service - single responsibility: read/write Excel files."""
 
 import logging
-from typing import Set, Dict
+import threading
+from typing import Callable, Optional, Set, Dict
 from datetime import datetime
 from openpyxl import load_workbook
 from openpyxl.workbook import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 
 from src.config.settings import AppSettings
-from src.config.extraction_config import ExtractionType, ExtractionConfig
+from src.config.extraction_config import ExtractionConfig
+from src.models.master_index import MasterIndex
+from src.models.save_preview import SavePreview
+from src.utils.cancellation import raise_if_cancelled
+from src.utils.profiling import profiled
+
+
+class MasterChangedError(Exception):
+    """Raised when the master workbook changed after its save preview was built."""
 
 
 class ExcelHandler:
@@ -24,6 +33,7 @@ class ExcelHandler:
         self.file_path = file_path
         self.settings = AppSettings()
 
+    @profiled("excel_read")
     def read_codes(self) -> Set[str]:
         """
         Read all national codes from Excel file.
@@ -63,53 +73,114 @@ class ExcelHandler:
         wb.close()
         return code_rows
 
-    def update_balances(
+    @profiled("excel_read")
+    def read_index(self) -> MasterIndex:
+        """
+        Build the master index: code -> rows plus existing values of the balance columns.
+
+        Uses openpyxl's read-only streaming mode, which is much faster and
+        lighter than a full load for large workbooks.
+
+        Returns:
+            MasterIndex for this workbook
+        """
+        index = MasterIndex(file_path=self.file_path)
+        target_columns = sorted({mapping.excel_column for mapping in ExtractionConfig.MAPPINGS.values()})
+        for column in target_columns:
+            index.column_values[column] = {}
+
+        wb = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            ws = wb.active
+            start_row = self.settings.EXCEL_START_ROW
+            for row_number, row in enumerate(ws.iter_rows(min_row=start_row, values_only=True), start=start_row):
+                if len(row) <= self.settings.CODE_COLUMN:
+                    continue
+                code = row[self.settings.CODE_COLUMN]
+                if not code or not isinstance(code, str):
+                    continue
+
+                index.add_row(code.strip().upper(), row_number)
+                for column in target_columns:
+                    if column < len(row) and row[column] is not None:
+                        index.column_values[column][row_number] = row[column]
+        finally:
+            wb.close()
+
+        logging.info(f"Indexed {index.code_count} codes from {self.file_path}")
+        return index
+
+    # Cells between progress reports / cancellation checks while saving
+    PROGRESS_INTERVAL = 500
+
+    @profiled("excel_save")
+    def save_changes(
         self,
-        balances: Dict[str, float],
-        extraction_type: ExtractionType
-    ) -> str:
+        preview: SavePreview,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Optional[str]:
         """
-        Update Excel file with extracted balances.
+        Write only the changed and new cells of a save preview.
+
+        Cells that already hold their balance are not touched, and no output
+        file is produced when nothing changed.
 
         Args:
-            balances: Dictionary of code -> balance
-            extraction_type: Type of extraction (determines target column)
+            preview: Preview built from this workbook's master index
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, the update stops before saving
 
         Returns:
-            Path to saved file
+            Path to saved file, or None if the workbook is already up to date
 
         Raises:
+            MasterChangedError: If the workbook is no longer the file the preview was
+                built from (rows may have moved; nothing is written)
+            OperationCancelled: If cancel_event was set (nothing is written)
             Exception: If save fails
         """
+        writes = preview.writes
+        if not writes:
+            logging.info(f"{self.file_path} is up to date; no output written")
+            return None
+
+        # The preview may have been open for a while; its rows are only valid
+        # for the workbook it was built from
+        if preview.fingerprint is not None and not preview.fingerprint.matches_file(self.file_path):
+            raise MasterChangedError(
+                f"{self.file_path} changed after the save preview was built; build the preview again"
+            )
+
+        if progress_callback:
+            progress_callback("Loading Excel file...")
         wb = load_workbook(self.file_path)
         ws = wb.active
+        raise_if_cancelled(cancel_event)
 
-        # Get target column based on extraction type
-        col_idx = ExtractionConfig.get_excel_column(extraction_type)
-
-        updated = 0
-        for row in ws.iter_rows(min_row=self.settings.EXCEL_START_ROW):
-            code = row[self.settings.CODE_COLUMN].value
-            if not code or not isinstance(code, str):
-                continue
+        # Rows come from the cached index, so only the target cells are visited
+        for cell_num, cell in enumerate(writes, start=1):
+            if cell_num % self.PROGRESS_INTERVAL == 0:
+                raise_if_cancelled(cancel_event)
+                if progress_callback:
+                    progress_callback(f"Updating cells {cell_num}/{len(writes)}...")
+            ws.cell(row=cell.row, column=cell.column + 1, value=cell.value)
 
-            code = code.strip().upper()
-
-            if code in balances:
-                # Write to target column (convert 0-based to 1-based)
-                ws.cell(row=row[0].row, column=col_idx + 1, value=balances[code])
-                updated += 1
-                logging.debug(f"Updated {code} with balance {balances[code]}")
-
-        # Generate output filename
         timestamp = datetime.now().strftime(self.settings.OUTPUT_DATE_FORMAT)
         output_file = f"{self.settings.OUTPUT_FILE_PREFIX}_{timestamp}.xlsx"
 
-        # Save file
+        # Last chance to cancel before anything is written to disk
+        raise_if_cancelled(cancel_event)
+
+        if progress_callback:
+            progress_callback(f"Saving {output_file}...")
         wb.save(output_file)
         wb.close()
 
-        logging.info(f"Saved {output_file} with {updated} updates")
+        logging.info(
+            f"Saved {output_file} with {len(writes)} updates "
+            f"({len(preview.unchanged)} unchanged cells skipped)"
+        )
         return output_file
 
     def get_worksheet(self) -> Worksheet:
@@ -0,0 +1,104 @@
+"""Expiry policy - classifies expiry dates against cutoffs fixed once per run."""
+
+from dataclasses import dataclass
+from datetime import date
+from enum import Enum
+from typing import List, Optional, Sequence, Tuple
+
+from src.config.settings import AppSettings
+
+# (day, month, year) as returned by parse_expiry_date
+DateParts = Tuple[int, int, int]
+
+
+class ExpiryStatus(Enum):
+    """How an item's expiry date relates to the run's cutoffs."""
+    VALID = "valid"
+    EXPIRING_SOON = "expiring_soon"
+    EXPIRED = "expired"
+
+
+def month_index(year: int, month: int) -> int:
+    """Number of months since year 0, so month ranges compare as plain integers."""
+    return year * 12 + (month - 1)
+
+
+@dataclass(frozen=True)
+class ExpiryPolicy:
+    """
+    Expiry cutoffs computed once from a reference date.
+
+    An item is expired once its expiry month is over (expiry month before the
+    reference month); items expiring within ``horizon_months`` months,
+    starting with the reference month, are "expiring soon". Because the
+    reference date is captured once, a run that crosses midnight or the end
+    of a month classifies every item the same way.
+    """
+
+    reference_date: date
+    horizon_months: int = 0
+
+    @classmethod
+    def for_today(cls, horizon_months: Optional[int] = None) -> "ExpiryPolicy":
+        """
+        Create a policy for the current date.
+
+        Args:
+            horizon_months: Near-expiry horizon in months (defaults to settings)
+
+        Returns:
+            ExpiryPolicy with today's date as reference
+        """
+        if horizon_months is None:
+            horizon_months = AppSettings().EXPIRY_HORIZON_MONTHS
+        return cls(date.today(), horizon_months)
+
+    @property
+    def expired_before(self) -> int:
+        """Month index below which items are expired (the reference month)."""
+        return month_index(self.reference_date.year, self.reference_date.month)
+
+    @property
+    def expiring_before(self) -> int:
+        """Month index below which non-expired items are expiring soon."""
+        return self.expired_before + self.horizon_months
+
+    def classify(self, date_parts: Optional[DateParts]) -> ExpiryStatus:
+        """
+        Classify one expiry date.
+
+        Args:
+            date_parts: (day, month, year), or None if no date was found
+
+        Returns:
+            ExpiryStatus of the date (VALID when there is no date)
+        """
+        return self.classify_batch([date_parts])[0]
+
+    def classify_batch(self, dates: Sequence[Optional[DateParts]]) -> List[ExpiryStatus]:
+        """
+        Classify many expiry dates against the same cutoffs.
+
+        Args:
+            dates: (day, month, year) tuples, or None where no date was found
+
+        Returns:
+            ExpiryStatus per date, in the same order
+        """
+        expired_before = self.expired_before
+        expiring_before = self.expiring_before
+        valid, soon, expired = ExpiryStatus.VALID, ExpiryStatus.EXPIRING_SOON, ExpiryStatus.EXPIRED
+
+        statuses = []
+        for date_parts in dates:
+            if date_parts is None:
+                statuses.append(valid)
+                continue
+            index = date_parts[2] * 12 + (date_parts[1] - 1)
+            if index < expired_before:
+                statuses.append(expired)
+            elif index < expiring_before:
+                statuses.append(soon)
+            else:
+                statuses.append(valid)
+        return statuses
@@ -1,16 +1,51 @@
 """Export service - single responsibility: export data to Excel files."""
 
-from typing import List, Tuple
+import threading
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
 import pandas as pd
+from openpyxl import Workbook
+
+from src.models.extraction_data import ExtractionResult
+from src.services.delta_report import DeltaReport
+from src.utils.cancellation import raise_if_cancelled
+
+# Rows between progress reports / cancellation checks while streaming a workbook
+_STREAM_INTERVAL = 1000
 
 
 class ExportService:
     """Handles exporting data to Excel files."""
 
+    @staticmethod
+    def _write_frame(
+        df: pd.DataFrame,
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Write a DataFrame to Excel, honouring cancellation before the write.
+
+        Args:
+            df: Data to write
+            file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
+
+        Raises:
+            OperationCancelled: If cancel_event was set
+        """
+        raise_if_cancelled(cancel_event)
+        if progress_callback:
+            progress_callback(f"Writing {len(df)} rows to Excel...")
+        df.to_excel(file_path, index=False)
+
     @staticmethod
     def export_unmatched_codes(
         unmatched_codes: List[Tuple[str, str, str, float, str]],
-        file_path: str
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> None:
         """
         Export unmatched codes (in PDF but not in Excel) to Excel file.
@@ -18,17 +53,22 @@ class ExportService:
         Args:
             unmatched_codes: List of (national_code, item_code, name, balance, pdf_filename) tuples
             file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
 
         Raises:
+            OperationCancelled: If cancel_event was set
             Exception: If export fails
         """
         df = pd.DataFrame(unmatched_codes, columns=["National Code", "Item Code", "Item Name", "Balance", "PDF File"])
-        df.to_excel(file_path, index=False)
+        ExportService._write_frame(df, file_path, progress_callback, cancel_event)
 
     @staticmethod
     def export_expired_items(
         expired_items: List[Tuple[str, str, str, str, str]],
-        file_path: str
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> None:
         """
         Export expired items to Excel file.
@@ -36,35 +76,75 @@ class ExportService:
         Args:
             expired_items: List of (national_code, item_code, name, expiry_date, pdf_filename) tuples
             file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
 
         Raises:
+            OperationCancelled: If cancel_event was set
             Exception: If export fails
         """
         df = pd.DataFrame(expired_items, columns=["National Code", "Item Code", "Item Name", "Expiry Date", "PDF File"])
-        df.to_excel(file_path, index=False)
+        ExportService._write_frame(df, file_path, progress_callback, cancel_event)
+
+    @staticmethod
+    def export_expiring_soon_items(
+        expiring_soon_items: List[Tuple[str, str, str, str, str]],
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Export items expiring soon to Excel file.
+
+        Args:
+            expiring_soon_items: List of (national_code, item_code, name, expiry_date, pdf_filename) tuples
+            file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
+
+        Raises:
+            OperationCancelled: If cancel_event was set
+            Exception: If export fails
+        """
+        df = pd.DataFrame(
+            expiring_soon_items,
+            columns=["National Code", "Item Code", "Item Name", "Expiry Date", "PDF File"]
+        )
+        ExportService._write_frame(df, file_path, progress_callback, cancel_event)
 
     @staticmethod
     def export_duplicates(
-        duplicates: List[Tuple[str, str, str, str]],
-        file_path: str
+        duplicates: List[Tuple[str, str, str, str, str, int, int, int]],
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> None:
         """
         Export duplicate codes to Excel file.
 
         Args:
-            duplicates: List of (national_code, item_code, name, pdf_filename) tuples - ALL occurrences
+            duplicates: List of (national_code, item_code, name, pdf_filename, category, page, table, row)
+                tuples - ALL occurrences
             file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
 
         Raises:
+            OperationCancelled: If cancel_event was set
             Exception: If export fails
         """
-        df = pd.DataFrame(duplicates, columns=["National Code", "Item Code", "Item Name", "PDF File"])
-        df.to_excel(file_path, index=False)
+        df = pd.DataFrame(
+            duplicates,
+            columns=["National Code", "Item Code", "Item Name", "PDF File", "Category", "Page", "Table", "Row"]
+        )
+        ExportService._write_frame(df, file_path, progress_callback, cancel_event)
 
     @staticmethod
     def export_zero_balance_items(
         zero_balance_items: List[Tuple[str, str, str, str]],
-        file_path: str
+        file_path: str,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
     ) -> None:
         """
         Export zero balance items to Excel file.
@@ -72,9 +152,80 @@ class ExportService:
         Args:
             zero_balance_items: List of (national_code, item_code, name, pdf_filename) tuples
             file_path: Output file path
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
 
         Raises:
+            OperationCancelled: If cancel_event was set
             Exception: If export fails
         """
         df = pd.DataFrame(zero_balance_items, columns=["National Code", "Item Code", "Item Name", "PDF File"])
-        df.to_excel(file_path, index=False)
+        ExportService._write_frame(df, file_path, progress_callback, cancel_event)
+
+    @staticmethod
+    def export_issue_report(
+        result: ExtractionResult,
+        file_path: str,
+        delta: Optional[DeltaReport] = None,
+        progress_callback: Optional[Callable[[str], None]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Export every issue list (and optionally a delta report) as sheets of one workbook.
+
+        Rows are streamed to a write-only workbook in a single pass, so no
+        DataFrame copy of the lists is built.
+
+        Args:
+            result: Extraction result holding the issue lists
+            file_path: Output file path
+            delta: Optional comparison with a previous run, written as a "Delta" sheet
+            progress_callback: Optional callback function for progress updates
+            cancel_event: Optional event; when set, nothing is written
+
+        Raises:
+            OperationCancelled: If cancel_event was set
+            Exception: If export fails
+        """
+        sheets: List[Tuple[str, Sequence[str], Iterable[tuple]]] = [
+            ("Unmatched", ["National Code", "Item Code", "Item Name", "Balance", "PDF File"],
+             result.unmatched_codes),
+            ("Expired", ["National Code", "Item Code", "Item Name", "Expiry Date", "PDF File"],
+             result.expired_items),
+            ("Expiring Soon", ["National Code", "Item Code", "Item Name", "Expiry Date", "PDF File"],
+             result.expiring_soon_items),
+            ("Duplicates", ["National Code", "Item Code", "Item Name", "PDF File", "Category", "Page", "Table", "Row"],
+             result.duplicates),
+            ("Zero Balance", ["National Code", "Item Code", "Item Name", "PDF File"],
+             result.zero_balance_items),
+        ]
+        if delta is not None:
+            sheets.append((
+                "Delta",
+                ["National Code", "Type", f"Previous ({delta.baseline})", "Current", "Change", "Change %",
+                 "Status", "Large Swing"],
+                (
+                    (record.national_code, record.extraction_type, record.previous, record.current,
+                     record.change, None if record.change_percent is None else round(record.change_percent, 1),
+                     record.kind, "Yes" if record.large_swing else "")
+                    for record in delta.records
+                )
+            ))
+
+        wb = Workbook(write_only=True)
+        for title, headers, rows in sheets:
+            raise_if_cancelled(cancel_event)
+            if progress_callback:
+                progress_callback(f"Writing {title}...")
+            ws = wb.create_sheet(title)
+            ws.append(list(headers))
+            for count, row in enumerate(rows, start=1):
+                ws.append(list(row))
+                if count % _STREAM_INTERVAL == 0:
+                    raise_if_cancelled(cancel_event)
+
+        # Last chance to cancel before anything is written to disk
+        raise_if_cancelled(cancel_event)
+        if progress_callback:
+            progress_callback("Saving report...")
+        wb.save(file_path)
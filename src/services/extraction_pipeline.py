@@ -0,0 +1,219 @@
+"""Extraction pipeline - overlaps master workbook loading with PDF parsing."""
+
+import logging
+import os
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from src.config.extraction_config import ExtractionType
+from src.models.extraction_data import ExtractionData, ExtractionResult
+from src.models.extraction_events import BalanceEvent, ExtractionEvent, FileCompletedEvent
+from src.services.data_validator import IncrementalValidator
+from src.services.expiry_policy import ExpiryPolicy
+from src.services.layout_detector import LayoutDetector
+from src.services.master_index_cache import MasterIndexCache
+from src.services.pdf_extractor import PDFExtractor
+from src.services.run_snapshot import SnapshotStore
+from src.utils.profiling import profiled
+from src.utils.run_metrics import Counter, RunMetrics, Stage
+
+
+class ExtractionPipeline:
+    """
+    Runs extraction, Excel loading and matching as overlapping stages.
+
+    The master index is loaded on a background thread while PDFs are parsed
+    on the calling thread. Once the index is available, the codes touched by
+    each completed PDF are re-matched right away, so nothing is left to match
+    when the last file finishes.
+
+    With a snapshot store, unchanged PDFs are not parsed again: their cached
+    events are replayed into the run's ExtractionData instead.
+
+    A PDF that fails to extract is skipped and reported in failed_files; the
+    rest of the batch carries on. Stage timings and counters accumulate in
+    metrics (reset by run()).
+    """
+
+    def __init__(
+        self,
+        extraction_type: ExtractionType,
+        master_index_cache: MasterIndexCache,
+        layout_detector: Optional[LayoutDetector] = None,
+        snapshot_store: Optional[SnapshotStore] = None,
+        choose_type: Optional[Callable[[str], Optional[ExtractionType]]] = None
+    ):
+        """
+        Initialize pipeline.
+
+        Args:
+            extraction_type: Type of extraction (Stock, Free, or Buy); the fallback
+                type when a layout detector is given
+            master_index_cache: Cache providing the master workbook index
+            layout_detector: Optional detector choosing the type of each PDF
+            snapshot_store: Optional cache of per-file extraction events
+            choose_type: Optional callback(pdf_file) choosing Free or Buy for
+                reports the detector cannot tell apart (None skips the file;
+                without a callback such files fail)
+        """
+        self.extraction_type = extraction_type
+        self.master_index_cache = master_index_cache
+        self.layout_detector = layout_detector
+        self.snapshot_store = snapshot_store
+        self.choose_type = choose_type
+
+        # Matching state, reset per run; the validator is kept after the run
+        # so callers can apply Excel changes and manual edits incrementally
+        self._excel_future: Optional[Future] = None
+        self.validator: Optional[IncrementalValidator] = None
+
+        # PDF path -> error message of the files the last iter_events() skipped
+        self.failed_files: Dict[str, str] = {}
+        # PDF path -> type chosen through choose_type in the last iter_events()
+        self.chosen_types: Dict[str, ExtractionType] = {}
+        self.metrics = RunMetrics()
+
+    def run(
+        self,
+        pdf_files: List[str],
+        excel_file: str,
+        progress_callback: Optional[Callable[[str], None]] = None
+    ) -> Tuple[ExtractionResult, Set[str]]:
+        """
+        Extract PDFs and match them against the master workbook.
+
+        Args:
+            pdf_files: List of PDF file paths
+            excel_file: Path to the master workbook
+            progress_callback: Optional callback function for progress updates
+
+        Returns:
+            Tuple of (ExtractionResult, Excel codes)
+        """
+        self.validator = None
+        self.metrics = RunMetrics()
+        started = time.perf_counter()
+
+        # Stage 1: start loading Excel (no-op if already pre-warmed and unchanged)
+        self._excel_future = self.master_index_cache.prewarm(excel_file)
+
+        # Stage 2: parse PDFs, re-matching each file's codes as soon as Excel is ready
+        extraction_data = ExtractionData()
+        touched_codes: Set[str] = set()
+        for event in self.iter_events(pdf_files, progress_callback):
+            extraction_data.apply(event)
+            if isinstance(event, BalanceEvent):
+                touched_codes.add(event.national_code.upper())
+            elif isinstance(event, FileCompletedEvent):
+                if self._match(extraction_data, touched_codes, wait=False):
+                    touched_codes.clear()
+
+        # Stage 3: wait for Excel if it is still loading, then match the remainder
+        if self.validator is None and progress_callback:
+            progress_callback("Reading Excel file...")
+        self._match(extraction_data, touched_codes, wait=True)
+        if self.snapshot_store is not None:
+            self.snapshot_store.flush()
+
+        if progress_callback:
+            progress_callback("Validating and matching data...")
+        with self.metrics.stage(Stage.MATCHING):
+            result = self.validator.refresh()
+        self.metrics.add_time(Stage.EXTRACTION, time.perf_counter() - started)
+        return result, self.validator.excel_codes
+
+    def iter_events(
+        self,
+        pdf_files: List[str],
+        progress_callback: Optional[Callable[[str], None]] = None
+    ) -> Iterator[ExtractionEvent]:
+        """
+        Yield the events of every PDF, replaying cached events of unchanged files.
+
+        Args:
+            pdf_files: List of PDF file paths
+            progress_callback: Optional callback function for progress updates
+
+        Yields:
+            Extraction events, each file ending with its FileCompletedEvent
+            (files that fail to extract yield nothing and are added to failed_files)
+        """
+        self.failed_files = {}
+        expiry_policy = ExpiryPolicy.for_today()
+        metrics = self.metrics
+        extractor = PDFExtractor(
+            self.extraction_type, expiry_policy, layout_detector=self.layout_detector, metrics=metrics,
+            choose_type=self.choose_type
+        )
+        self.chosen_types = extractor.chosen_types
+        options = self._extraction_options(expiry_policy)
+
+        for i, pdf_file in enumerate(pdf_files):
+            filename = os.path.basename(pdf_file)
+            if self.snapshot_store is not None:
+                with metrics.stage(Stage.CACHE_REPLAY):
+                    cached_events = self.snapshot_store.cached_events(pdf_file, options)
+                if cached_events is not None:
+                    metrics.count(Counter.FILES)
+                    metrics.count(Counter.CACHE_HITS)
+                    if progress_callback:
+                        progress_callback(f"Reusing PDF {i+1}/{len(pdf_files)}: {filename}")
+                    logging.info(f"{filename}: unchanged, reusing cached extraction")
+                    yield from cached_events
+                    continue
+                metrics.count(Counter.CACHE_MISSES)
+
+            if progress_callback:
+                progress_callback(f"Processing PDF {i+1}/{len(pdf_files)}: {filename}")
+            try:
+                # Collected first so a file that fails halfway adds nothing
+                with profiled("pdf_extraction"):
+                    file_events = list(extractor.iter_events([pdf_file]))
+            except Exception as e:
+                logging.error(f"Failed to extract {filename}: {e}")
+                self.failed_files[pdf_file] = str(e) or type(e).__name__
+                metrics.count(Counter.FAILED_FILES)
+                continue
+
+            if self.snapshot_store is not None:
+                # Checkpointed right away, so a crash later in the batch keeps this file
+                self.snapshot_store.store_events(pdf_file, options, file_events)
+            yield from file_events
+
+    def _extraction_options(self, expiry_policy: ExpiryPolicy) -> Hashable:
+        """Settings that change the events extracted from a file (the cache key besides its content)."""
+        return (
+            self.extraction_type.value,
+            self.layout_detector is not None,
+            expiry_policy.expired_before,
+            expiry_policy.expiring_before,
+        )
+
+    def _match(self, extraction_data: ExtractionData, touched_codes: Set[str], wait: bool) -> bool:
+        """
+        Match codes touched since the last call against the Excel codes.
+
+        Args:
+            extraction_data: Accumulated extraction data
+            touched_codes: Codes with new or updated balances
+            wait: Block until the Excel index is loaded (otherwise defer if not ready)
+
+        Returns:
+            True if the codes were matched, False if deferred
+        """
+        if self.validator is None:
+            if not wait and not self._excel_future.done():
+                return False
+            # Re-raises any error from the Excel stage; the first match covers
+            # everything extracted so far
+            with self.metrics.stage(Stage.EXCEL_WAIT):
+                excel_codes = self._excel_future.result().codes
+            logging.debug(f"Excel index ready with {len(excel_codes)} codes")
+            with self.metrics.stage(Stage.MATCHING):
+                self.validator = IncrementalValidator(extraction_data, excel_codes)
+            return True
+
+        with self.metrics.stage(Stage.MATCHING):
+            self.validator.refresh(touched_codes)
+        return True
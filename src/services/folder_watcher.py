@@ -0,0 +1,244 @@
+"""Folder watcher - extracts PDFs as they arrive in a folder (headless)."""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.config.extraction_config import ExtractionType
+from src.config.settings import AppSettings
+from src.models.extraction_data import ExtractionData
+from src.models.extraction_events import BalanceEvent
+from src.models.master_index import MasterIndex
+from src.services.data_validator import IncrementalValidator
+from src.services.expiry_policy import ExpiryPolicy
+from src.services.extraction_pipeline import ExtractionPipeline
+from src.services.layout_detector import LayoutDetector
+from src.services.master_index_cache import MasterIndexCache
+from src.services.run_snapshot import SnapshotStore
+from src.utils.run_metrics import RunMetrics, Stage
+
+# (size, mtime_ns) of a file as seen by a scan
+FileSignature = Tuple[int, int]
+
+
+class FolderWatcher:
+    """
+    Keeps an ExtractionResult in sync with the PDFs in a folder.
+
+    The folder is polled (no platform file-system events needed). A file is
+    picked up once its size and mtime are the same in two consecutive scans,
+    so half-copied files are never parsed. New files are extracted and
+    re-matched incrementally; when a file is modified or removed, the data is
+    rebuilt by replaying the per-file cache, which only re-parses that file.
+
+    Updates are debounced: ``on_update`` runs once the folder has been quiet
+    for ``debounce`` seconds (or ``max_delay`` seconds after the first
+    unreported change), so a burst of arrivals causes a single write.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        excel_file: str,
+        extraction_type: ExtractionType,
+        master_index_cache: MasterIndexCache,
+        snapshot_store: Optional[SnapshotStore] = None,
+        layout_detector: Optional[LayoutDetector] = None,
+        on_update: Optional[Callable[[IncrementalValidator], None]] = None,
+        poll_interval: Optional[float] = None,
+        debounce: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        """
+        Initialize watcher.
+
+        Args:
+            folder: Folder to watch for PDF files
+            excel_file: Path to the master workbook
+            extraction_type: Type of extraction (the fallback type with a layout detector)
+            master_index_cache: Cache providing the master workbook index
+            snapshot_store: Optional cache of per-file extraction events
+            layout_detector: Optional detector choosing the type of each PDF
+            on_update: Callback receiving the validator when an update is due
+            poll_interval: Seconds between scans (defaults to settings)
+            debounce: Quiet seconds before an update (defaults to settings)
+            max_delay: Longest delay of an update during constant changes (defaults to settings)
+        """
+        settings = AppSettings()
+        self.folder = folder
+        self.excel_file = excel_file
+        self.master_index_cache = master_index_cache
+        self.on_update = on_update
+        self.poll_interval = poll_interval if poll_interval is not None else settings.WATCH_POLL_INTERVAL
+        self.debounce = debounce if debounce is not None else settings.WATCH_DEBOUNCE
+        self.max_delay = max_delay if max_delay is not None else settings.WATCH_MAX_DELAY
+
+        self.pipeline = ExtractionPipeline(extraction_type, master_index_cache, layout_detector, snapshot_store)
+        self.extraction_data = ExtractionData()
+        self.validator: Optional[IncrementalValidator] = None
+
+        self._files: Dict[str, FileSignature] = {}  # Files included in the data
+        self._unsettled: Dict[str, FileSignature] = {}  # Files seen once, waiting to settle
+        self._master_index: Optional[MasterIndex] = None
+        self._cutoffs: Optional[Tuple[int, int]] = None
+
+        # Monotonic times of the first and last change not yet reported
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+
+    @property
+    def pdf_files(self) -> List[str]:
+        """PDF files currently included, in name order."""
+        return sorted(self._files)
+
+    @property
+    def metrics(self) -> RunMetrics:
+        """Stage timings and counters since the last update."""
+        return self.pipeline.metrics
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """
+        Poll the folder until stop_event is set.
+
+        Args:
+            stop_event: Event ending the loop (runs forever if None)
+        """
+        stop_event = stop_event or threading.Event()
+        logging.info(f"Watching {self.folder} every {self.poll_interval:g}s")
+        while not stop_event.is_set():
+            self.poll()
+            stop_event.wait(self.poll_interval)
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """
+        Scan the folder once, apply changes and report if an update is due.
+
+        Args:
+            now: Current monotonic time (defaults to time.monotonic())
+
+        Returns:
+            True if on_update was called
+        """
+        now = time.monotonic() if now is None else now
+        try:
+            changed = self._apply_changes(self._scan())
+        except Exception as e:
+            # Keep watching; the next scan retries (e.g. the master is being saved)
+            logging.error(f"Watch update failed: {e}")
+            changed = False
+
+        if changed:
+            self._last_change = now
+            if self._first_change is None:
+                self._first_change = now
+
+        if self._last_change is None or self.validator is None or not self._files:
+            return False
+        if now - self._last_change < self.debounce and now - self._first_change < self.max_delay:
+            return False
+
+        self._first_change = self._last_change = None
+        if self.on_update:
+            try:
+                self.on_update(self.validator)
+            except Exception as e:
+                logging.error(f"Watch output failed: {e}")
+        self.pipeline.metrics = RunMetrics()
+        return True
+
+    def _scan(self) -> Dict[str, FileSignature]:
+        """Signatures of the PDF files in the folder."""
+        signatures = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(".pdf") or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # Removed between listing and stat
+                signatures[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return signatures
+
+    def _apply_changes(self, scanned: Dict[str, FileSignature]) -> bool:
+        """
+        Bring the extraction data and match up to date with a scan.
+
+        Args:
+            scanned: Signatures from the latest scan
+
+        Returns:
+            True if the result changed
+        """
+        # A file is included once its signature repeats; files being rewritten
+        # keep their previous data until they settle
+        files = {}
+        for path, signature in scanned.items():
+            if signature == self._files.get(path) or signature == self._unsettled.get(path):
+                files[path] = signature
+            elif path in self._files:
+                files[path] = self._files[path]
+        self._unsettled = {path: signature for path, signature in scanned.items() if files.get(path) != signature}
+
+        added = [path for path in files if path not in self._files]
+        modified = [path for path in files if path in self._files and files[path] != self._files[path]]
+        removed = [path for path in self._files if path not in files]
+
+        policy = ExpiryPolicy.for_today()
+        cutoffs = (policy.expired_before, policy.expiring_before)
+        master_changed = self._refresh_master()
+        if not (added or modified or removed or master_changed or cutoffs != self._cutoffs):
+            return False
+
+        for path in added:
+            logging.info(f"New PDF: {os.path.basename(path)}")
+        for path in modified:
+            logging.info(f"Modified PDF: {os.path.basename(path)}")
+        for path in removed:
+            logging.info(f"Removed PDF: {os.path.basename(path)}")
+
+        self._files = files
+        if modified or removed or cutoffs != self._cutoffs:
+            # Contributions of a file cannot be subtracted; replay the cache instead
+            self._cutoffs = cutoffs
+            self.extraction_data = ExtractionData()
+            self.validator = None
+            added = self.pdf_files
+
+        if added:
+            self._extract(sorted(added))
+        elif self.validator is None and master_changed:
+            self.validator = IncrementalValidator(self.extraction_data, self._master_index.codes)
+        return True
+
+    def _refresh_master(self) -> bool:
+        """Re-match against the master workbook if it changed; True if it did."""
+        index = self.master_index_cache.get(self.excel_file)
+        if index is self._master_index:
+            return False
+        self._master_index = index
+        if self.validator is not None:
+            self.validator.set_excel_codes(index.codes)
+        return True
+
+    def _extract(self, pdf_files: List[str]) -> None:
+        """Extract files into the data and re-match the codes they touched."""
+        metrics = self.pipeline.metrics
+        started = time.perf_counter()
+        touched_codes: Set[str] = set()
+        # Files that fail to extract are logged and skipped by the pipeline
+        for event in self.pipeline.iter_events(pdf_files):
+            self.extraction_data.apply(event)
+            if isinstance(event, BalanceEvent):
+                touched_codes.add(event.national_code.upper())
+
+        with metrics.stage(Stage.MATCHING):
+            if self.validator is None:
+                self.validator = IncrementalValidator(self.extraction_data, self._master_index.codes)
+            else:
+                self.validator.refresh(touched_codes)
+        metrics.add_time(Stage.EXTRACTION, time.perf_counter() - started)
+        if self.pipeline.snapshot_store is not None:
+            self.pipeline.snapshot_store.flush()
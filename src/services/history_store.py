@@ -0,0 +1,424 @@
+"""History store - balances, expiries and issues of every run in a local SQLite file."""
+
+import logging
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from src.config.extraction_config import ExtractionType
+from src.config.settings import AppSettings
+from src.models.extraction_data import ExtractionResult
+from src.services.data_validator import DataValidator, IncrementalValidator
+from src.services.run_snapshot import RunSnapshot
+from src.utils.run_metrics import RunMetrics
+
+# Bump (and add a migration step to _migrate) when the schema changes
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_time TEXT NOT NULL,
+    excel_file TEXT,
+    run_type TEXT,
+    pdf_count INTEGER,
+    matched INTEGER,
+    unmatched INTEGER,
+    missing INTEGER,
+    expired INTEGER,
+    expiring_soon INTEGER,
+    duplicates INTEGER,
+    zero_balance INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (run_time);
+
+-- One row per code, run and report type; the key doubles as the trend index
+CREATE TABLE IF NOT EXISTS balances (
+    national_code TEXT NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    extraction_type TEXT NOT NULL,
+    balance REAL NOT NULL,
+    matched INTEGER NOT NULL,
+    PRIMARY KEY (national_code, run_id, extraction_type)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS balances_by_run ON balances (run_id);
+
+-- Expired, expiring-soon, zero-balance, unmatched and duplicate rows
+CREATE TABLE IF NOT EXISTS issues (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    category TEXT NOT NULL,
+    national_code TEXT NOT NULL,
+    item_code TEXT,
+    name TEXT,
+    expiry_date TEXT,
+    balance REAL,
+    pdf_filename TEXT
+);
+CREATE INDEX IF NOT EXISTS issues_by_code ON issues (national_code, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_item ON issues (item_code, run_id);
+CREATE INDEX IF NOT EXISTS issues_by_run ON issues (run_id, category);
+
+-- Stage timings (seconds, calls) and counters (value) of each run (schema 2)
+CREATE TABLE IF NOT EXISTS run_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    calls INTEGER,
+    PRIMARY KEY (run_id, kind, name)
+) WITHOUT ROWID;
+"""
+
+
+class IssueCategory:
+    """Kinds of issue rows kept per run."""
+    EXPIRED = "expired"
+    EXPIRING_SOON = "expiring_soon"
+    ZERO_BALANCE = "zero_balance"
+    UNMATCHED = "unmatched"
+    DUPLICATE = "duplicate"
+
+
+class RunInfo(NamedTuple):
+    """A recorded run and its summary counts."""
+    run_id: int
+    run_time: str
+    excel_file: str
+    run_type: str
+    pdf_count: int
+    matched: int
+    unmatched: int
+    missing: int
+    expired: int
+    expiring_soon: int
+    duplicates: int
+    zero_balance: int
+
+
+class TrendPoint(NamedTuple):
+    """A code's balance in one run."""
+    run_id: int
+    run_time: str
+    extraction_type: str
+    balance: float
+    matched: bool
+
+
+class IssueRow(NamedTuple):
+    """An issue row recorded for a run."""
+    run_id: int
+    run_time: str
+    category: str
+    national_code: str
+    item_code: str
+    name: str
+    expiry_date: Optional[str]
+    balance: Optional[float]
+    pdf_filename: str
+
+
+class MetricsPoint(NamedTuple):
+    """Stage timings and counters of one run."""
+    run_id: int
+    run_time: str
+    metrics: RunMetrics
+
+
+class HistoryStore:
+    """
+    History of saved runs in SQLite.
+
+    Balances are keyed by (national code, run, type), so a code's trend is a
+    range scan of the primary key; issue rows are indexed by national code,
+    item code and run. Run ids increase with time, so "the last N runs"
+    needs no sort. A connection is opened per call, which keeps the store
+    safe to use from worker threads.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize store, creating the database if needed.
+
+        Args:
+            db_path: SQLite file (defaults to AppSettings.HISTORY_FILE)
+        """
+        self.db_path = db_path or AppSettings().HISTORY_FILE
+        with closing(self._connect()) as conn, conn:
+            self._migrate(conn)
+
+    def record_run(
+        self,
+        snapshot: RunSnapshot,
+        metrics: Optional[RunMetrics] = None,
+        balances: Optional[Dict[ExtractionType, Dict[str, float]]] = None,
+        run_id: Optional[int] = None
+    ) -> int:
+        """
+        Record a saved run's balances and issues.
+
+        Call this once the balances were written to the master workbook, so
+        the history holds what was saved (manual edits and accepted
+        suggestions included). Saving the same run again replaces its rows.
+
+        Args:
+            snapshot: Run that was saved
+            metrics: Optional stage timings and counters of the run
+            balances: Balances written per report type (defaults to the validator's)
+            run_id: Id returned when this run was saved before, to update it
+
+        Returns:
+            Id of the recorded run
+        """
+        validator = snapshot.validator
+        result = snapshot.result
+        stats = DataValidator.get_summary_stats(result)
+        if balances is None:
+            balances = validator.balances_by_type(snapshot.run_type)
+
+        with closing(self._connect()) as conn, conn:
+            if run_id is not None:
+                # Balances, issues and metrics of the earlier save cascade away
+                conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            cursor = conn.execute(
+                "INSERT INTO runs (id, run_time, excel_file, run_type, pdf_count, matched, unmatched, missing,"
+                " expired, expiring_soon, duplicates, zero_balance) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, snapshot.created.isoformat(timespec="seconds"), snapshot.excel_file,
+                    snapshot.run_type.value, len(snapshot.pdf_files), stats['matched'], stats['unmatched'],
+                    stats['missing'], stats['expired'], stats['expiring_soon'], stats['duplicates'],
+                    stats['zero_balance'],
+                )
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT OR REPLACE INTO balances (national_code, run_id, extraction_type, balance, matched)"
+                " VALUES (?, ?, ?, ?, ?)",
+                self._balance_rows(run_id, validator, snapshot.run_type, balances)
+            )
+            conn.executemany(
+                "INSERT INTO issues (run_id, category, national_code, item_code, name, expiry_date, balance,"
+                " pdf_filename) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                self._issue_rows(run_id, result)
+            )
+            if metrics is not None:
+                self._write_metrics(conn, run_id, metrics)
+
+        logging.info(f"Recorded run {run_id} in {self.db_path}")
+        return run_id
+
+    def run_metrics(self, runs: int = 10) -> List[MetricsPoint]:
+        """
+        Get the metrics of the most recent runs that have them.
+
+        Args:
+            runs: Number of runs to return
+
+        Returns:
+            Metrics per run, oldest first
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT m.run_id, r.run_time, m.kind, m.name, m.value, m.calls"
+                " FROM run_metrics m JOIN runs r ON r.id = m.run_id"
+                " WHERE m.run_id IN (SELECT DISTINCT run_id FROM run_metrics ORDER BY run_id DESC LIMIT ?)"
+                " ORDER BY m.run_id",
+                (runs,)
+            ).fetchall()
+
+        points: List[MetricsPoint] = []
+        for run_id, run_time, kind, name, value, calls in rows:
+            if not points or points[-1].run_id != run_id:
+                points.append(MetricsPoint(run_id, run_time, RunMetrics()))
+            metrics = points[-1].metrics
+            if kind == "stage":
+                metrics.add_time(name, value, calls)
+            else:
+                metrics.count(name, int(value))
+        return points
+
+    def runs(self, limit: int = 50) -> List[RunInfo]:
+        """
+        List the most recent runs.
+
+        Args:
+            limit: Maximum number of runs
+
+        Returns:
+            Runs, newest first
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [RunInfo(*row) for row in rows]
+
+    def trend(
+        self,
+        national_code: str,
+        runs: int = 10,
+        extraction_type: Optional[ExtractionType] = None
+    ) -> List[TrendPoint]:
+        """
+        Get a code's balance over the most recent runs that contain it.
+
+        Args:
+            national_code: National code to look up
+            runs: Number of runs to return
+            extraction_type: Only balances of this report type (all types if None)
+
+        Returns:
+            Balances, oldest first
+        """
+        sql = (
+            "SELECT b.run_id, r.run_time, b.extraction_type, b.balance, b.matched"
+            " FROM balances b JOIN runs r ON r.id = b.run_id"
+            " WHERE b.national_code = ?"
+        )
+        params: Tuple = (national_code.upper(),)
+        if extraction_type is not None:
+            sql += " AND b.extraction_type = ?"
+            params += (extraction_type.value,)
+        # The run ids are found on the primary key alone; only those rows are joined
+        sql += " AND b.run_id IN (SELECT DISTINCT run_id FROM balances WHERE national_code = ?"
+        params += (national_code.upper(),)
+        if extraction_type is not None:
+            sql += " AND extraction_type = ?"
+            params += (extraction_type.value,)
+        sql += " ORDER BY run_id DESC LIMIT ?) ORDER BY b.run_id, b.extraction_type"
+        params += (runs,)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [TrendPoint(run_id, run_time, type_name, balance, bool(matched))
+                for run_id, run_time, type_name, balance, matched in rows]
+
+    def balances(self, run_id: int, matched_only: bool = False) -> Dict[ExtractionType, Dict[str, float]]:
+        """
+        Get the balances recorded for a run.
+
+        Args:
+            run_id: Run to read
+            matched_only: Only balances of codes found in Excel (what was saved)
+
+        Returns:
+            Dictionary of extraction type -> (code -> balance)
+        """
+        sql = "SELECT extraction_type, national_code, balance FROM balances WHERE run_id = ?"
+        if matched_only:
+            sql += " AND matched = 1"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, (run_id,)).fetchall()
+        typed: Dict[ExtractionType, Dict[str, float]] = {}
+        for type_name, national_code, balance in rows:
+            typed.setdefault(ExtractionType(type_name), {})[national_code] = balance
+        return typed
+
+    def issues(
+        self,
+        national_code: Optional[str] = None,
+        item_code: Optional[str] = None,
+        category: Optional[str] = None,
+        runs: int = 10
+    ) -> List[IssueRow]:
+        """
+        Get issue rows of a national code or item code over the most recent runs.
+
+        Args:
+            national_code: National code to look up
+            item_code: Item code to look up (used if national_code is None)
+            category: Only rows of this IssueCategory (all if None)
+            runs: Only rows from this many most recent runs
+
+        Returns:
+            Issue rows, oldest run first
+
+        Raises:
+            ValueError: If neither code is given
+        """
+        if national_code is not None:
+            column, value = "national_code", national_code.upper()
+        elif item_code is not None:
+            column, value = "item_code", item_code
+        else:
+            raise ValueError("national_code or item_code is required")
+
+        sql = (
+            "SELECT i.run_id, r.run_time, i.category, i.national_code, i.item_code, i.name,"
+            " i.expiry_date, i.balance, i.pdf_filename"
+            f" FROM issues i JOIN runs r ON r.id = i.run_id WHERE i.{column} = ?"
+            f" AND i.run_id >= (SELECT COALESCE(MIN(id), 0) FROM (SELECT id FROM runs ORDER BY id DESC LIMIT ?))"
+        )
+        params: Tuple = (value, runs)
+        if category is not None:
+            sql += " AND i.category = ?"
+            params += (category,)
+        sql += " ORDER BY i.run_id"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [IssueRow(*row) for row in rows]
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with the store's pragmas."""
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")  # Readers do not block the writer
+        return conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection) -> None:
+        """Create or upgrade the schema."""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise RuntimeError(f"History database was written by a newer version (schema {version})")
+        if version < SCHEMA_VERSION:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _write_metrics(conn: sqlite3.Connection, run_id: int, metrics: RunMetrics) -> None:
+        """Replace a run's metric rows."""
+        conn.execute("DELETE FROM run_metrics WHERE run_id = ?", (run_id,))
+        conn.executemany(
+            "INSERT INTO run_metrics (run_id, kind, name, value, calls) VALUES (?, ?, ?, ?, ?)",
+            [(run_id, "stage", name, seconds, metrics.calls.get(name, 0))
+             for name, seconds in metrics.seconds.items()]
+            + [(run_id, "counter", name, amount, None) for name, amount in metrics.counters.items()]
+        )
+
+    @staticmethod
+    def _balance_rows(
+        run_id: int,
+        validator: IncrementalValidator,
+        run_type: ExtractionType,
+        saved: Dict[ExtractionType, Dict[str, float]]
+    ) -> Iterator[Tuple]:
+        """Balance rows: what was saved to Excel, plus the codes not in Excel."""
+        for extraction_type, balances in saved.items():
+            for national_code, balance in balances.items():
+                yield national_code, run_id, extraction_type.value, balance, 1
+
+        unmatched = validator.result.unmatched_by_code
+        typed = validator.extraction_data.balances_by_type or {run_type: validator.extraction_data.balances}
+        for extraction_type, balances in typed.items():
+            for national_code in unmatched.keys() & balances.keys():
+                yield national_code, run_id, extraction_type.value, balances[national_code], 0
+
+    @staticmethod
+    def _issue_rows(run_id: int, result: ExtractionResult) -> Iterator[Tuple]:
+        """Issue rows of a result, in the issues table's column order."""
+        for national_code, item_code, name, expiry_date, pdf_filename in result.expired_items:
+            yield run_id, IssueCategory.EXPIRED, national_code, item_code, name, expiry_date, None, pdf_filename
+        for national_code, item_code, name, expiry_date, pdf_filename in result.expiring_soon_items:
+            yield run_id, IssueCategory.EXPIRING_SOON, national_code, item_code, name, expiry_date, None, pdf_filename
+        for national_code, item_code, name, pdf_filename in result.zero_balance_items:
+            yield run_id, IssueCategory.ZERO_BALANCE, national_code, item_code, name, None, 0.0, pdf_filename
+        for national_code, item_code, name, balance, pdf_filename in result.unmatched_codes:
+            yield run_id, IssueCategory.UNMATCHED, national_code, item_code, name, None, balance, pdf_filename
+        for record in result.duplicates:
+            yield (
+                run_id, IssueCategory.DUPLICATE, record.national_code, record.item_code, record.name,
+                None, None, record.pdf_filename
+            )
@@ -0,0 +1,578 @@
+"""Job server - runs extraction jobs for other workstations over local HTTP (stdlib only)."""
+
+import asyncio
+import hmac
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.config.extraction_config import AUTO_DETECT, ExtractionType
+from src.config.settings import AppSettings, LoggingConfig
+from src.models.extraction_data import ExtractionData, ExtractionResult
+from src.models.save_preview import SavePreview
+from src.services.data_validator import DataValidator
+from src.services.excel_handler import ExcelHandler
+from src.services.export_service import ExportService
+from src.services.extraction_pipeline import ExtractionPipeline
+from src.services.layout_detector import LayoutDetector
+from src.services.master_index_cache import MasterIndexCache
+from src.services.run_snapshot import SnapshotStore
+from src.utils.log_queue import configure_worker_logging, process_log_queue
+from src.utils.run_metrics import Stage
+
+# extract: PDFs only; match: PDFs against the master; export: match, then write files
+JOB_KINDS = ("extract", "match", "export")
+
+# Issue reports an export job can write: name -> (export function, ExtractionResult attribute)
+ISSUE_REPORTS: Dict[str, Tuple[Callable, str]] = {
+    "unmatched": (ExportService.export_unmatched_codes, "unmatched_codes"),
+    "expired": (ExportService.export_expired_items, "expired_items"),
+    "expiring_soon": (ExportService.export_expiring_soon_items, "expiring_soon_items"),
+    "duplicates": (ExportService.export_duplicates, "duplicates"),
+    "zero_balance": (ExportService.export_zero_balance_items, "zero_balance_items"),
+}
+
+# Largest accepted request body (a job description, not a file upload)
+MAX_BODY_BYTES = 1 << 20
+
+
+class JobStatus:
+    """Lifecycle states of a job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+
+@dataclass
+class Job:
+    """A submitted job and everything reported about it so far."""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    priority: int = 0
+    status: str = JobStatus.QUEUED
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created: datetime = field(default_factory=datetime.now)
+
+    @property
+    def finished(self) -> bool:
+        """Check whether the job has stopped for good."""
+        return self.status in JobStatus.FINISHED
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-serializable summary of the job."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "created": self.created.isoformat(timespec="seconds"),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+def resolve_allowed_path(path: str, roots: Sequence[str]) -> str:
+    """
+    Resolve a client-supplied path and check that it lies under an allowed root.
+
+    Relative paths are taken relative to the first root. ".." segments and
+    symbolic links are resolved before the check, so neither can lead out
+    of the roots.
+
+    Args:
+        path: Path from a job submission
+        roots: Allowed directories (already resolved with os.path.realpath)
+
+    Returns:
+        Resolved absolute path
+
+    Raises:
+        ValueError: If the path is outside every root
+    """
+    resolved = os.path.realpath(os.path.join(roots[0], path))
+    for root in roots:
+        try:
+            if os.path.normcase(os.path.commonpath([resolved, root])) == os.path.normcase(root):
+                return resolved
+        except ValueError:
+            continue  # Different drives
+    raise ValueError(f"path is outside the server's allowed folders: {path}")
+
+
+def validate_job(payload: Any, roots: Sequence[str]) -> Tuple[str, Dict[str, Any], int]:
+    """
+    Check a job submission.
+
+    Args:
+        payload: Decoded JSON body, e.g. {"kind": "match", "pdf_files": [...],
+            "excel_file": "...", "type": "Auto", "priority": 0}
+        roots: Resolved directories the job may read from and write to
+
+    Returns:
+        Tuple of (kind, params, priority); params hold resolved paths
+
+    Raises:
+        ValueError: If the submission is malformed or a path is outside the roots
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("job must be a JSON object")
+    kind = payload.get("kind")
+    if kind not in JOB_KINDS:
+        raise ValueError(f"kind must be one of {', '.join(JOB_KINDS)}")
+
+    pdf_files = payload.get("pdf_files")
+    if not pdf_files or not isinstance(pdf_files, list) or not all(isinstance(path, str) for path in pdf_files):
+        raise ValueError("pdf_files must be a non-empty list of paths")
+    excel_file = payload.get("excel_file")
+    if kind != "extract" and not isinstance(excel_file, str):
+        raise ValueError(f"excel_file is required for {kind} jobs")
+    output_dir = payload.get("output_dir", ".")
+    if not isinstance(output_dir, str):
+        raise ValueError("output_dir must be a path")
+
+    type_name = payload.get("type", AUTO_DETECT)
+    if type_name != AUTO_DETECT and type_name not in {t.value for t in ExtractionType}:
+        raise ValueError(f"unknown type {type_name!r}")
+    reports = payload.get("reports", [])
+    if not isinstance(reports, list) or not set(reports) <= ISSUE_REPORTS.keys():
+        raise ValueError(f"reports must be a list of {', '.join(ISSUE_REPORTS)}")
+    priority = payload.get("priority", 0)
+    if not isinstance(priority, int):
+        raise ValueError("priority must be an integer")
+
+    params = {
+        "pdf_files": [resolve_allowed_path(path, roots) for path in pdf_files],
+        "excel_file": resolve_allowed_path(excel_file, roots) if isinstance(excel_file, str) else None,
+        "type": type_name,
+        "reports": reports,
+        "output_dir": resolve_allowed_path(output_dir, roots),
+    }
+    return kind, params, priority
+
+
+# Per-process state of pool workers (set by _init_worker)
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(progress_queue: Any, cache_dir: str, log_queue: Any, log_levels: Dict[str, int]) -> None:
+    """
+    Pool initializer: log through the server, share the progress queue and
+    open the on-disk caches once per process.
+    """
+    configure_worker_logging(log_queue, log_levels)
+    _worker_state["progress_queue"] = progress_queue
+    _worker_state["master_index_cache"] = MasterIndexCache(cache_dir)
+    _worker_state["snapshot_store"] = SnapshotStore(cache_dir)
+    _worker_state["layout_detector"] = LayoutDetector(cache_dir)
+
+
+def run_job(job_id: str, kind: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one job in a pool worker.
+
+    Args:
+        job_id: Job identifier (tags progress messages)
+        kind: One of JOB_KINDS
+        params: Parameters from validate_job
+
+    Returns:
+        JSON-serializable job result
+    """
+    progress_queue = _worker_state["progress_queue"]
+
+    def progress_callback(message: str) -> None:
+        progress_queue.put((job_id, message))
+
+    auto_detect = params["type"] == AUTO_DETECT
+    extraction_type = ExtractionType.STOCK if auto_detect else ExtractionType(params["type"])
+    snapshot_store: SnapshotStore = _worker_state["snapshot_store"]
+    pipeline = ExtractionPipeline(
+        extraction_type,
+        _worker_state["master_index_cache"],
+        layout_detector=_worker_state["layout_detector"] if auto_detect else None,
+        snapshot_store=snapshot_store
+    )
+
+    if kind == "extract":
+        extraction_data = ExtractionData.from_events(pipeline.iter_events(params["pdf_files"], progress_callback))
+        snapshot_store.flush()
+        summary = _describe_data(extraction_data)
+    else:
+        result, _ = pipeline.run(params["pdf_files"], params["excel_file"], progress_callback)
+        summary = _describe_result(result)
+        if kind == "export":
+            summary["output_files"] = _export(pipeline, extraction_type, params, progress_callback)
+    # PDFs that could not be extracted are skipped rather than failing the job
+    summary["failed_files"] = pipeline.failed_files
+    summary["metrics"] = pipeline.metrics.to_dict()
+    return summary
+
+
+def _describe_data(extraction_data: ExtractionData) -> Dict[str, Any]:
+    """JSON-serializable summary of extracted (unmatched) data."""
+    return {
+        "file_types": {name: extraction_type.value for name, extraction_type in extraction_data.file_types.items()},
+        "balances": extraction_data.balances,
+        "balances_by_type": {
+            extraction_type.value: balances
+            for extraction_type, balances in extraction_data.balances_by_type.items()
+        },
+        "expired": len(extraction_data.expired_items),
+        "expiring_soon": len(extraction_data.expiring_soon_items),
+        "duplicates": len(extraction_data.duplicates),
+        "cross_file_duplicates": len(extraction_data.cross_file_duplicates),
+        "zero_balance": len(extraction_data.zero_balance_items),
+        "orphans": len(extraction_data.orphan_items),
+    }
+
+
+def _describe_result(result: ExtractionResult) -> Dict[str, Any]:
+    """JSON-serializable summary of a match result."""
+    return {
+        "stats": DataValidator.get_summary_stats(result),
+        "matched": result.matched_codes,
+        "matched_by_type": {
+            code: {extraction_type.value: balance for extraction_type, balance in by_type.items()}
+            for code, by_type in result.matched_by_type.items()
+        },
+        "unmatched": list(result.unmatched_by_code),
+        "missing": result.missing_codes,
+        "suggestions": {
+            code: [[suggestion.code, suggestion.distance] for suggestion in suggestions]
+            for code, suggestions in result.suggestions.items()
+        },
+    }
+
+
+def _export(
+    pipeline: ExtractionPipeline,
+    extraction_type: ExtractionType,
+    params: Dict[str, Any],
+    progress_callback: Callable[[str], None]
+) -> List[str]:
+    """Write the updated master workbook and the requested issue reports."""
+    validator = pipeline.validator
+    with pipeline.metrics.stage(Stage.SAVE):
+        preview = SavePreview.build(
+            _worker_state["master_index_cache"].get(params["excel_file"]),
+            validator.balances_by_type(extraction_type)
+        )
+        handler = ExcelHandler(params["excel_file"])
+        # Written to the job's (checked) output folder, not the server's working directory
+        handler.settings.OUTPUT_FILE_PREFIX = os.path.join(params["output_dir"], handler.settings.OUTPUT_FILE_PREFIX)
+        output_file = handler.save_changes(preview, progress_callback=progress_callback)
+    # No workbook is written when every target cell is already up to date
+    output_files = [os.path.abspath(output_file)] if output_file else []
+
+    timestamp = datetime.now().strftime(AppSettings().OUTPUT_DATE_FORMAT)
+    for report in params["reports"]:
+        export_func, attribute = ISSUE_REPORTS[report]
+        report_file = os.path.abspath(os.path.join(params["output_dir"], f"{report}_{timestamp}.xlsx"))
+        progress_callback(f"Exporting {report}...")
+        export_func(getattr(validator.result, attribute), report_file)
+        output_files.append(report_file)
+    return output_files
+
+
+class JobServer:
+    """
+    Local HTTP/JSON server running extraction jobs on a process pool.
+
+    Jobs are queued by priority (higher first, then in submission order) and
+    run on a bounded pool of worker processes. Workers share the on-disk
+    caches (master index, per-file extraction events, layouts), so a PDF
+    parsed for one client is replayed for the next. Progress messages flow
+    back through one multiprocessing queue and are streamed to clients as
+    newline-delimited JSON.
+
+    Every request must carry the shared token ("Authorization: Bearer
+    <token>"), and jobs may only read and write under the allowed roots.
+
+    Endpoints:
+        POST /jobs                submit a job (see validate_job)
+        GET /jobs                 list jobs
+        GET /jobs/<id>            job status and result
+        GET /jobs/<id>/events     stream events until the job finishes
+        DELETE /jobs/<id>         cancel a queued job
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        token: Optional[str] = None,
+        roots: Optional[Sequence[str]] = None
+    ):
+        """
+        Initialize server.
+
+        Args:
+            host: Interface to listen on (defaults to settings)
+            port: Port to listen on (defaults to settings)
+            workers: Number of worker processes (defaults to settings)
+            cache_dir: Directory of the shared caches (defaults to settings)
+            token: Shared secret clients must send (defaults to settings)
+            roots: Directories jobs may read from and write to (defaults to
+                settings, or the working directory if none are configured)
+
+        Raises:
+            ValueError: If no token is given or configured
+        """
+        settings = AppSettings()
+        self.host = host or settings.SERVER_HOST
+        self.port = port if port is not None else settings.SERVER_PORT
+        self.workers = workers or settings.SERVER_WORKERS
+        self.cache_dir = cache_dir or settings.CACHE_DIR
+        self.token = token or settings.SERVER_TOKEN
+        if not self.token:
+            raise ValueError("the job server needs a shared token")
+        self.roots = [os.path.realpath(root) for root in (roots or settings.SERVER_ROOTS or [os.getcwd()])]
+
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    async def serve(self, ready: Optional[Callable[[int], None]] = None) -> None:
+        """
+        Serve until cancelled.
+
+        Args:
+            ready: Optional callback receiving the bound port once listening
+        """
+        loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context()
+        progress_queue = context.Queue()
+        # Workers send their records to this process's log handlers
+        log_levels = {
+            name: logging.getLogger(name).level for name in ("",) + tuple(LoggingConfig().quiet_loggers)
+        }
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(progress_queue, self.cache_dir, process_log_queue(context), log_levels)
+        )
+        self._queue = asyncio.PriorityQueue()
+
+        server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        port = server.sockets[0].getsockname()[1]
+        logging.info(f"Job server listening on {self.host}:{port} with {self.workers} worker(s)")
+        logging.info(f"Jobs may use files under: {', '.join(self.roots)}")
+
+        tasks = [asyncio.create_task(self._dispatch(loop, pool)) for _ in range(self.workers)]
+        tasks.append(asyncio.create_task(self._pump_progress(loop, progress_queue)))
+        if ready:
+            ready(port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            progress_queue.put(None)
+            for task in tasks:
+                task.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Job:
+        """
+        Queue a job (must be called on the server's event loop).
+
+        Args:
+            kind: One of JOB_KINDS
+            params: Parameters from validate_job
+            priority: Higher runs first
+
+        Returns:
+            The queued Job
+        """
+        job = Job(uuid.uuid4().hex[:12], kind, params, priority)
+        self.jobs[job.id] = job
+        self._queue.put_nowait((-priority, next(self._sequence), job))
+        self._add_event(job, {"type": "status", "status": job.status})
+        logging.info(f"Queued {kind} job {job.id} ({len(params['pdf_files'])} PDF(s), priority {priority})")
+        return job
+
+    def cancel(self, job: Job) -> bool:
+        """Cancel a job that has not started; returns False if it already has."""
+        if job.status != JobStatus.QUEUED:
+            return False
+        self._set_status(job, JobStatus.CANCELLED)
+        return True
+
+    async def _dispatch(self, loop: asyncio.AbstractEventLoop, pool: ProcessPoolExecutor) -> None:
+        """Feed queued jobs to the pool, one at a time per worker slot."""
+        while True:
+            _, _, job = await self._queue.get()
+            if job.status != JobStatus.QUEUED:
+                continue  # Cancelled while queued
+            self._set_status(job, JobStatus.RUNNING)
+            try:
+                job.result = await loop.run_in_executor(pool, run_job, job.id, job.kind, job.params)
+            except Exception as e:
+                logging.error(f"Job {job.id} failed: {e}")
+                job.error = str(e)
+                self._set_status(job, JobStatus.FAILED)
+            else:
+                self._set_status(job, JobStatus.DONE)
+
+    async def _pump_progress(self, loop: asyncio.AbstractEventLoop, progress_queue: Any) -> None:
+        """Forward progress messages from the workers to the jobs' event streams."""
+        while True:
+            item = await loop.run_in_executor(None, progress_queue.get)
+            if item is None:
+                return
+            job_id, message = item
+            job = self.jobs.get(job_id)
+            if job is not None:
+                self._add_event(job, {"type": "progress", "message": message})
+
+    def _set_status(self, job: Job, status: str) -> None:
+        """Change a job's status and tell its subscribers."""
+        job.status = status
+        event = {"type": "status", "status": status}
+        if status == JobStatus.DONE:
+            event["result"] = job.result
+        elif status == JobStatus.FAILED:
+            event["error"] = job.error
+        self._add_event(job, event)
+
+    def _add_event(self, job: Job, event: Dict[str, Any]) -> None:
+        """Record an event and deliver it to live streams."""
+        job.events.append(event)
+        for subscriber in self._subscribers.get(job.id, ()):
+            subscriber.put_nowait(event)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve one HTTP request (connections are closed after each response)."""
+        try:
+            method, path, headers, body = await self._read_request(reader)
+            if not self._authorized(headers):
+                self._respond(writer, 401, {"error": "missing or wrong token"})
+                return
+            await self._route(method, path, body, writer)
+        except ValueError as e:
+            self._respond(writer, 400, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # Client went away
+        except Exception as e:
+            logging.error(f"Job server request failed: {e}")
+            self._respond(writer, 500, {"error": str(e)})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str], bytes]:
+        """Read the request line, headers (lower-case names) and body."""
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ValueError("malformed request line")
+        method, path, _ = request_line
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0].rstrip("/"), headers, body
+
+    def _authorized(self, headers: Dict[str, str]) -> bool:
+        """Check the request's bearer token against the shared token."""
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(token.strip().encode(), self.token.encode())
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+        """Dispatch a request to its endpoint."""
+        parts = path.strip("/").split("/")
+        if parts[0] != "jobs" or len(parts) > 3:
+            self._respond(writer, 404, {"error": "not found"})
+            return
+
+        if len(parts) == 1:
+            if method == "GET":
+                self._respond(writer, 200, [job.describe() for job in self.jobs.values()])
+            elif method == "POST":
+                kind, params, priority = validate_job(json.loads(body or b"null"), self.roots)
+                self._respond(writer, 202, self.submit(kind, params, priority).describe())
+            else:
+                self._respond(writer, 405, {"error": "method not allowed"})
+            return
+
+        job = self.jobs.get(parts[1])
+        if job is None:
+            self._respond(writer, 404, {"error": "unknown job"})
+        elif len(parts) == 3 and parts[2] == "events" and method == "GET":
+            await self._stream_events(job, writer)
+        elif len(parts) == 2 and method == "GET":
+            self._respond(writer, 200, job.describe())
+        elif len(parts) == 2 and method == "DELETE":
+            if self.cancel(job):
+                self._respond(writer, 200, job.describe())
+            else:
+                self._respond(writer, 409, {"error": f"job is {job.status}"})
+        else:
+            self._respond(writer, 404, {"error": "not found"})
+
+    async def _stream_events(self, job: Job, writer: asyncio.StreamWriter) -> None:
+        """Send past and live events of a job as NDJSON until it finishes."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nConnection: close\r\n\r\n"
+        )
+        # Replay and subscribe in one step, so no event is missed or sent twice
+        backlog = list(job.events)
+        subscriber: asyncio.Queue = asyncio.Queue()
+        if not job.finished:
+            self._subscribers.setdefault(job.id, []).append(subscriber)
+        try:
+            for event in backlog:
+                writer.write(json.dumps(event).encode("utf-8") + b"\n")
+            await writer.drain()
+            while not job.finished or not subscriber.empty():
+                event = await subscriber.get()
+                writer.write(json.dumps(event).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            subscribers = self._subscribers.get(job.id, [])
+            if subscriber in subscribers:
+                subscribers.remove(subscriber)
+                if not subscribers:
+                    del self._subscribers[job.id]
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, payload: Any) -> None:
+        """Write a complete JSON response."""
+        reasons = {200: "OK", 202: "Accepted", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+                   405: "Method Not Allowed", 409: "Conflict", 500: "Internal Server Error"}
+        body = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
@@ -0,0 +1,183 @@
+"""Layout detector - recognizes a PDF's report type from its first page."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from src.config.extraction_config import ExtractionConfig, ExtractionType
+from src.config.settings import AppSettings
+from src.utils.text_cleaner import fix_doubled_chars
+
+_ITEM_CODE = re.compile(r'^\d{4,7}$')
+_DIGITS = re.compile(r'\d+')
+_WHITESPACE = re.compile(r'\s+')
+
+# Column holding item codes in each layout (see PDFExtractor._extract_national_and_item_code)
+STOCK_ITEM_CODE_COLUMN = 10
+FREE_BUY_ITEM_CODE_COLUMN = 6
+
+# Column boundaries are compared at this granularity (points)
+_GEOMETRY_TOLERANCE = 4
+
+
+class UndetectedLayoutError(Exception):
+    """A report has the Free/Buy layout but its header names neither type."""
+
+
+class LayoutDetector:
+    """
+    Detects the extraction type of a report from its first page.
+
+    The column holding item codes separates Stock reports from Free/Buy
+    reports (which share a layout); header keywords then tell Free from Buy.
+    Decisions are cached by a layout fingerprint (page size, column
+    boundaries of the first table and header text without numbers), so
+    further reports from the same system skip the table scan. The cache is
+    persisted as a small JSON file.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize detector.
+
+        Args:
+            cache_dir: Directory for the persisted fingerprint cache
+                (defaults to AppSettings.CACHE_DIR)
+        """
+        self.cache_file = os.path.join(cache_dir or AppSettings().CACHE_DIR, "layouts.json")
+        self._layouts: Dict[str, ExtractionType] = self._load()
+
+    def detect(self, page: Any, tables: List[Any], fallback: ExtractionType) -> ExtractionType:
+        """
+        Detect the extraction type of a report.
+
+        Free and Buy reports share a layout but have different target
+        columns, so a Free/Buy layout is never resolved by the fallback: its
+        balances would be read from and written to the wrong columns.
+
+        Args:
+            page: First pdfplumber page of the report
+            tables: Tables found on that page (page.find_tables())
+            fallback: Type to use when the layout has no recognizable item rows
+
+        Returns:
+            Detected extraction type, or fallback
+
+        Raises:
+            UndetectedLayoutError: If the report has Free/Buy rows but no Free or Buy header keyword
+        """
+        header = self._header_text(page, tables)
+        fingerprint = self._fingerprint(page, tables, header)
+
+        cached = self._layouts.get(fingerprint)
+        if cached is not None:
+            return cached
+
+        layout = self._layout(tables)
+        if layout is None:
+            logging.warning(f"Could not recognize report layout; using {fallback.value}")
+            return fallback
+
+        detected = ExtractionType.STOCK if layout == ExtractionType.STOCK else self._header_type(header)
+        if detected is None:
+            raise UndetectedLayoutError(
+                "Free/Buy report without a Free or Buy header; choose the type and extract it again"
+            )
+
+        self._layouts[fingerprint] = detected
+        self._save()
+        return detected
+
+    def _layout(self, tables: List[Any]) -> Optional[ExtractionType]:
+        """
+        Classify the column structure from item code positions.
+
+        Returns:
+            STOCK for the Stock layout, FREE for the shared Free/Buy layout,
+            None if the first table has no item rows
+        """
+        if not tables:
+            return None
+
+        stock_rows = free_buy_rows = 0
+        for row in tables[0].extract():
+            if self._is_item_code(row, FREE_BUY_ITEM_CODE_COLUMN):
+                free_buy_rows += 1
+            elif self._is_item_code(row, STOCK_ITEM_CODE_COLUMN):
+                stock_rows += 1
+
+        if stock_rows > free_buy_rows:
+            return ExtractionType.STOCK
+        if free_buy_rows == 0:
+            return None
+        return ExtractionType.FREE
+
+    @staticmethod
+    def _header_type(header: str) -> Optional[ExtractionType]:
+        """Tell Free from Buy by the header keywords (None if neither is named)."""
+        for extraction_type, keywords in ExtractionConfig.HEADER_KEYWORDS.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                # Arabic text may be extracted in visual (reversed) order
+                if keyword in header or keyword[::-1] in header:
+                    return extraction_type
+        return None
+
+    @staticmethod
+    def _is_item_code(row: List[Optional[str]], column: int) -> bool:
+        """Check whether a row holds an item code in a column."""
+        return len(row) > column and bool(row[column]) and bool(_ITEM_CODE.match(str(row[column]).strip()))
+
+    @staticmethod
+    def _header_text(page: Any, tables: List[Any]) -> str:
+        """Normalized text above the first table (or of the whole page if it has none)."""
+        if tables:
+            top = tables[0].bbox[1]
+            region = page.crop((0, 0, page.width, top)) if top > 0 else None
+        else:
+            region = page
+        text = (region.extract_text() or "") if region is not None else ""
+        # Some reports render text with doubled characters; keep both readings
+        return " | ".join(
+            _WHITESPACE.sub(" ", variant).strip().lower()
+            for variant in (text, fix_doubled_chars(text))
+        )
+
+    @staticmethod
+    def _fingerprint(page: Any, tables: List[Any], header: str) -> str:
+        """Stable identifier of a report layout (independent of dates and totals)."""
+        columns = []
+        if tables:
+            columns = [round(column.bbox[0] / _GEOMETRY_TOLERANCE) for column in tables[0].columns]
+        layout = (
+            round(page.width),
+            round(page.height),
+            columns,
+            _DIGITS.sub("#", header),
+        )
+        return hashlib.sha1(repr(layout).encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict[str, ExtractionType]:
+        """Read the persisted fingerprint cache (empty if missing or unreadable)."""
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return {fingerprint: ExtractionType(value) for fingerprint, value in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, AttributeError) as e:
+            logging.warning(f"Ignoring unreadable layout cache {self.cache_file}: {e}")
+            return {}
+
+    def _save(self) -> None:
+        """Persist the fingerprint cache (failures only cost a re-detection)."""
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({fingerprint: value.value for fingerprint, value in self._layouts.items()}, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Could not save layout cache {self.cache_file}: {e}")
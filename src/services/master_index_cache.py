@@ -0,0 +1,155 @@
+"""Master workbook index cache - build once, reuse until the file changes."""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+from src.config.settings import AppSettings
+from src.models.master_index import MasterIndex
+from src.services.excel_handler import ExcelHandler
+from src.utils.file_fingerprint import FileFingerprint, hash_file
+
+# Bump when the pickled layout of MasterIndex changes
+CACHE_FORMAT_VERSION = 1
+
+
+class MasterIndexCache:
+    """
+    In-memory and on-disk cache of MasterIndex objects.
+
+    An entry is reused while the workbook's size and mtime are unchanged.
+    If only the stat fields changed (e.g. the file was copied or touched),
+    the content hash decides, so an unchanged master is never re-read.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize cache.
+
+        Args:
+            cache_dir: Directory for persisted indexes (defaults to AppSettings.CACHE_DIR)
+        """
+        self.cache_dir = cache_dir or AppSettings().CACHE_DIR
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[FileFingerprint, MasterIndex]] = {}
+        self._pending: Dict[str, Future] = {}
+
+    def prewarm(self, file_path: str) -> Future:
+        """
+        Start building (or loading) the index for a workbook in the background.
+
+        Args:
+            file_path: Path to the master workbook
+
+        Returns:
+            Future resolving to the MasterIndex
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending
+            future: Future = Future()
+            self._pending[key] = future
+
+        def run() -> None:
+            try:
+                future.set_result(self._load(key))
+            except Exception as e:
+                logging.error(f"Failed to index master workbook {file_path}: {e}")
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._pending.pop(key, None)
+
+        threading.Thread(target=run, daemon=True).start()
+        return future
+
+    def get(self, file_path: str) -> MasterIndex:
+        """
+        Get the index for a workbook, waiting for an in-flight prewarm if any.
+
+        Args:
+            file_path: Path to the master workbook
+
+        Returns:
+            Up-to-date MasterIndex
+        """
+        key = os.path.abspath(file_path)
+        with self._lock:
+            pending = self._pending.get(key)
+        if pending is not None:
+            return pending.result()
+        return self._load(key)
+
+    def _load(self, key: str) -> MasterIndex:
+        """Return a valid index from memory, disk, or by reading the workbook."""
+        stat = os.stat(key)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._read_disk(key)
+
+        if entry is not None:
+            fingerprint, index = entry
+            if fingerprint.matches_stat(stat):
+                return self._remember(key, fingerprint, index, persist=False)
+
+            # Stat changed - fall back to comparing content
+            sha256 = hash_file(key)
+            if sha256 == fingerprint.sha256:
+                logging.info(f"Master workbook unchanged (hash match): {key}")
+                refreshed = FileFingerprint(stat.st_size, stat.st_mtime_ns, sha256)
+                return self._remember(key, refreshed, index, persist=True)
+        else:
+            sha256 = hash_file(key)
+
+        logging.info(f"Building master index: {key}")
+        index = ExcelHandler(key).read_index()
+        return self._remember(key, FileFingerprint(stat.st_size, stat.st_mtime_ns, sha256), index, persist=True)
+
+    def _remember(self, key: str, fingerprint: FileFingerprint, index: MasterIndex, persist: bool) -> MasterIndex:
+        """Store an entry in memory and optionally on disk."""
+        index.fingerprint = fingerprint
+        with self._lock:
+            self._entries[key] = (fingerprint, index)
+        if persist:
+            self._write_disk(key, fingerprint, index)
+        return index
+
+    def _cache_path(self, key: str) -> str:
+        """Path of the persisted index for a workbook."""
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"master_index_{name}.pkl")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[FileFingerprint, MasterIndex]]:
+        """Load a persisted entry, or None if missing/unreadable/outdated."""
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                version, fingerprint, index = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable master index cache {path}: {e}")
+            return None
+        if version != CACHE_FORMAT_VERSION:
+            return None
+        return fingerprint, index
+
+    def _write_disk(self, key: str, fingerprint: FileFingerprint, index: MasterIndex) -> None:
+        """Persist an entry atomically; failures only cost a rebuild next time."""
+        path = self._cache_path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump((CACHE_FORMAT_VERSION, fingerprint, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not persist master index cache {path}: {e}")
@@ -1,122 +1,238 @@
 """PDF extraction service - single responsibility: extract data from PDFs."""
 
 import logging
-from typing import List, Dict, Tuple
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 import pdfplumber
 
 from src.config.extraction_config import ExtractionType, ExtractionConfig
 from src.models.extraction_data import ExtractionData
+from src.models.source_index import BBox, SourceLocation
+from src.models.extraction_events import (
+    BalanceEvent,
+    CodeOccurrenceEvent,
+    EventSink,
+    ExpiredEvent,
+    ExpiringSoonEvent,
+    ExtractionEvent,
+    FileCompletedEvent,
+    OrphanEvent,
+    ZeroBalanceEvent,
+)
 from src.utils.text_cleaner import clean_text, fix_doubled_chars
-from src.utils.date_utils import parse_expiry_date, is_expired, format_date
+from src.services.expiry_policy import ExpiryPolicy, ExpiryStatus
+from src.services.layout_detector import LayoutDetector, UndetectedLayoutError
+from src.utils.date_utils import parse_expiry_date, format_date
 from src.utils.regex_patterns import CODE_PATTERN
+from src.utils.profiling import profiled
+from src.utils.run_metrics import Counter, RunMetrics, Stage
 
 
 class PDFExtractor:
     """Extracts medicine data from PDF files."""
 
-    def __init__(self, extraction_type: ExtractionType):
+    def __init__(
+        self,
+        extraction_type: ExtractionType,
+        expiry_policy: Optional[ExpiryPolicy] = None,
+        layout_detector: Optional[LayoutDetector] = None,
+        metrics: Optional[RunMetrics] = None,
+        choose_type: Optional[Callable[[str], Optional[ExtractionType]]] = None
+    ):
         """
         Initialize PDF extractor.
 
         Args:
-            extraction_type: Type of extraction (Stock, Free, or Buy)
+            extraction_type: Type of extraction (Stock, Free, or Buy); with a
+                layout detector, the type used when a layout is not recognized
+            expiry_policy: Expiry cutoffs for the run (defaults to today's, fixed
+                for the lifetime of this extractor)
+            layout_detector: Optional detector choosing the type of each PDF
+                from its first page
+            metrics: Optional run metrics to record stage timings and counts in
+            choose_type: Optional callback(pdf_file) asked for the type of a
+                Free/Buy report the detector cannot tell apart; returning None
+                skips the file
         """
+        self.default_type = extraction_type
+        self.expiry_policy = expiry_policy or ExpiryPolicy.for_today()
+        self.layout_detector = layout_detector
+        self.metrics = metrics or RunMetrics()
+        self.choose_type = choose_type
+        # PDF path -> type chosen through choose_type
+        self.chosen_types: Dict[str, ExtractionType] = {}
+        self._set_file_type(extraction_type)
+
+    def _set_file_type(self, extraction_type: ExtractionType) -> None:
+        """Switch the type (and balance column) used for the current file."""
         self.extraction_type = extraction_type
         self.column_index = ExtractionConfig.get_pdf_column(extraction_type)
 
-    def extract_from_files(self, pdf_files: List[str], progress_callback=None) -> ExtractionData:
+    @profiled("pdf_extraction")
+    def extract_from_files(self, pdf_files: List[str], progress_callback=None, file_callback=None) -> ExtractionData:
         """
         Extract data from multiple PDF files.
 
         Args:
             pdf_files: List of PDF file paths
             progress_callback: Optional callback function for progress updates
+            file_callback: Optional callback(pdf_file, extraction_data) called after each file
 
         Returns:
             ExtractionData containing all extracted information
         """
         extraction_data = ExtractionData()
-        code_to_items: Dict[str, List] = {}  # Maps national_code -> [(item_code, name), ...]
 
+        # ExtractionData is a plain reducer over the event stream
+        for event in self.iter_events(pdf_files, progress_callback=progress_callback):
+            extraction_data.apply(event)
+            if file_callback and isinstance(event, FileCompletedEvent):
+                file_callback(event.pdf_file, extraction_data)
+
+        return extraction_data
+
+    def iter_events(self, pdf_files: List[str], progress_callback=None) -> Iterator[ExtractionEvent]:
+        """
+        Extract data from multiple PDF files, yielding events as they are produced.
+
+        Events are yielded after each table, so consumers can match, display
+        or write results incrementally while only one table is held in memory.
+        A FileCompletedEvent follows the last event of each file.
+
+        Args:
+            pdf_files: List of PDF file paths
+            progress_callback: Optional callback function for progress updates
+
+        Yields:
+            BalanceEvent, ExpiredEvent, ExpiringSoonEvent, ZeroBalanceEvent, CodeOccurrenceEvent
+            (from which duplicates are derived), OrphanEvent and
+            FileCompletedEvent records
+        """
         for i, pdf_file in enumerate(pdf_files):
             # Call progress callback if provided
             if progress_callback:
-                import os
                 filename = os.path.basename(pdf_file)
                 progress_callback(f"Processing PDF {i+1}/{len(pdf_files)}: {filename}")
 
-            logging.debug(f"Processing PDF {i+1}/{len(pdf_files)}: {pdf_file}")
-            self._extract_from_file(pdf_file, extraction_data, code_to_items)
+            logging.debug("Processing PDF %s/%s: %s", i + 1, len(pdf_files), pdf_file)
+            self.metrics.count(Counter.FILES)
+            yield from self._iter_file_events(pdf_file)
+            yield FileCompletedEvent(pdf_file, self.extraction_type)
 
-        # Duplicates are detected at the table level in _find_codes_in_table
-        return extraction_data
-
-    def _extract_from_file(
-        self,
-        pdf_file: str,
-        extraction_data: ExtractionData,
-        code_to_items: Dict[str, List]
-    ) -> None:
+    def _iter_file_events(self, pdf_file: str) -> Iterator[ExtractionEvent]:
         """
         Extract data from a single PDF file.
 
         Args:
             pdf_file: Path to PDF file
-            extraction_data: ExtractionData to populate
-            code_to_items: Dictionary tracking national_code -> list of items
+
+        Yields:
+            Events produced by each table, in document order
         """
-        import os
         pdf_filename = os.path.basename(pdf_file)
 
         # Track current_national_code across all pages/tables to handle cross-page items
         current_national_code = ""
+        table_events: List[ExtractionEvent] = []
+        self._set_file_type(self.default_type)
 
+        metrics = self.metrics
+        started = time.perf_counter()
         with pdfplumber.open(pdf_file) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                logging.debug(f"-- Processing Page {page_num + 1} --")
-                tables = page.extract_tables()
-
-                if not tables:
-                    logging.warning(f"No tables found on page {page_num + 1}")
+            pages = pdf.pages
+            metrics.add_time(Stage.PDF_OPEN, time.perf_counter() - started)
+
+            for page_num, page in enumerate(pages):
+                logging.debug("-- Processing Page %s --", page_num + 1)
+                metrics.count(Counter.PAGES)
+                # find_tables() is what extract_tables() uses internally; keeping the
+                # Table objects also gives us each row's bounding box for provenance
+                started = time.perf_counter()
+                found_tables = page.find_tables()
+                metrics.add_time(Stage.FIND_TABLES, time.perf_counter() - started)
+
+                # Mixed batches: pick this document's type from its first page
+                if page_num == 0 and self.layout_detector:
+                    self._set_file_type(self._detect_type(pdf_file, page, found_tables))
+                    logging.info("%s: extracting as %s", pdf_filename, self.extraction_type.value)
+
+                if not found_tables:
+                    logging.warning("No tables found on page %s", page_num + 1)
                     continue
 
-                for table_num, table in enumerate(tables):
-                    logging.debug(f"- Processing Table {table_num + 1} on Page {page_num + 1} -")
+                for table_num, found_table in enumerate(found_tables):
+                    started = time.perf_counter()
+                    table = found_table.extract()
+                    row_bboxes = [row.bbox for row in found_table.rows]
+                    metrics.add_time(Stage.EXTRACT_TABLES, time.perf_counter() - started)
+                    metrics.count(Counter.TABLES)
+                    metrics.count(Counter.ROWS, len(table))
+                    logging.debug("- Processing Table %s on Page %s -", table_num + 1, page_num + 1)
                     if page_num == 0:  # Log only first page
-                        logging.debug(f"Raw Table Content: {table}")
+                        logging.debug("Raw Table Content: %s", table)
 
                     # Pass and receive current_national_code to maintain state across tables
                     current_national_code = self._process_table(
-                        table, extraction_data, code_to_items, pdf_filename, current_national_code
+                        table, table_events.append, pdf_filename, current_national_code,
+                        page_number=page_num + 1, table_number=table_num + 1, row_bboxes=row_bboxes
                     )
+                    yield from table_events
+                    table_events.clear()
+
+    def _detect_type(self, pdf_file: str, page: Any, found_tables: List[Any]) -> ExtractionType:
+        """
+        Detect a report's type, asking choose_type when Free and Buy cannot be told apart.
+
+        Raises:
+            UndetectedLayoutError: If the type is undetected and not chosen
+        """
+        try:
+            return self.layout_detector.detect(page, found_tables, self.default_type)
+        except UndetectedLayoutError:
+            chosen = self.choose_type(pdf_file) if self.choose_type else None
+            if chosen is None:
+                raise
+            logging.info("%s: type chosen by the user: %s", os.path.basename(pdf_file), chosen.value)
+            self.chosen_types[pdf_file] = chosen
+            return chosen
 
     def _process_table(
         self,
         table: List[List[str]],
-        extraction_data: ExtractionData,
-        code_to_items: Dict[str, List],
+        emit: EventSink,
         pdf_filename: str = "",
-        current_national_code: str = ""
+        current_national_code: str = "",
+        page_number: int = 0,
+        table_number: int = 0,
+        row_bboxes: Optional[List[BBox]] = None
     ) -> str:
         """
         Process a single table from PDF.
 
         Args:
             table: Table data as list of rows
-            extraction_data: ExtractionData to populate
-            code_to_items: Dictionary mapping national_code -> list of items
+            emit: Callback receiving extraction events
             pdf_filename: Name of the PDF file being processed
             current_national_code: National code from previous table (for cross-page items)
+            page_number: Page number of this table (1-based)
+            table_number: Table number on the page (1-based)
+            row_bboxes: Bounding box of each table row, if known
 
         Returns:
             Last national code found in this table (for next table's context)
         """
         # Find all codes and their positions
+        metrics = self.metrics
+        started = time.perf_counter()
         code_positions = self._find_codes_in_table(
-            table, code_to_items, extraction_data, pdf_filename, current_national_code
+            table, emit, pdf_filename, current_national_code, page_number, table_number
         )
+        metrics.add_time(Stage.CLASSIFY_ROWS, time.perf_counter() - started)
+        started = time.perf_counter()
 
-        # Process each position to extract balance and check expiry
+        # First pass: collect item rows and parse their expiry dates
+        items = []
         for idx, (row_idx, national_code, item_code, name) in enumerate(code_positions):
             # Update current_national_code FIRST for cross-page tracking (even for header rows)
             if national_code:
@@ -126,17 +242,36 @@ class PDFExtractor:
             if not item_code:
                 continue
 
-            start_row = row_idx
             end_row = code_positions[idx + 1][0] if idx + 1 < len(code_positions) else len(table)
-
-            logging.debug(f"Processing national code '{national_code}', item '{item_code}'. Row range: {start_row} to {end_row - 1}")
-
-            # Check if item is expired
-            if self._is_item_expired(table, start_row, end_row, national_code, item_code, name, extraction_data, pdf_filename):
+            items.append((row_idx, end_row, national_code, item_code, name, self._read_expiry_date(table, row_idx)))
+
+        # Evaluate the expiry policy once for the whole table
+        statuses = self.expiry_policy.classify_batch([item[5] for item in items])
+        metrics.add_time(Stage.EXPIRY, time.perf_counter() - started)
+        metrics.count(Counter.ITEMS, len(items))
+        started = time.perf_counter()
+
+        # Second pass: emit expiry issues and extract balances of non-expired items
+        for (row_idx, end_row, national_code, item_code, name, expiry), status in zip(items, statuses):
+            logging.debug("Processing national code '%s', item '%s'. Row range: %s to %s", national_code, item_code, row_idx, end_row - 1)
+
+            # Provenance of the item row (expiry and balance are read from it)
+            bbox = row_bboxes[row_idx] if row_bboxes and row_idx < len(row_bboxes) else None
+            location = SourceLocation(page_number, table_number, row_idx + 1, bbox)
+
+            if status is ExpiryStatus.EXPIRED:
+                expiry_str = format_date(*expiry)
+                logging.debug("Item %s (national: %s) is EXPIRED with date %s. Skipping.", item_code, national_code, expiry_str)
+                emit(ExpiredEvent(national_code, item_code, name, expiry_str, pdf_filename, location))
                 continue
 
+            if status is ExpiryStatus.EXPIRING_SOON:
+                # Still in stock, so the balance is extracted as usual
+                emit(ExpiringSoonEvent(national_code, item_code, name, format_date(*expiry), pdf_filename, location))
+
             # Extract balance
-            self._extract_balance(table, row_idx, end_row, national_code, item_code, name, extraction_data, pdf_filename)
+            self._extract_balance(table, row_idx, end_row, national_code, item_code, name, emit, pdf_filename, location)
+        metrics.add_time(Stage.BALANCES, time.perf_counter() - started)
 
         # Return the last national code found in this table
         return current_national_code
@@ -175,7 +310,7 @@ class PDFExtractor:
             if not name and len(row) > 4 and row[4]:
                 name = fix_doubled_chars(str(row[4]).strip())
 
-            logging.debug(f"Found national code: {national_code}, name: {name}")
+            logging.debug("Found national code: %s, name: %s", national_code, name)
 
             # Check if this row also has an item code in column 6 or 10
             item_code = ""
@@ -184,13 +319,13 @@ class PDFExtractor:
                 col6_raw = str(row[6]).strip()
                 if re.match(r'^\d{4,7}$', col6_raw):
                     item_code = col6_raw
-                    logging.debug(f"  Found item code in col 6: {item_code}")
+                    logging.debug("  Found item code in col 6: %s", item_code)
             # Then try column 10 (Stock PDFs)
             elif len(row) > 10 and row[10]:
                 col10_raw = str(row[10]).strip()
                 if re.match(r'^\d{4,7}$', col10_raw):
                     item_code = col10_raw
-                    logging.debug(f"  Found item code in col 10: {item_code}")
+                    logging.debug("  Found item code in col 10: %s", item_code)
 
             if item_code:
                 return (national_code, item_code, False, name)  # Row with both code and item
@@ -207,7 +342,7 @@ class PDFExtractor:
                 name = ""
                 if len(row) > 4 and row[4]:
                     name = fix_doubled_chars(str(row[4]).strip())
-                logging.debug(f"Found item code in col 6: {item_code}, name: {name}")
+                logging.debug("Found item code in col 6: %s, name: %s", item_code, name)
                 return ("", item_code, False, name)
 
         # Then try column 10 (Stock PDFs)
@@ -219,7 +354,7 @@ class PDFExtractor:
                 name = ""
                 if len(row) > 8 and row[8]:
                     name = fix_doubled_chars(row[8].strip())
-                logging.debug(f"Found item code in col 10: {item_code}, name: {name}")
+                logging.debug("Found item code in col 10: %s, name: %s", item_code, name)
                 return ("", item_code, False, name)
 
         return ("", "", False, "")
@@ -227,10 +362,11 @@ class PDFExtractor:
     def _find_codes_in_table(
         self,
         table: List[List[str]],
-        code_to_items: Dict[str, List],
-        extraction_data: ExtractionData,
+        emit: EventSink,
         pdf_filename: str = "",
-        current_national_code: str = ""
+        current_national_code: str = "",
+        page_number: int = 0,
+        table_number: int = 0
     ) -> List[Tuple[int, str, str, str]]:
         """
         Find all national codes and their items in table.
@@ -242,16 +378,18 @@ class PDFExtractor:
 
         Args:
             table: Table data
-            code_to_items: Dictionary mapping national_code -> list of (item_code, name)
-            extraction_data: For recording items and duplicates
+            emit: Callback receiving code occurrence and orphan events
             pdf_filename: Name of the PDF file being processed
             current_national_code: National code from previous table (for cross-page items)
+            page_number: Page number of this table (1-based)
+            table_number: Table number on the page (1-based)
 
         Returns:
             List of (row_index, national_code, item_code, name) tuples for balance extraction
         """
         positions_for_balance = []
-        national_codes_in_this_table = []  # Track codes within this table
+        national_codes_in_this_table = set()  # Track codes within this table
+        occurrences = []  # [national_code, item_code, name, row_index] per national code header
         processed_items = set()  # Track (national_code, item_code) to avoid duplicates
         first_item_row = None  # Track first item found to detect cross-page continuation
 
@@ -266,23 +404,19 @@ class PDFExtractor:
                 # Found a national code
                 current_national_code = national_code.upper()
 
-                logging.debug(f"Row {r_idx}: National code - {current_national_code}, name: {name}")
+                logging.debug("Row %s: National code - %s, name: %s", r_idx, current_national_code, name)
 
                 # Check if this code already appeared in THIS table (true duplicate)
                 if current_national_code in national_codes_in_this_table:
-                    logging.warning(f"DUPLICATE DETECTED: National code {current_national_code} appears multiple times in same table!")
-
-                national_codes_in_this_table.append(current_national_code)
+                    logging.warning("DUPLICATE DETECTED: National code %s appears multiple times in same table!", current_national_code)
 
-                # Initialize or append items list
-                if current_national_code not in code_to_items:
-                    code_to_items[current_national_code] = []
+                national_codes_in_this_table.add(current_national_code)
+                occurrences.append([current_national_code, item_code, name, r_idx])
 
                 # If this row has both national code AND item code
                 if item_code:
                     if (current_national_code, item_code) not in processed_items:
-                        logging.debug(f"  Row {r_idx} has both national code and item code: {item_code}")
-                        code_to_items[current_national_code].append((item_code, name))
+                        logging.debug("  Row %s has both national code and item code: %s", r_idx, item_code)
                         positions_for_balance.append((r_idx, current_national_code, item_code, name))
                         processed_items.add((current_national_code, item_code))
                 else:
@@ -296,87 +430,55 @@ class PDFExtractor:
                     # Check if this is the first item in table and no national code found yet in this table
                     if first_item_row is None and not national_codes_in_this_table:
                         first_item_row = r_idx
-                        logging.info(f"ℹ️ Cross-page continuation in '{pdf_filename}': Item {item_code} ('{name}') assigned to national code {current_national_code} from previous page/table")
+                        logging.info("ℹ️ Cross-page continuation in '%s': Item %s ('%s') assigned to national code %s from previous page/table", pdf_filename, item_code, name, current_national_code)
 
-                    logging.debug(f"Row {r_idx}: Item {item_code} under national code {current_national_code}, name: {name}")
+                    logging.debug("Row %s: Item %s under national code %s, name: %s", r_idx, item_code, current_national_code, name)
 
-                    # Add this item to the national code's item list
-                    code_to_items[current_national_code].append((item_code, name))
+                    # A header-only occurrence is reported with its first item
+                    if occurrences and occurrences[-1][0] == current_national_code and not occurrences[-1][1]:
+                        occurrences[-1][1] = item_code
+                        occurrences[-1][2] = name or occurrences[-1][2]
 
                     # Track for balance extraction
                     positions_for_balance.append((r_idx, current_national_code, item_code, name))
                     processed_items.add((current_national_code, item_code))
             elif item_code and not current_national_code:
                 # ORPHAN ITEM: Item found without any national code header
-                logging.warning(f"⚠️ ORPHAN ITEM in '{pdf_filename}' at row {r_idx}: Item code '{item_code}', name '{name}' has NO national code header!")
-                logging.warning(f"   This item appears without a XX-XXX-XXX national code and will be SKIPPED.")
-                logging.warning(f"   Check PDF structure - this section may be missing its national code header.")
-
-        # Check for duplicates: if same code appears multiple times in this table
-        code_counts = {}
-        for code in national_codes_in_this_table:
-            code_counts[code] = code_counts.get(code, 0) + 1
-
-        for national_code, count in code_counts.items():
-            if count > 1:
-                # TRUE DUPLICATE: same national code appeared multiple times
-                logging.debug(f"DUPLICATE: {national_code} appeared {count} times in this table")
-                # Record all items under this duplicate code
-                if national_code in code_to_items:
-                    for item_code, name in code_to_items[national_code]:
-                        extraction_data.add_duplicate(national_code, item_code, name, pdf_filename)
+                logging.warning("⚠️ ORPHAN ITEM in '%s' at row %s: Item code '%s', name '%s' has NO national code header!", pdf_filename, r_idx, item_code, name)
+                logging.warning("   This item appears without a XX-XXX-XXX national code and will be SKIPPED.")
+                logging.warning("   Check PDF structure - this section may be missing its national code header.")
+                emit(OrphanEvent(item_code, name, pdf_filename, r_idx))
+
+        # Record every header occurrence; the duplicate index classifies
+        # repeats within this table, across tables and across files
+        for national_code, item_code, name, r_idx in occurrences:
+            emit(CodeOccurrenceEvent(
+                national_code, item_code, name, pdf_filename, page_number, table_number, r_idx + 1
+            ))
 
         return positions_for_balance
 
-    def _is_item_expired(
-        self,
-        table: List[List[str]],
-        start_row: int,
-        end_row: int,
-        national_code: str,
-        item_code: str,
-        name: str,
-        extraction_data: ExtractionData,
-        pdf_filename: str = ""
-    ) -> bool:
+    def _read_expiry_date(self, table: List[List[str]], row_idx: int) -> Optional[Tuple[int, int, int]]:
         """
-        Check if item is expired by scanning rows for expiry date.
+        Read the expiry date of an item row.
 
         Args:
             table: Table data
-            start_row: Start of item rows
-            end_row: End of item rows
-            national_code: National code (XX-XXX-XXX)
-            item_code: Item code (4-7 digits)
-            name: Item name
-            extraction_data: For recording expired items
-            pdf_filename: Name of the PDF file being processed
+            row_idx: Item row index
 
         Returns:
-            True if item is expired, False otherwise
+            (day, month, year) if the row has a valid date, None otherwise
         """
-        # Expiry is in column 0 of the current row (DOUBLED - need to fix)
-        if start_row < len(table) and len(table[start_row]) > 0:
-            cell_value = table[start_row][0]
+        # Expiry is in column 0 of the item row (DOUBLED - need to fix)
+        if row_idx < len(table) and len(table[row_idx]) > 0:
+            cell_value = table[row_idx][0]
             if cell_value:
                 # Apply fix_doubled to the expiry date
                 cell_value_fixed = fix_doubled_chars(cell_value.strip())
-                logging.debug(f"      Checking expiry for item {item_code}: raw='{cell_value}' fixed='{cell_value_fixed}'")
-
-                date_parts = parse_expiry_date(cell_value_fixed)
-                if date_parts:
-                    day, month, year = date_parts
-                    logging.debug(f"        Expiry parsed: {day}/{month}/{year}")
-
-                    if is_expired(day, month, year):
-                        expiry_str = format_date(day, month, year)
-                        logging.debug(f"Item {item_code} (national: {national_code}) is EXPIRED with date {expiry_str}. Skipping.")
-                        extraction_data.add_expired_item(national_code, item_code, name, expiry_str, pdf_filename)
-                        return True
-                    else:
-                        logging.debug(f"        Item {item_code} is NOT expired")
+                logging.debug("      Checking expiry: raw='%s' fixed='%s'", cell_value, cell_value_fixed)
+                return parse_expiry_date(cell_value_fixed)
 
-        return False
+        return None
 
     def _extract_balance(
         self,
@@ -386,8 +488,9 @@ class PDFExtractor:
         national_code: str,
         item_code: str,
         name: str,
-        extraction_data: ExtractionData,
-        pdf_filename: str = ""
+        emit: EventSink,
+        pdf_filename: str = "",
+        location: Optional[SourceLocation] = None
     ) -> None:
         """
         Extract balance value for an item.
@@ -399,8 +502,9 @@ class PDFExtractor:
             national_code: National code (XX-XXX-XXX)
             item_code: Item code (4-7 digits)
             name: Item name
-            extraction_data: For storing balance
+            emit: Callback receiving balance and zero balance events
             pdf_filename: Name of the PDF file being processed
+            location: Source location of the item row
         """
         # For STOCK type: Extract from item's own row (not the last row which might be TOTAL)
         # For FREE/BUY types: Keep original logic (find last non-empty row)
@@ -408,7 +512,7 @@ class PDFExtractor:
             # Stock type: Read balance from the item's own row (row_idx)
             if row_idx < len(table):
                 balance_row = table[row_idx]
-                logging.debug(f"      >>> [STOCK] Reading from item's own row {row_idx}: {balance_row}")
+                logging.debug("      >>> [STOCK] Reading from item's own row %s: %s", row_idx, balance_row)
 
                 # Check if this is a TOTAL row (has balance but NO item code in column 10)
                 # Total rows have empty item code in column 10 (the cell to the right of balance in RTL)
@@ -416,7 +520,7 @@ class PDFExtractor:
                     item_code_cell = balance_row[10]
                     if not item_code_cell or not str(item_code_cell).strip():
                         # This is a TOTAL row - skip it!
-                        logging.debug(f"        >>> TOTAL row detected (empty item code in col 10) - SKIPPING")
+                        logging.debug("        >>> TOTAL row detected (empty item code in col 10) - SKIPPING")
                         return
 
                 # Extract from column 7 (STOCK balance column)
@@ -426,28 +530,30 @@ class PDFExtractor:
                         try:
                             balance_str = str(cell).replace(',', '').strip()
                             balance = float(balance_str)
-                            logging.debug(f"        >>> Found balance for national '{national_code}' item '{item_code}': {balance}")
+                            logging.debug("        >>> Found balance for national '%s' item '%s': %s", national_code, item_code, balance)
 
                             # Check if balance is zero
                             if balance == 0:
-                                logging.debug(f"        >>> Zero balance detected for '{national_code}' item '{item_code}'")
-                                extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                                logging.debug("        >>> Zero balance detected for '%s' item '%s'", national_code, item_code)
+                                emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
 
-                            extraction_data.add_balance(national_code, balance, item_code, name, pdf_filename)
+                            emit(BalanceEvent(
+                                national_code, item_code, name, balance, pdf_filename, location, self.extraction_type
+                            ))
                         except (ValueError, TypeError):
-                            logging.warning(f"        Could not convert '{cell}' to number.")
+                            logging.warning("        Could not convert '%s' to number.", cell)
                     else:
                         # Cell is empty - no balance found
-                        logging.debug(f"        >>> No balance found (empty cell) for national '{national_code}' item '{item_code}'")
-                        extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                        logging.debug("        >>> No balance found (empty cell) for national '%s' item '%s'", national_code, item_code)
+                        emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
                 else:
-                    logging.warning(f"      Balance row does not have the required column index: {self.column_index}")
-                    extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                    logging.warning("      Balance row does not have the required column index: %s", self.column_index)
+                    emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
         else:
             # FREE/BUY types: Use same logic as STOCK - read from item's own row
             if row_idx < len(table):
                 balance_row = table[row_idx]
-                logging.debug(f"      >>> [FREE/BUY] Reading from item's own row {row_idx}: {balance_row}")
+                logging.debug("      >>> [FREE/BUY] Reading from item's own row %s: %s", row_idx, balance_row)
 
                 # Check if this is a TOTAL row (المجموع)
                 # TOTAL rows have: empty item code in column 6 OR contain "المجموع" text
@@ -458,18 +564,18 @@ class PDFExtractor:
                     item_code_cell = balance_row[6]
                     if not item_code_cell or not str(item_code_cell).strip():
                         is_total_row = True
-                        logging.debug(f"        >>> TOTAL row detected (empty item code in col 6)")
+                        logging.debug("        >>> TOTAL row detected (empty item code in col 6)")
 
                 # Also check if row contains "المجموع" text
                 if not is_total_row:
                     row_text = " ".join(str(cell) for cell in balance_row if cell)
                     if "المجموع" in row_text or "المجموع" in row_text:
                         is_total_row = True
-                        logging.debug(f"        >>> TOTAL row detected (contains المجموع text)")
+                        logging.debug("        >>> TOTAL row detected (contains المجموع text)")
 
                 # Skip TOTAL rows
                 if is_total_row:
-                    logging.debug(f"        >>> TOTAL row detected - SKIPPING")
+                    logging.debug("        >>> TOTAL row detected - SKIPPING")
                     return
 
                 # Extract from column 2 (الوارد/incoming column for FREE/BUY)
@@ -479,20 +585,22 @@ class PDFExtractor:
                         try:
                             balance_str = str(cell).replace(',', '').strip()
                             balance = float(balance_str)
-                            logging.debug(f"        >>> Found balance for national '{national_code}' item '{item_code}': {balance}")
+                            logging.debug("        >>> Found balance for national '%s' item '%s': %s", national_code, item_code, balance)
 
                             # Check if balance is zero
                             if balance == 0:
-                                logging.debug(f"        >>> Zero balance detected for '{national_code}' item '{item_code}'")
-                                extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                                logging.debug("        >>> Zero balance detected for '%s' item '%s'", national_code, item_code)
+                                emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
 
-                            extraction_data.add_balance(national_code, balance, item_code, name, pdf_filename)
+                            emit(BalanceEvent(
+                                national_code, item_code, name, balance, pdf_filename, location, self.extraction_type
+                            ))
                         except (ValueError, TypeError):
-                            logging.warning(f"        Could not convert '{cell}' to number.")
+                            logging.warning("        Could not convert '%s' to number.", cell)
                     else:
                         # Cell is empty - no balance found
-                        logging.debug(f"        >>> No balance found (empty cell) for national '{national_code}' item '{item_code}'")
-                        extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                        logging.debug("        >>> No balance found (empty cell) for national '%s' item '%s'", national_code, item_code)
+                        emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
                 else:
-                    logging.warning(f"      Balance row does not have the required column index: {self.column_index}")
-                    extraction_data.add_zero_balance_item(national_code, item_code, name, pdf_filename)
+                    logging.warning("      Balance row does not have the required column index: %s", self.column_index)
+                    emit(ZeroBalanceEvent(national_code, item_code, name, pdf_filename, location))
@@ -0,0 +1,361 @@
+"""Run snapshots - persisted results and per-file extraction caches."""
+
+import glob
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+from src.config.extraction_config import ExtractionType
+from src.config.settings import AppSettings
+from src.models.extraction_data import ExtractionResult
+from src.models.extraction_events import ExtractionEvent
+from src.services.data_validator import IncrementalValidator
+from src.services.master_index_cache import FileFingerprint, hash_file
+
+# Bump when the pickled layout of events, ExtractionData or the validator changes
+SNAPSHOT_FORMAT_VERSION = 4
+
+
+@dataclass
+class FileExtraction:
+    """Events extracted from one PDF, with what they depend on."""
+    fingerprint: FileFingerprint
+    options: Hashable  # Extraction settings the events were produced with
+    events: List[ExtractionEvent] = field(default_factory=list)
+
+
+@dataclass
+class RunSnapshot:
+    """Everything needed to reopen a run without re-parsing its PDFs."""
+    pdf_files: List[str]
+    excel_file: str
+    run_type: ExtractionType
+    validator: IncrementalValidator  # Holds the data, result, manual edits and aliases
+    created: datetime = field(default_factory=datetime.now)
+
+    @property
+    def result(self) -> ExtractionResult:
+        """Matching result of the run."""
+        return self.validator.result
+
+    @property
+    def excel_codes(self) -> Set[str]:
+        """Excel codes the run was matched against."""
+        return self.validator.excel_codes
+
+
+@dataclass
+class ExtractionBatch:
+    """An extraction run in progress, kept on disk until it completes."""
+    pdf_files: List[str]
+    excel_file: str
+    extraction_type: ExtractionType
+    auto_detect: bool
+    started: datetime = field(default_factory=datetime.now)
+
+
+class SnapshotStore:
+    """
+    On-disk store of recent runs and of per-file extraction events.
+
+    A PDF's events are reused while its size and mtime are unchanged (or its
+    content hash matches, as for the master index) and it is extracted with
+    the same options. Replaying cached events rebuilds the file's share of
+    ExtractionData without opening the PDF, so a run over an overlapping file
+    set only parses new or modified files.
+
+    Runs are kept one file per run (named after its creation time), so saving
+    a run again replaces it and the few previous runs stay available as
+    comparison baselines.
+
+    Each file's events are also appended to a checkpoint journal as soon as
+    the file completes, so a batch that crashes keeps every finished file;
+    flush() folds the journals into the per-file cache.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Initialize store.
+
+        Args:
+            cache_dir: Directory for snapshots (defaults to AppSettings.CACHE_DIR)
+        """
+        self.cache_dir = cache_dir or AppSettings().CACHE_DIR
+        self.files_path = os.path.join(self.cache_dir, "extracted_files.pkl")
+        self.runs_dir = os.path.join(self.cache_dir, "runs")
+        self.batch_path = os.path.join(self.cache_dir, "batch.pkl")
+        self._lock = threading.Lock()
+        self._files: Optional[Dict[str, FileExtraction]] = None  # Loaded on first use
+        self._files_mtime: Optional[int] = None  # mtime_ns of the cache file when last read
+        self._journals: Set[str] = set()  # Checkpoint journals merged into _files
+        self._dirty = False
+
+    def cached_events(self, pdf_file: str, options: Hashable) -> Optional[List[ExtractionEvent]]:
+        """
+        Get the cached events of a PDF if it is unchanged.
+
+        Args:
+            pdf_file: Path to the PDF file
+            options: Extraction settings of the current run
+
+        Returns:
+            Events of the file (ending with its FileCompletedEvent), or None
+            if the file must be extracted
+        """
+        key = os.path.abspath(pdf_file)
+        with self._lock:
+            entry = self._file_entries().get(key)
+            if entry is None or entry.options != options:
+                # Another process sharing the cache (a job server worker) may have extracted it since
+                entry = self._reload_entry(key) or entry
+        if entry is None or entry.options != options:
+            return None
+
+        try:
+            stat = os.stat(key)
+        except OSError:
+            return None
+        if entry.fingerprint.matches_stat(stat):
+            return entry.events
+
+        # Stat changed - fall back to comparing content
+        sha256 = hash_file(key)
+        if sha256 != entry.fingerprint.sha256:
+            return None
+        with self._lock:
+            entry.fingerprint = FileFingerprint(stat.st_size, stat.st_mtime_ns, sha256)
+            self._dirty = True
+        return entry.events
+
+    def store_events(self, pdf_file: str, options: Hashable, events: List[ExtractionEvent]) -> None:
+        """
+        Remember the events extracted from a PDF and checkpoint them to disk.
+
+        Args:
+            pdf_file: Path to the PDF file
+            options: Extraction settings the events were produced with
+            events: All events of the file, including its FileCompletedEvent
+        """
+        key = os.path.abspath(pdf_file)
+        stat = os.stat(key)
+        fingerprint = FileFingerprint(stat.st_size, stat.st_mtime_ns, hash_file(key))
+        entry = FileExtraction(fingerprint, options, list(events))
+        with self._lock:
+            self._file_entries()[key] = entry
+            self._dirty = True
+            self._append_checkpoint(key, entry)
+
+    def flush(self) -> None:
+        """Persist the per-file cache, dropping entries of files that no longer exist."""
+        with self._lock:
+            if not self._dirty and not self._journals:
+                return
+            files = self._file_entries()
+            # Other processes (job server workers) may share the cache; keep their entries
+            on_disk = self._read(self.files_path)
+            if isinstance(on_disk, dict):
+                for key, entry in on_disk.items():
+                    files.setdefault(key, entry)
+            for key in [key for key in files if not os.path.exists(key)]:
+                del files[key]
+            if not self._write(self.files_path, files):
+                return  # Keep the journals; the next flush retries
+            self._dirty = False
+            self._files_mtime = self._cache_mtime()
+
+            # Everything journalled is now in the cache file
+            for journal_path in self._journals:
+                try:
+                    os.remove(journal_path)
+                except OSError:
+                    pass
+            self._journals.clear()
+
+    def begin_batch(self, batch: ExtractionBatch) -> None:
+        """
+        Record an extraction run as in progress, so it can be resumed after a crash.
+
+        Args:
+            batch: Inputs of the run
+        """
+        with self._lock:
+            self._write(self.batch_path, batch)
+
+    def end_batch(self) -> None:
+        """Mark the extraction run in progress as finished."""
+        with self._lock:
+            try:
+                os.remove(self.batch_path)
+            except FileNotFoundError:
+                pass
+
+    def interrupted_batch(self) -> Optional[ExtractionBatch]:
+        """
+        Get the extraction run that was in progress when the last session ended.
+
+        Returns:
+            The unfinished ExtractionBatch, or None if the last run completed
+        """
+        batch = self._read(self.batch_path)
+        return batch if isinstance(batch, ExtractionBatch) else None
+
+    def save_run(self, snapshot: RunSnapshot) -> None:
+        """
+        Persist a run so it can be reopened without extraction.
+
+        Args:
+            snapshot: Run to save (replaces an earlier save of the same run)
+        """
+        path = os.path.join(self.runs_dir, f"run_{snapshot.created:%Y%m%d_%H%M%S_%f}.pkl")
+        with self._lock:
+            self._write(path, snapshot)
+            for old_path in self.list_runs()[AppSettings().SNAPSHOT_KEEP_RUNS:]:
+                try:
+                    os.remove(old_path)
+                except OSError as e:
+                    logging.warning(f"Could not remove old snapshot {old_path}: {e}")
+
+    def list_runs(self) -> List[str]:
+        """
+        List the saved runs.
+
+        Returns:
+            Snapshot paths, newest first
+        """
+        try:
+            names = os.listdir(self.runs_dir)
+        except FileNotFoundError:
+            return []
+        # Timestamped names sort chronologically
+        return [
+            os.path.join(self.runs_dir, name)
+            for name in sorted(names, reverse=True)
+            if name.startswith("run_") and name.endswith(".pkl")
+        ]
+
+    def load_run(self, path: Optional[str] = None) -> Optional[RunSnapshot]:
+        """
+        Load a saved run.
+
+        Args:
+            path: Snapshot path from list_runs() (defaults to the newest run)
+
+        Returns:
+            The RunSnapshot, or None if there is none (or it is unreadable/outdated)
+        """
+        if path is None:
+            runs = self.list_runs()
+            if not runs:
+                return None
+            path = runs[0]
+        snapshot = self._read(path)
+        return snapshot if isinstance(snapshot, RunSnapshot) else None
+
+    def _file_entries(self) -> Dict[str, FileExtraction]:
+        """Per-file cache, read from disk on first use (call with the lock held)."""
+        if self._files is None:
+            self._files_mtime = self._cache_mtime()
+            files = self._read(self.files_path)
+            self._files = files if isinstance(files, dict) else {}
+            # Files checkpointed by runs that did not reach flush() (e.g. crashed)
+            for journal_path in sorted(glob.glob(os.path.join(self.cache_dir, "checkpoint_*.pkl"))):
+                self._files.update(self._read_journal(journal_path))
+                self._journals.add(journal_path)
+                self._dirty = True
+        return self._files
+
+    def _reload_entry(self, key: str) -> Optional[FileExtraction]:
+        """
+        Merge entries flushed by other processes if the cache file changed (call with the lock held).
+
+        Args:
+            key: Absolute path of the file being looked up
+
+        Returns:
+            The on-disk entry of key, or None if the file is unchanged or has none
+        """
+        mtime = self._cache_mtime()
+        if mtime is None or mtime == self._files_mtime:
+            return None
+        self._files_mtime = mtime
+        on_disk = self._read(self.files_path)
+        if not isinstance(on_disk, dict):
+            return None
+
+        files = self._file_entries()
+        for other_key, entry in on_disk.items():
+            files.setdefault(other_key, entry)
+        entry = on_disk.get(key)
+        if entry is not None:
+            # Ours missed (absent or other options), so the disk copy is at least as useful
+            files[key] = entry
+        return entry
+
+    def _cache_mtime(self) -> Optional[int]:
+        """mtime_ns of the per-file cache file, or None if it does not exist."""
+        try:
+            return os.stat(self.files_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _append_checkpoint(self, key: str, entry: FileExtraction) -> None:
+        """Append one file's events to this process's journal (call with the lock held)."""
+        journal_path = os.path.join(self.cache_dir, f"checkpoint_{os.getpid()}.pkl")
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(journal_path, "ab") as f:
+                pickle.dump((SNAPSHOT_FORMAT_VERSION, key, entry), f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journals.add(journal_path)
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f"Could not checkpoint {key}: {e}")
+
+    @staticmethod
+    def _read_journal(path: str) -> Dict[str, FileExtraction]:
+        """Read a checkpoint journal, stopping at a record cut short by a crash."""
+        entries: Dict[str, FileExtraction] = {}
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    try:
+                        version, key, entry = pickle.load(f)
+                    except EOFError:
+                        break
+                    if version == SNAPSHOT_FORMAT_VERSION:
+                        entries[key] = entry
+        except Exception as e:
+            logging.warning(f"Checkpoint {path} is truncated; keeping {len(entries)} file(s): {e}")
+        return entries
+
+    @staticmethod
+    def _read(path: str) -> Any:
+        """Load a persisted object, or None if missing/unreadable/outdated."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                version, value = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable snapshot {path}: {e}")
+            return None
+        if version != SNAPSHOT_FORMAT_VERSION:
+            return None
+        return value
+
+    def _write(self, path: str, value: Any) -> bool:
+        """Persist an object atomically; failures only cost a re-extraction."""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"  # Unique per process sharing the directory
+            with open(tmp_path, "wb") as f:
+                pickle.dump((SNAPSHOT_FORMAT_VERSION, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            return True
+        except (OSError, pickle.PicklingError) as e:
+            logging.warning(f"Could not save snapshot {path}: {e}")
+            return False
@@ -0,0 +1,88 @@
+"""Source renderer - renders the PDF region a record was extracted from."""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pdfplumber
+from PIL import Image, ImageDraw
+
+from src.config.settings import AppSettings
+from src.models.source_index import SourceLocation
+
+# Vertical context shown around the highlighted row, in PDF points
+CONTEXT_MARGIN = 60
+
+
+class SourceRenderer:
+    """Renders PDF pages on demand and keeps the most recent ones in an LRU cache."""
+
+    def __init__(self, resolution: Optional[int] = None, cache_size: Optional[int] = None):
+        """
+        Initialize renderer.
+
+        Args:
+            resolution: Render DPI (defaults to AppSettings.SOURCE_RENDER_RESOLUTION)
+            cache_size: Number of rendered pages to keep (defaults to AppSettings.SOURCE_PAGE_CACHE_SIZE)
+        """
+        settings = AppSettings()
+        self.resolution = resolution or settings.SOURCE_RENDER_RESOLUTION
+        self.cache_size = cache_size or settings.SOURCE_PAGE_CACHE_SIZE
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[Tuple[str, int], Tuple[Image.Image, float]]" = OrderedDict()
+
+    def render(self, pdf_path: str, location: SourceLocation) -> Image.Image:
+        """
+        Render the region of a page around a record, with its row highlighted.
+
+        Args:
+            pdf_path: Full path to the PDF file
+            location: Page/table/row (and bbox) of the record
+
+        Returns:
+            PIL image of the region (the whole page if no bbox is known)
+        """
+        page_image, scale = self._get_page(pdf_path, location.page)
+        if not location.bbox:
+            return page_image.copy()
+
+        x0, top, x1, bottom = location.bbox
+        crop_top = max(0, int((top - CONTEXT_MARGIN) * scale))
+        crop_bottom = min(page_image.height, int((bottom + CONTEXT_MARGIN) * scale))
+        region = page_image.crop((0, crop_top, page_image.width, crop_bottom)).convert("RGB")
+
+        draw = ImageDraw.Draw(region)
+        draw.rectangle(
+            (int(x0 * scale), int(top * scale) - crop_top, int(x1 * scale), int(bottom * scale) - crop_top),
+            outline="#d62828",
+            width=3
+        )
+        return region
+
+    def _get_page(self, pdf_path: str, page_number: int) -> Tuple[Image.Image, float]:
+        """Get a rendered page (and points -> pixels scale), rendering it on a cache miss."""
+        key = (pdf_path, page_number)
+        with self._lock:
+            cached = self._pages.get(key)
+            if cached is not None:
+                self._pages.move_to_end(key)
+                return cached
+
+        logging.debug(f"Rendering page {page_number} of {pdf_path}")
+        with pdfplumber.open(pdf_path) as pdf:
+            page = pdf.pages[page_number - 1]
+            image = page.to_image(resolution=self.resolution).original.copy()
+            scale = image.width / float(page.width)
+
+        with self._lock:
+            self._pages[key] = (image, scale)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.cache_size:
+                self._pages.popitem(last=False)
+        return image, scale
+
+    def clear(self) -> None:
+        """Drop all cached pages."""
+        with self._lock:
+            self._pages.clear()
@@ -0,0 +1,103 @@
+"""Background job runner that reports progress back to the Tk thread."""
+
+import logging
+import queue
+import threading
+import tkinter as tk
+from typing import Any, Callable, Optional
+
+from src.utils.cancellation import OperationCancelled
+
+ProgressCallback = Callable[[str], None]
+
+
+class BackgroundJob:
+    """
+    Run a blocking operation on a worker thread with progress and cancellation.
+
+    The target is called as ``target(progress_callback, cancel_event)``.
+    Progress messages are queued by the worker and delivered on the Tk thread
+    by polling, so no widget is ever touched from the worker.
+    """
+
+    POLL_INTERVAL_MS = 100
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        target: Callable[[ProgressCallback, threading.Event], Any],
+        on_success: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        on_cancelled: Callable[[], None],
+        on_progress: Optional[ProgressCallback] = None
+    ):
+        """
+        Initialize background job.
+
+        Args:
+            root: Root Tk window (used for scheduling polls)
+            target: Function doing the work on the worker thread
+            on_success: Called with the target's return value
+            on_error: Called with the exception raised by the target
+            on_cancelled: Called when the target stopped due to cancellation
+            on_progress: Called with each progress message
+        """
+        self.root = root
+        self.target = target
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_cancelled = on_cancelled
+        self.on_progress = on_progress
+
+        self.cancel_event = threading.Event()
+        self._messages: "queue.Queue[str]" = queue.Queue()
+        self._result: Any = None
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        """Start the worker thread and begin polling for completion."""
+        self._thread.start()
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
+
+    def cancel(self) -> None:
+        """Request cooperative cancellation of the running job."""
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        """Check whether the worker thread is still running."""
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        """Worker thread body."""
+        try:
+            self._result = self.target(self._messages.put, self.cancel_event)
+        except Exception as e:  # Reported on the Tk thread
+            self._error = e
+
+    def _drain_messages(self) -> None:
+        """Deliver queued progress messages (only the latest one matters)."""
+        latest = None
+        while True:
+            try:
+                latest = self._messages.get_nowait()
+            except queue.Empty:
+                break
+        if latest is not None and self.on_progress:
+            self.on_progress(latest)
+
+    def _poll(self) -> None:
+        """Check the worker from the Tk thread and dispatch completion."""
+        self._drain_messages()
+
+        if self._thread.is_alive():
+            self.root.after(self.POLL_INTERVAL_MS, self._poll)
+            return
+
+        if isinstance(self._error, OperationCancelled):
+            self.on_cancelled()
+        elif self._error is not None:
+            logging.error(f"Background job failed: {self._error}")
+            self.on_error(self._error)
+        else:
+            self.on_success(self._result)
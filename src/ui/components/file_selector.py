@@ -63,10 +63,7 @@ class FileSelector(ttk.Frame):
         if self.multiple:
             files = filedialog.askopenfilenames(filetypes=self.file_types)
             if files:
-                self.selected_files = list(files)
-                self.status_label.config(
-                    text=f"{len(files)} file{'s' if len(files) > 1 else ''} selected",
-                )
+                self.set_files(files)
                 if self.on_select:
                     self.on_select(self.selected_files)
         else:
@@ -79,6 +76,13 @@ class FileSelector(ttk.Frame):
                 if self.on_select:
                     self.on_select(self.selected_file)
 
+    def set_files(self, files: List[str]) -> None:
+        """Set the selected files (for multiple selection) without notifying on_select."""
+        self.selected_files = list(files)
+        self.status_label.config(
+            text=f"{len(files)} file{'s' if len(files) > 1 else ''} selected" if files else "No files selected",
+        )
+
     def get_files(self) -> List[str]:
         """Get selected files (for multiple selection)."""
         return self.selected_files
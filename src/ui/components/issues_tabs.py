@@ -1,4 +1,4 @@
-"""Issues tabs component showing expired items and duplicates."""
+"""Issues tabs component showing expired, expiring, duplicate and zero balance items."""
 
 import tkinter as tk
 from tkinter import ttk, messagebox
@@ -7,6 +7,7 @@ from typing import Callable, Optional
 from src.ui.widgets.data_tree import DataTreeView
 from src.config.settings import AppSettings
 from src.models.extraction_data import ExtractionResult
+from src.utils.sort_keys import date_key, numeric_key
 
 
 class IssuesTabs(ttk.Notebook):
@@ -16,6 +17,7 @@ class IssuesTabs(ttk.Notebook):
         self,
         parent: tk.Widget,
         on_export_expired: Optional[Callable] = None,
+        on_export_expiring_soon: Optional[Callable] = None,
         on_export_duplicates: Optional[Callable] = None,
         on_export_zero_balance: Optional[Callable] = None,
         **kwargs
@@ -26,11 +28,13 @@ class IssuesTabs(ttk.Notebook):
         Args:
             parent: Parent widget
             on_export_expired: Callback for exporting expired items
+            on_export_expiring_soon: Callback for exporting items expiring soon
             on_export_duplicates: Callback for exporting duplicates
         """
         super().__init__(parent, **kwargs)
         self.settings = AppSettings()
         self.on_export_expired = on_export_expired
+        self.on_export_expiring_soon = on_export_expiring_soon
         self.on_export_duplicates = on_export_duplicates
         self.on_export_zero_balance = on_export_zero_balance
 
@@ -52,7 +56,8 @@ class IssuesTabs(ttk.Notebook):
                 ("Expiry", "Expiry Date", 100),
                 ("PDFFile", "PDF File", 150),
             ],
-            height=self.settings.TREE_HEIGHT
+            height=self.settings.TREE_HEIGHT,
+            sort_keys={"Expiry": date_key}
         )
         self.expired_tree.pack(fill="both", expand=True)
 
@@ -62,13 +67,42 @@ class IssuesTabs(ttk.Notebook):
             command=self._export_expired,
         ).pack(pady=5)
 
-        # Tab 2: Duplicate Codes
+        # Tab 2: Expiring Soon
+        expiring_soon_frame = ttk.Frame(self)
+        self.add(expiring_soon_frame, text="Expiring Soon")
+
+        ttk.Label(
+            expiring_soon_frame,
+            text=f"These items are still counted but expire within {self.settings.EXPIRY_HORIZON_MONTHS} month(s):",
+        ).pack(pady=5)
+
+        self.expiring_soon_tree = DataTreeView(
+            expiring_soon_frame,
+            columns=[
+                ("NationalCode", "National Code", 120),
+                ("ItemCode", "Item Code", 80),
+                ("Name", "Item Name", 200),
+                ("Expiry", "Expiry Date", 100),
+                ("PDFFile", "PDF File", 150),
+            ],
+            height=self.settings.TREE_HEIGHT,
+            sort_keys={"Expiry": date_key}
+        )
+        self.expiring_soon_tree.pack(fill="both", expand=True)
+
+        ttk.Button(
+            expiring_soon_frame,
+            text="Export to Excel",
+            command=self._export_expiring_soon,
+        ).pack(pady=5)
+
+        # Tab 3: Duplicate Codes
         duplicate_frame = ttk.Frame(self)
         self.add(duplicate_frame, text="Duplicate Codes")
 
         ttk.Label(
             duplicate_frame,
-            text="These national codes are assigned to more than one item in the PDF:",
+            text="These national codes appear more than once (within a table, across tables, or across files):",
         ).pack(pady=5)
 
         self.duplicate_tree = DataTreeView(
@@ -76,10 +110,15 @@ class IssuesTabs(ttk.Notebook):
             columns=[
                 ("NationalCode", "National Code", 120),
                 ("ItemCode", "Item Code", 80),
-                ("Name", "Item Name", 250),
+                ("Name", "Item Name", 200),
                 ("PDFFile", "PDF File", 150),
+                ("Category", "Category", 100),
+                ("Page", "Page", 50),
+                ("Table", "Table", 50),
+                ("Row", "Row", 50),
             ],
-            height=self.settings.TREE_HEIGHT
+            height=self.settings.TREE_HEIGHT,
+            sort_keys={"Page": numeric_key, "Table": numeric_key, "Row": numeric_key}
         )
         self.duplicate_tree.pack(fill="both", expand=True)
 
@@ -89,7 +128,7 @@ class IssuesTabs(ttk.Notebook):
             command=self._export_duplicates,
         ).pack(pady=5)
 
-        # Tab 3: Zero Balance Items
+        # Tab 4: Zero Balance Items
         zero_balance_frame = ttk.Frame(self)
         self.add(zero_balance_frame, text="Zero Balance Items")
 
@@ -127,6 +166,7 @@ class IssuesTabs(ttk.Notebook):
         """
         # Clear existing data
         self.expired_tree.clear()
+        self.expiring_soon_tree.clear()
         self.duplicate_tree.clear()
         self.zero_balance_tree.clear()
 
@@ -134,14 +174,24 @@ class IssuesTabs(ttk.Notebook):
         for national_code, item_code, name, expiry_date, pdf_filename in result.expired_items:
             self.expired_tree.insert((national_code, item_code, name, expiry_date, pdf_filename))
 
+        # Populate items expiring soon
+        for national_code, item_code, name, expiry_date, pdf_filename in result.expiring_soon_items:
+            self.expiring_soon_tree.insert((national_code, item_code, name, expiry_date, pdf_filename))
+
         # Populate duplicates
-        for national_code, item_code, name, pdf_filename in result.duplicates:
-            self.duplicate_tree.insert((national_code, item_code, name, pdf_filename))
+        for duplicate in result.duplicates:
+            self.duplicate_tree.insert(tuple(duplicate))
 
         # Populate zero balance items
         for national_code, item_code, name, pdf_filename in result.zero_balance_items:
             self.zero_balance_tree.insert((national_code, item_code, name, pdf_filename))
 
+        # Keep any column sort the user picked
+        self.expired_tree.resort()
+        self.expiring_soon_tree.resort()
+        self.duplicate_tree.resort()
+        self.zero_balance_tree.resort()
+
     def _export_expired(self) -> None:
         """Handle export expired button click."""
         if not self.expired_tree.get_children():
@@ -151,6 +201,15 @@ class IssuesTabs(ttk.Notebook):
         if self.on_export_expired:
             self.on_export_expired()
 
+    def _export_expiring_soon(self) -> None:
+        """Handle export expiring soon button click."""
+        if not self.expiring_soon_tree.get_children():
+            messagebox.showwarning("Warning", "No items expiring soon to export.")
+            return
+
+        if self.on_export_expiring_soon:
+            self.on_export_expiring_soon()
+
     def _export_duplicates(self) -> None:
         """Handle export duplicates button click."""
         if not self.duplicate_tree.get_children():
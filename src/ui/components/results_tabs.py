@@ -6,7 +6,9 @@ from typing import Callable, Optional
 
 from src.ui.widgets.data_tree import DataTreeView
 from src.config.settings import AppSettings
+from src.config.extraction_config import ExtractionType
 from src.models.extraction_data import ExtractionResult
+from src.utils.sort_keys import natural_key, numeric_key
 
 
 class ResultsTabs(ttk.Notebook):
@@ -16,6 +18,8 @@ class ResultsTabs(ttk.Notebook):
         self,
         parent: tk.Widget,
         on_export_unmatched: Optional[Callable] = None,
+        on_show_source: Optional[Callable[[str, Optional[str], Optional[str]], None]] = None,
+        on_accept_suggestion: Optional[Callable[[str, str], None]] = None,
         **kwargs
     ):
         """
@@ -24,10 +28,19 @@ class ResultsTabs(ttk.Notebook):
         Args:
             parent: Parent widget
             on_export_unmatched: Callback for exporting unmatched codes
+            on_show_source: Callback(national_code, item_code, pdf_filename) to show where a
+                row was extracted from; item_code/pdf_filename are None for matched rows
+            on_accept_suggestion: Callback(national_code, excel_code) to treat an unmatched
+                code as the suggested Excel code
         """
         super().__init__(parent, **kwargs)
         self.settings = AppSettings()
         self.on_export_unmatched = on_export_unmatched
+        self.on_show_source = on_show_source
+        self.on_accept_suggestion = on_accept_suggestion
+
+        # Top suggestion per unmatched national code, for the accept action
+        self._suggestions = {}
 
         # Tab 1: Matched items
         matched_frame = ttk.Frame(self)
@@ -37,11 +50,13 @@ class ResultsTabs(ttk.Notebook):
             matched_frame,
             columns=[
                 ("Code", "National Code", 150),
+                ("Type", "Report Type", 90),
                 ("Balance", "Auto-Extracted", 150),
                 ("Status", "Status", 100),
                 ("Manual", "Manual Entry", 150),
             ],
-            height=self.settings.TREE_HEIGHT
+            height=self.settings.TREE_HEIGHT,
+            sort_keys={"Balance": numeric_key, "Manual": numeric_key}
         )
         self.matched_tree.pack(fill="both", expand=True)
 
@@ -49,7 +64,11 @@ class ResultsTabs(ttk.Notebook):
         self.matched_tree.configure_tag("success", background="#d4edda")
         self.matched_tree.configure_tag("missing", background="#f8d7da")
 
-
+        ttk.Button(
+            matched_frame,
+            text="Show Source",
+            command=self._show_matched_source,
+        ).pack(pady=5)
 
         # Tab 2: Unmatched codes
         unmatched_frame = ttk.Frame(self)
@@ -69,16 +88,35 @@ class ResultsTabs(ttk.Notebook):
                 ("Name", "Item Name", 200),
                 ("Balance", "Balance", 80),
                 ("PDFFile", "PDF File", 150),
+                ("Suggestions", "Did You Mean", 200),
             ],
-            height=self.settings.TREE_HEIGHT
+            height=self.settings.TREE_HEIGHT,
+            sort_keys={"Balance": numeric_key}
         )
         self.unmatched_tree.pack(fill="both", expand=True)
+        # Double-click only shows the suggestions; merging needs a confirmation
+        self.unmatched_tree.bind_double_click(lambda event: self._accept_suggestion(confirm=True))
+
+        unmatched_buttons = ttk.Frame(unmatched_frame)
+        unmatched_buttons.pack(pady=5)
 
         ttk.Button(
-            unmatched_frame,
+            unmatched_buttons,
+            text="Show Source",
+            command=self._show_unmatched_source,
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            unmatched_buttons,
+            text="Accept Suggestion",
+            command=self._accept_suggestion,
+        ).pack(side="left", padx=5)
+
+        ttk.Button(
+            unmatched_buttons,
             text="Export to Excel",
             command=self._export_unmatched,
-        ).pack(pady=5)
+        ).pack(side="left", padx=5)
 
 
 
@@ -94,22 +132,36 @@ class ResultsTabs(ttk.Notebook):
         self.matched_tree.clear()
         self.unmatched_tree.clear()
 
-        # Populate matched items (includes both matched and missing)
-        for code in all_excel_codes:
-            if code in result.matched_codes:
-                balance = result.matched_codes[code]
-                status = "✓ OK"
-                tag = "success"
-            else:
-                balance = ""
-                status = "✗ Missing"
-                tag = "missing"
+        # Populate matched items (includes both matched and missing), one row per
+        # report type since each type's balance goes to its own Excel column.
+        # Codes come from a set, so fix a natural order for stable output
+        for code in sorted(all_excel_codes, key=natural_key):
+            if code not in result.matched_codes:
+                self.matched_tree.insert((code, "", "", "✗ Missing", ""), tags=("missing",))
+                continue
 
-            self.matched_tree.insert((code, balance, status, ""), tags=(tag,))
+            by_type = result.matched_by_type.get(code)
+            if not by_type:
+                self.matched_tree.insert((code, "", result.matched_codes[code], "✓ OK", ""), tags=("success",))
+            for extraction_type in sorted(by_type or (), key=lambda t: t.value):
+                self.matched_tree.insert(
+                    (code, extraction_type.value, by_type[extraction_type], "✓ OK", ""), tags=("success",)
+                )
 
-        # Populate unmatched codes
+        # Populate unmatched codes with their near-match suggestions
+        self._suggestions = {
+            national_code: suggestions[0].code
+            for national_code, suggestions in result.suggestions.items()
+        }
         for national_code, item_code, name, balance, pdf_filename in result.unmatched_codes:
-            self.unmatched_tree.insert((national_code, item_code, name, balance, pdf_filename))
+            suggestions = ", ".join(
+                suggestion.code for suggestion in result.suggestions.get(national_code, ())
+            )
+            self.unmatched_tree.insert((national_code, item_code, name, balance, pdf_filename, suggestions))
+
+        # Keep any column sort the user picked
+        self.matched_tree.resort()
+        self.unmatched_tree.resort()
 
     def get_matched_selection(self) -> Optional[tuple]:
         """
@@ -123,21 +175,22 @@ class ResultsTabs(ttk.Notebook):
             return None
         return self.matched_tree.get_item_values(selection[0])
 
-    def update_matched_item(self, code: str, balance: float) -> None:
+    def update_matched_item(self, code: str, extraction_type: ExtractionType, balance: float) -> None:
         """
         Update a matched item with new balance.
 
         Args:
             code: Code to update
+            extraction_type: Report type of the balance (a missing code's row takes it)
             balance: New balance value
         """
-        # Find and update the item
+        # Find and update the item's row of this type (or its untyped row)
         for item_id in self.matched_tree.get_children():
             values = self.matched_tree.get_item_values(item_id)
-            if values[0] == code:
+            if values[0] == code and values[1] in (extraction_type.value, ""):
                 self.matched_tree.update_item(
                     item_id,
-                    (code, balance, "✓ Manual", ""),
+                    (code, extraction_type.value, balance, "✓ Manual", ""),
                     tags=("success",)
                 )
                 break
@@ -150,3 +203,55 @@ class ResultsTabs(ttk.Notebook):
 
         if self.on_export_unmatched:
             self.on_export_unmatched()
+
+    def _show_matched_source(self) -> None:
+        """Show the PDF source of the selected matched code."""
+        selected = self.get_matched_selection()
+        if not selected:
+            messagebox.showwarning("Warning", "Please select a row first")
+            return
+
+        if self.on_show_source:
+            self.on_show_source(str(selected[0]), None, None)
+
+    def _show_unmatched_source(self) -> None:
+        """Show the PDF source of the selected unmatched item."""
+        selection = self.unmatched_tree.get_selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a row first")
+            return
+
+        national_code, item_code, _name, _balance, pdf_filename, _suggestions = (
+            self.unmatched_tree.get_item_values(selection[0])
+        )
+        if self.on_show_source:
+            self.on_show_source(str(national_code), str(item_code), str(pdf_filename))
+
+    def _accept_suggestion(self, confirm: bool = False) -> None:
+        """
+        Accept the closest suggestion for the selected unmatched code.
+
+        Args:
+            confirm: Show all suggestions and ask before merging the balance
+        """
+        selection = self.unmatched_tree.get_selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a row first")
+            return
+
+        values = self.unmatched_tree.get_item_values(selection[0])
+        national_code, suggestions = str(values[0]), str(values[-1])
+        excel_code = self._suggestions.get(national_code)
+        if not excel_code:
+            messagebox.showinfo("Accept Suggestion", f"No similar Excel code found for {national_code}.")
+            return
+
+        if confirm and not messagebox.askyesno(
+            "Did You Mean",
+            f"Similar Excel codes for {national_code}: {suggestions}\n\n"
+            f"Count its balance under {excel_code}?"
+        ):
+            return
+
+        if self.on_accept_suggestion:
+            self.on_accept_suggestion(national_code, excel_code)
@@ -1,16 +1,10 @@
-"""Type selector component for extraction type (Stock/Free/Buy)."""
-
-import tkinter as tk
-from typing import Callable, Optional
-
-from src.config.extraction_config import ExtractionType
-
+"""Type selector component for extraction type (Stock/Free/Buy/Auto)."""
 
 import tkinter as tk
 from tkinter import ttk
 from typing import Callable, Optional
 
-from src.config.extraction_config import ExtractionType
+from src.config.extraction_config import AUTO_DETECT, ExtractionConfig, ExtractionType
 
 
 class TypeSelector(ttk.Frame):
@@ -40,13 +34,13 @@ class TypeSelector(ttk.Frame):
         # Label
         ttk.Label(self, text=label_text).pack(side="left")
 
-        # Radio buttons
-        for extraction_type in ExtractionType:
+        # Radio buttons (Auto detects the type of each PDF)
+        for value in [extraction_type.value for extraction_type in ExtractionType] + [AUTO_DETECT]:
             ttk.Radiobutton(
                 self,
-                text=extraction_type.value,
+                text=value,
                 variable=self.value,
-                value=extraction_type.value,
+                value=value,
                 command=self._on_select
             ).pack(side="left", padx=5)
 
@@ -55,9 +49,14 @@ class TypeSelector(ttk.Frame):
         """Get selected extraction type value."""
         return self.value.get()
 
-    def get_extraction_type(self) -> ExtractionType:
-        """Get selected extraction type as enum."""
-        from src.config.extraction_config import ExtractionConfig
+    def set_value(self, value: str) -> None:
+        """Set selected extraction type value (a type name or Auto)."""
+        self.value.set(value)
+
+    def get_extraction_type(self) -> Optional[ExtractionType]:
+        """Get selected extraction type as enum (None for Auto)."""
+        if self.value.get() == AUTO_DETECT:
+            return None
         return ExtractionConfig.from_string(self.value.get())
 
     def _on_select(self) -> None:
@@ -1,27 +1,46 @@
 """Main application window - orchestrates all components."""
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import logging
 import threading
 import os
-from typing import Optional
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
 
 from src.config.settings import AppSettings, LoggingConfig
-from src.config.extraction_config import ExtractionType
-from src.services.pdf_extractor import PDFExtractor
-from src.services.excel_handler import ExcelHandler
-from src.services.data_validator import DataValidator
+from src.config.extraction_config import AUTO_DETECT, ExtractionType
+from src.services.excel_handler import ExcelHandler, MasterChangedError
+from src.services.data_validator import DataValidator, IncrementalValidator
 from src.services.export_service import ExportService
+from src.services.master_index_cache import MasterIndexCache
+from src.services.extraction_pipeline import ExtractionPipeline
+from src.services.layout_detector import LayoutDetector
+from src.services.run_snapshot import ExtractionBatch, RunSnapshot, SnapshotStore
+from src.services.history_store import HistoryStore
+from src.services.delta_report import DeltaReport, TypedBalances, compute_delta, master_balances
+from src.services.source_renderer import SourceRenderer
+from src.models.source_index import SourceKind
 from src.models.extraction_data import ExtractionResult
+from src.models.save_preview import SavePreview
 from src.ui.components.file_selector import FileSelector
 from src.ui.components.type_selector import TypeSelector
 from src.ui.components.results_tabs import ResultsTabs
 from src.ui.components.issues_tabs import IssuesTabs
 from src.ui.components.manual_entry import ManualEntryWidget
 from src.ui.widgets.loading_dialog import LoadingDialog
+from src.ui.background_job import BackgroundJob
+from src.ui.widgets.source_viewer import SourceViewer
+from src.ui.widgets.history_viewer import HistoryViewer
+from src.ui.widgets.delta_viewer import DeltaViewer
+from src.ui.widgets.save_preview_dialog import SavePreviewDialog
 from src.services.settings_manager import SettingsManager
 from src.ui.theme import theme, icons
+from src.utils.cancellation import raise_if_cancelled
+from src.utils.profiling import default_profile_dir, is_profiling, profiled, start_profiling, stop_profiling
+from src.utils.run_metrics import RunMetrics, Stage
 import subprocess
 import sys
 
@@ -39,6 +58,11 @@ class BalanceUpdaterApp:
         self.root = root
         self.settings_manager = SettingsManager()
         self.app_settings = AppSettings()
+        self.master_index_cache = MasterIndexCache(self.app_settings.CACHE_DIR)
+        self.source_renderer = SourceRenderer()
+        self.layout_detector = LayoutDetector(self.app_settings.CACHE_DIR)
+        self.snapshot_store = SnapshotStore(self.app_settings.CACHE_DIR)
+        self.history_store = HistoryStore(self.app_settings.HISTORY_FILE)
 
         # Configure logging
         LoggingConfig().configure()
@@ -54,13 +78,41 @@ class BalanceUpdaterApp:
         self.extraction_result: Optional[ExtractionResult] = None
         self.excel_codes: set = set()
 
+        # Type of the last run (the fallback type for auto-detected runs)
+        self.run_type: ExtractionType = ExtractionType.STOCK
+
+        # Creation time of the current run (identifies its saved snapshot)
+        self.run_created: Optional[datetime] = None
+
+        # Stage timings and counters of the current run (None for a run restored
+        # from the last session) and its history id (None until it is saved)
+        self.run_metrics: Optional[RunMetrics] = None
+        self.run_id: Optional[int] = None
+
+        # Last comparison with a baseline (included in the full issue report)
+        self.delta_report: Optional[DeltaReport] = None
+
+        # Keeps the result in sync with Excel changes and manual edits
+        self.validator: Optional[IncrementalValidator] = None
+
         # Threading state
         self.extraction_thread_result = None
         self.extraction_thread_error = None
 
+        # Save/export job currently running (at most one at a time)
+        self.active_job: Optional[BackgroundJob] = None
+
         # Build UI
         self._setup_ui()
         self._load_initial_settings()
+        self._restore_last_run()
+        self.root.after_idle(self._offer_resume)
+
+        # Keep manual edits and accepted suggestions for the next session
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Hidden toggle for field diagnostics (Ctrl+Shift+P)
+        self.root.bind("<Control-P>", lambda event: self._toggle_profiling())
 
     def _load_initial_settings(self):
         """Load settings from file and update UI."""
@@ -71,6 +123,9 @@ class BalanceUpdaterApp:
             self.excel_file = excel_path
             self.excel_path_label.config(text=os.path.basename(excel_path))
             self.excel_tooltip.text = excel_path
+
+            # Index the master in the background so extraction can match immediately
+            self.master_index_cache.prewarm(excel_path)
         elif excel_path:
             messagebox.showwarning(
                 "File Not Found",
@@ -79,6 +134,76 @@ class BalanceUpdaterApp:
         else:
             self.excel_path_label.config(text="No Excel file selected")
 
+    def _restore_last_run(self) -> None:
+        """Reopen the previous session's results without re-extracting its PDFs."""
+        snapshot = self.snapshot_store.load_run()
+        if snapshot is None:
+            return
+
+        self.pdf_files = [path for path in snapshot.pdf_files if os.path.exists(path)]
+        self.pdf_selector.set_files(self.pdf_files)
+        self.validator = snapshot.validator
+        self.extraction_result = snapshot.result
+        self.excel_codes = snapshot.excel_codes
+        self.run_type = snapshot.run_type
+        self.run_created = snapshot.created
+        self.run_metrics = self.run_id = None
+        self._display_results()
+        logging.info(f"Restored run of {snapshot.created:%Y-%m-%d %H:%M} ({len(snapshot.pdf_files)} PDF(s))")
+
+        # The master workbook may have been edited or replaced since; the index
+        # cache makes an unchanged one cheap and only the differences re-match
+        if self.excel_file:
+            self._rematch_excel(self.excel_file)
+
+    def _offer_resume(self) -> None:
+        """Offer to resume an extraction that did not finish in the last session."""
+        batch = self.snapshot_store.interrupted_batch()
+        if batch is None:
+            return
+        if self.active_job and self.active_job.is_running():
+            # Let the restored run's re-match finish first; the extraction replaces it
+            self.root.after(BackgroundJob.POLL_INTERVAL_MS, self._offer_resume)
+            return
+        pdf_files = [path for path in batch.pdf_files if os.path.exists(path)]
+        if not pdf_files or not messagebox.askyesno(
+            "Resume Extraction",
+            f"An extraction of {len(batch.pdf_files)} PDF(s) started {batch.started:%Y-%m-%d %H:%M} "
+            f"did not finish.\n\nResume it? Files completed before the interruption are not parsed again."
+        ):
+            self.snapshot_store.end_batch()
+            return
+
+        self.pdf_files = pdf_files
+        self.pdf_selector.set_files(pdf_files)
+        self.type_selector.set_value(AUTO_DETECT if batch.auto_detect else batch.extraction_type.value)
+        self._extract_data()
+
+    def _toggle_profiling(self) -> None:
+        """Turn profiling mode on, or off and write the reports next to the log."""
+        if is_profiling():
+            output_dir = stop_profiling()
+            self.status_label.config(text=f"{icons.INFO} Profile written to {output_dir}")
+        else:
+            start_profiling(default_profile_dir(LoggingConfig().filename))
+            self.status_label.config(text=f"{icons.INFO} Profiling on (Ctrl+Shift+P to stop and write reports)")
+
+    def _save_snapshot(self) -> None:
+        """Persist the current run so the next session can reopen it."""
+        if self.validator is None or not self.excel_file:
+            return
+        self.snapshot_store.save_run(RunSnapshot(
+            list(self.pdf_files), self.excel_file, self.run_type, self.validator,
+            created=self.run_created or datetime.now()
+        ))
+
+    def _on_close(self) -> None:
+        """Save the current run and close the window."""
+        # Do not pickle a validator a background job may still be changing
+        if self.active_job is None:
+            self._save_snapshot()
+        self.root.destroy()
+
     def _create_card_frame(self, parent: tk.Widget, **kwargs) -> ttk.Frame:
         """
         Create a card-style frame with consistent styling.
@@ -176,10 +301,30 @@ class BalanceUpdaterApp:
         export_menubutton["menu"] = export_menu
         export_menu.add_command(label=f"{icons.FILE} Export Unmatched", command=self._export_unmatched)
         export_menu.add_command(label=f"{icons.WARNING} Export Expired", command=self._export_expired)
+        export_menu.add_command(label=f"{icons.WARNING} Export Expiring Soon", command=self._export_expiring_soon)
         export_menu.add_command(label=f"{icons.WARNING} Export Duplicates", command=self._export_duplicates)
         export_menu.add_command(label=f"{icons.INFO} Export Zero Balance", command=self._export_zero_balance)
+        export_menu.add_separator()
+        export_menu.add_command(label=f"{icons.TABLE} Export All Issues", command=self._export_issue_report)
         export_menubutton.pack(side="left")
 
+        # Compare button
+        compare_menubutton = ttk.Menubutton(actions_frame, text=f"{icons.REFRESH} Compare", width=15)
+        compare_menu = tk.Menu(compare_menubutton, tearoff=False)
+        compare_menubutton["menu"] = compare_menu
+        compare_menu.add_command(label="With Previous Run", command=self._compare_previous_run)
+        compare_menu.add_command(label="With History Run...", command=self._compare_history_run)
+        compare_menu.add_command(label="With Excel Values", command=self._compare_excel_values)
+        compare_menubutton.pack(side="left", padx=(theme.spacing.sm, 0))
+
+        # History button
+        ttk.Button(
+            actions_frame,
+            text=f"{icons.CHART} History",
+            command=self._show_history,
+            width=15
+        ).pack(side="left", padx=(theme.spacing.sm, 0))
+
         # --- Middle Frame Content ---
         # Main content notebook
         main_notebook = ttk.Notebook(middle_frame)
@@ -191,7 +336,9 @@ class BalanceUpdaterApp:
 
         self.results_tabs = ResultsTabs(
             results_frame,
-            on_export_unmatched=self._export_unmatched
+            on_export_unmatched=self._export_unmatched,
+            on_show_source=self._show_source,
+            on_accept_suggestion=self._accept_suggestion
         )
         self.results_tabs.pack(fill="both", expand=True)
 
@@ -202,6 +349,7 @@ class BalanceUpdaterApp:
         self.issues_tabs = IssuesTabs(
             issues_frame,
             on_export_expired=self._export_expired,
+            on_export_expiring_soon=self._export_expiring_soon,
             on_export_duplicates=self._export_duplicates,
             on_export_zero_balance=self._export_zero_balance
         )
@@ -269,7 +417,12 @@ class BalanceUpdaterApp:
         self.excel_file = file
         self.excel_path_label.config(text=os.path.basename(file))
         self.excel_tooltip.text = file
-        
+        self.master_index_cache.prewarm(file)
+
+        # Re-match existing results against the new workbook (changed codes only)
+        if self.validator is not None:
+            self._rematch_excel(file)
+
         # Save to settings
         current_settings = self.settings_manager.load_settings()
         current_settings["excel_file_path"] = file
@@ -281,6 +434,10 @@ class BalanceUpdaterApp:
         """Extract data from PDFs using background thread."""
         logging.debug("--- Starting Extraction ---")
 
+        # A re-match or save still uses the current validator
+        if self._job_running():
+            return
+
         # Validate selections
         if not self.pdf_selector.has_selection():
             messagebox.showerror("Error", "Please select at least one PDF file.")
@@ -305,10 +462,17 @@ class BalanceUpdaterApp:
             message=f"Processing {len(self.pdf_files)} PDF file(s)... Please wait."
         )
 
+        # Read widget state here; the worker thread must not touch Tk.
+        # Auto detects each PDF's type; Free/Buy reports without a header are asked about.
+        selected_type = self.type_selector.get_extraction_type()
+        auto_detect = selected_type is None
+        extraction_type = selected_type or ExtractionType.STOCK
+        logging.debug(f"Extraction type selected: {'Auto' if auto_detect else extraction_type.value}")
+
         # Start extraction in background thread (daemon=True so it closes with app)
         thread = threading.Thread(
             target=self._run_extraction_thread,
-            args=(loading_dialog,),
+            args=(loading_dialog, extraction_type, auto_detect),
             daemon=True
         )
         thread.start()
@@ -316,50 +480,95 @@ class BalanceUpdaterApp:
         # Check periodically if thread is done
         self._check_extraction_complete(loading_dialog, thread)
 
-    def _run_extraction_thread(self, loading_dialog: LoadingDialog) -> None:
+    def _run_extraction_thread(
+        self,
+        loading_dialog: LoadingDialog,
+        extraction_type: ExtractionType,
+        auto_detect: bool = False
+    ) -> None:
         """
         Run extraction in background thread.
 
         Args:
             loading_dialog: Loading dialog to update with progress
+            extraction_type: Extraction type selected when the run started
+                (the fallback type when auto-detecting)
+            auto_detect: Detect the type of each PDF from its layout
         """
         try:
-            # Get extraction type
-            extraction_type = self.type_selector.get_extraction_type()
-            logging.debug(f"Extraction type selected: {extraction_type.value}")
-
-            # Extract from PDFs with progress updates
-            extractor = PDFExtractor(extraction_type)
-
             def progress_callback(message: str):
                 """Thread-safe progress update."""
                 self.root.after(0, lambda: loading_dialog.update_message(message))
 
-            extraction_data = extractor.extract_from_files(
+            # Kept until the run completes; completed files are checkpointed as they finish
+            self.snapshot_store.begin_batch(
+                ExtractionBatch(list(self.pdf_files), self.excel_file, extraction_type, auto_detect)
+            )
+
+            # Parse PDFs while the master workbook loads, matching per file
+            pipeline = ExtractionPipeline(
+                extraction_type,
+                self.master_index_cache,
+                layout_detector=self.layout_detector if auto_detect else None,
+                snapshot_store=self.snapshot_store,
+                choose_type=lambda pdf_file: self._ask_free_or_buy(loading_dialog, pdf_file)
+            )
+            result, excel_codes = pipeline.run(
                 self.pdf_files,
+                self.excel_file,
                 progress_callback=progress_callback
             )
 
-            # Read Excel codes
-            self.root.after(0, lambda: loading_dialog.update_message("Reading Excel file..."))
-            excel_handler = ExcelHandler(self.excel_file)
-            excel_codes = excel_handler.read_codes()
-
-            # Validate and match
-            self.root.after(0, lambda: loading_dialog.update_message("Validating and matching data..."))
-            validator = DataValidator()
-            result = validator.validate_and_match(
-                extraction_data,
-                excel_codes
-            )
+            # Save the run for the next session before handing it to the UI thread;
+            # it enters the history only once its balances are saved to Excel
+            snapshot = RunSnapshot(list(self.pdf_files), self.excel_file, extraction_type, pipeline.validator)
+            self.snapshot_store.save_run(snapshot)
+            self.snapshot_store.end_batch()
 
             # Store results (thread-safe)
-            self.extraction_thread_result = (result, excel_codes)
+            self.extraction_thread_result = (
+                result, excel_codes, pipeline.validator, extraction_type, snapshot.created,
+                pipeline.failed_files, pipeline.metrics, pipeline.chosen_types
+            )
 
         except Exception as e:
             logging.error(f"Error during extraction: {e}")
             self.extraction_thread_error = e
 
+    def _ask_free_or_buy(self, loading_dialog: LoadingDialog, pdf_file: str) -> Optional[ExtractionType]:
+        """
+        Ask on the Tk thread whether a report the detector cannot classify is Free or Buy.
+
+        Called from the extraction thread, which waits for the answer.
+
+        Args:
+            loading_dialog: Loading dialog to show the question over
+            pdf_file: Report whose type is undetected
+
+        Returns:
+            FREE or BUY, or None to skip the file
+        """
+        answer: List[Optional[ExtractionType]] = [None]
+        answered = threading.Event()
+
+        def ask() -> None:
+            try:
+                choice = messagebox.askyesnocancel(
+                    "Free or Buy?",
+                    f"{os.path.basename(pdf_file)} has the Free/Buy layout, but its header "
+                    f"names neither.\n\n"
+                    f"Yes: Free (column F)\nNo: Buy (column H)\nCancel: skip this PDF",
+                    parent=loading_dialog.dialog
+                )
+                if choice is not None:
+                    answer[0] = ExtractionType.FREE if choice else ExtractionType.BUY
+            finally:
+                answered.set()
+
+        self.root.after(0, ask)
+        answered.wait()
+        return answer[0]
+
     def _check_extraction_complete(self, loading_dialog: LoadingDialog, thread: threading.Thread) -> None:
         """
         Check if extraction thread is complete and handle results.
@@ -379,19 +588,46 @@ class BalanceUpdaterApp:
             if self.extraction_thread_error:
                 messagebox.showerror(
                     "Error",
-                    f"An error occurred during extraction: {self.extraction_thread_error}"
+                    f"An error occurred during extraction: {self.extraction_thread_error}\n\n"
+                    f"PDFs completed so far were saved; extracting again resumes after them."
                 )
                 self.status_label.config(text=f"{icons.ERROR} Extraction failed.")
                 return
 
             # Handle successful results
             if self.extraction_thread_result:
-                self.extraction_result, self.excel_codes = self.extraction_thread_result
-                self._display_results()
-                self.status_label.config(text=f"{icons.SUCCESS} Extraction complete.")
+                (self.extraction_result, self.excel_codes, self.validator, self.run_type,
+                 self.run_created, failed_files, self.run_metrics,
+                 chosen_types) = self.extraction_thread_result
+                self.run_id = self.delta_report = None
+                with self.run_metrics.stage(Stage.POPULATE):
+                    self._display_results()
+                if failed_files:
+                    self.status_label.config(
+                        text=f"{icons.WARNING} Extraction complete; {len(failed_files)} PDF(s) failed. "
+                             f"{self.run_metrics.summary()}"
+                    )
+                    messagebox.showwarning(
+                        "Some PDFs Failed",
+                        "These PDFs could not be extracted and were skipped:\n\n" + "\n".join(
+                            f"{os.path.basename(path)}: {error}" for path, error in failed_files.items()
+                        )
+                    )
+                else:
+                    self.status_label.config(
+                        text=f"{icons.SUCCESS} Extraction complete. {self.run_metrics.summary()}"
+                    )
+                if chosen_types:
+                    messagebox.showinfo(
+                        "Types Chosen Manually",
+                        "These PDFs had no Free/Buy header and were extracted as chosen:\n\n" + "\n".join(
+                            f"{os.path.basename(path)}: {chosen.value}" for path, chosen in chosen_types.items()
+                        )
+                    )
             else:
                 self.status_label.config(text=f"{icons.WARNING} Extraction completed with no data.")
 
+    @profiled("populate")
     def _display_results(self) -> None:
         """Display extraction results in UI."""
         if not self.extraction_result:
@@ -408,10 +644,61 @@ class BalanceUpdaterApp:
                  f"{icons.WARNING} {stats['missing']} Missing | "
                  f"{icons.INFO} {stats['unmatched']} Not in Excel | "
                  f"{icons.WARNING} {stats['duplicates']} Duplicates | "
+                 f"{icons.INFO} {stats['cross_file']} In Several Files | "
                  f"{icons.WARNING} {stats['expired']} Expired | "
+                 f"{icons.WARNING} {stats['expiring_soon']} Expiring Soon | "
                  f"{icons.INFO} {stats['zero_balance']} Zero Balance"
         )
 
+    def _show_source(self, national_code: str, item_code: Optional[str], pdf_filename: Optional[str]) -> None:
+        """
+        Show the PDF region(s) a balance was extracted from.
+
+        Args:
+            national_code: National code of the selected row
+            item_code: Item code to narrow down to (None for all items of the code)
+            pdf_filename: PDF file to narrow down to (None for all files)
+        """
+        if not self.extraction_result:
+            return
+
+        result = self.extraction_result
+        entries = result.sources.find(SourceKind.BALANCE, national_code, item_code, pdf_filename)
+        if not entries:
+            # Zero-balance rows carry their own provenance
+            entries = result.sources.find(SourceKind.ZERO_BALANCE, national_code, item_code, pdf_filename)
+        if not entries:
+            messagebox.showinfo("Show Source", f"No source location recorded for {national_code}.")
+            return
+
+        def render(entry):
+            pdf_path = result.source_files.get(entry.pdf_filename, entry.pdf_filename)
+            return self.source_renderer.render(pdf_path, entry.location)
+
+        SourceViewer(self.root, f"Source of {national_code}", entries, render)
+
+    def _show_history(self) -> None:
+        """Show the recorded balances and issues of the selected (or an entered) national code."""
+        selected = self.results_tabs.get_matched_selection()
+        national_code = selected[0] if selected else simpledialog.askstring(
+            "Balance History", "National code:", parent=self.root
+        )
+        if not national_code:
+            return
+
+        national_code = national_code.strip().upper()
+        try:
+            points = self.history_store.trend(national_code, runs=self.app_settings.HISTORY_RUNS)
+            issues = self.history_store.issues(national_code=national_code, runs=self.app_settings.HISTORY_RUNS)
+        except sqlite3.Error as e:
+            logging.error(f"History lookup failed: {e}")
+            messagebox.showerror("Error", f"Could not read history: {e}")
+            return
+        if not points and not issues:
+            messagebox.showinfo("Balance History", f"No history recorded for {national_code}.")
+            return
+        HistoryViewer(self.root, national_code, points, issues)
+
     def _handle_manual_update(self, balance: float) -> None:
         """
         Handle manual balance update.
@@ -424,51 +711,331 @@ class BalanceUpdaterApp:
             messagebox.showwarning("Warning", "Please select a row first")
             return
 
-        code = selected[0]
+        # The row's report type picks the Excel column; a missing code has none
+        # yet and takes the run's type
+        code, type_name = selected[0], selected[1]
+        extraction_type = ExtractionType(type_name) if type_name else self.run_type
+        if self._job_running():
+            return
 
         # Update extraction result
-        if self.extraction_result:
+        if self.validator is not None:
+            self.validator.apply_manual_balance(code, balance, extraction_type)
+        elif self.extraction_result:
             DataValidator.update_manual_balance(
                 self.extraction_result,
                 code,
-                balance
+                balance,
+                extraction_type
             )
 
-            # Update display
-            self.results_tabs.update_matched_item(code, balance)
+        # Update display
+        if self.extraction_result:
+            self.results_tabs.update_matched_item(code, extraction_type, balance)
+
+    def _accept_suggestion(self, national_code: str, excel_code: str) -> None:
+        """
+        Count an unmatched code's balance under its suggested Excel code.
+
+        Args:
+            national_code: Unmatched national code from the PDFs
+            excel_code: Suggested Excel code
+        """
+        if self.validator is None or self._job_running():
+            return
+
+        self.validator.accept_suggestion(national_code, excel_code)
+        self._display_results()
+
+    def _rematch_excel(self, excel_file: str) -> None:
+        """
+        Re-match the current results against a newly selected master workbook.
+
+        Args:
+            excel_file: Path to the new master workbook
+        """
+        if self._job_running():
+            return
+
+        # Re-match a copy (made in the job; edits wait for it); the Tk thread keeps
+        # reading the current validator until on_rematched swaps the new one in.
+        current = self.validator
+
+        def rematch(progress_callback, cancel_event) -> IncrementalValidator:
+            progress_callback("Reading Excel file...")
+            excel_codes = self.master_index_cache.get(excel_file).codes
+            raise_if_cancelled(cancel_event)
+            progress_callback("Re-matching codes...")
+            validator = current.copy()
+            validator.set_excel_codes(excel_codes)
+            return validator
+
+        def on_rematched(validator: IncrementalValidator) -> None:
+            self.validator = validator
+            self.extraction_result = validator.result
+            self.excel_codes = validator.excel_codes
+            self._display_results()
+
+        self._start_job("Re-matching", rematch, on_rematched, "Re-matching failed")
+
+    def _job_running(self) -> bool:
+        """
+        Warn if a background job is in flight; edits then wait for it.
+
+        Returns:
+            True if a job is running
+        """
+        if self.active_job and self.active_job.is_running():
+            messagebox.showwarning("Busy", "Please wait for the current operation to finish.")
+            return True
+        return False
+
+    def _start_job(
+        self,
+        title: str,
+        target: Callable,
+        on_success: Callable[[Any], None],
+        failure_message: str
+    ) -> None:
+        """
+        Run a save/export operation as a cancellable background job.
+
+        Save is disabled while the job is in flight and the outcome is
+        reported in the status bar.
+
+        Args:
+            title: Loading dialog title
+            target: Work function, called as target(progress_callback, cancel_event)
+            on_success: Called on the Tk thread with the target's return value
+            failure_message: Prefix for the error dialog if the job fails
+        """
+        if self._job_running():
+            return
+
+        self.save_button.config(state="disabled")
+        self.status_label.config(text=f"{icons.REFRESH} {title}...")
+
+        def finish() -> None:
+            loading_dialog.close()
+            self.save_button.config(state="normal")
+            self.active_job = None
+
+        def handle_success(value: Any) -> None:
+            finish()
+            on_success(value)
+
+        def handle_error(error: Exception) -> None:
+            finish()
+            self.status_label.config(text=f"{icons.ERROR} {title} failed.")
+            messagebox.showerror("Error", f"{failure_message}: {str(error)}")
+
+        def handle_cancelled() -> None:
+            finish()
+            self.status_label.config(text=f"{icons.WARNING} {title} cancelled.")
+
+        def handle_progress(message: str) -> None:
+            loading_dialog.update_message(message)
+            self.status_label.config(text=f"{icons.REFRESH} {message}")
+
+        self.active_job = BackgroundJob(
+            self.root,
+            target,
+            on_success=handle_success,
+            on_error=handle_error,
+            on_cancelled=handle_cancelled,
+            on_progress=handle_progress
+        )
+        loading_dialog = LoadingDialog(
+            self.root,
+            title=title,
+            message="Starting...",
+            on_cancel=self.active_job.cancel
+        )
+        self.active_job.start()
 
     def _save_excel(self) -> None:
-        """Save updated Excel file."""
+        """Preview the target cells in the background, then save the changed ones."""
         if not self.extraction_result or not self.extraction_result.matched_codes:
             messagebox.showwarning("Warning", "No data to save")
             return
 
-        try:
-            excel_handler = ExcelHandler(self.excel_file)
-            extraction_type = self.type_selector.get_extraction_type()
+        # Snapshot inputs on the Tk thread; the worker must not touch widgets.
+        # Balances are routed to the column of the report type they came from.
+        excel_file = self.excel_file
+        typed_balances = self._typed_balances()
+
+        def build_preview(progress_callback, cancel_event) -> SavePreview:
+            # Current cell values come from the cached code -> row index
+            progress_callback("Reading current values...")
+            index = self.master_index_cache.get(excel_file)
+            raise_if_cancelled(cancel_event)
+            return SavePreview.build(index, typed_balances)
+
+        def on_previewed(preview: SavePreview) -> None:
+            if not preview.has_changes:
+                self.status_label.config(text=f"{icons.INFO} Excel already up to date; nothing saved.")
+                messagebox.showinfo(
+                    "Up to Date",
+                    f"All {len(preview.unchanged)} target cells already hold these balances.\n\n"
+                    "No file was written."
+                )
+                return
+            SavePreviewDialog(self.root, preview, on_confirm=lambda: self._save_changes(excel_file, preview, typed_balances))
 
-            output_file = excel_handler.update_balances(
-                self.extraction_result.matched_codes,
-                extraction_type
-            )
+        self._start_job("Preparing preview", build_preview, on_previewed, "Preview failed")
+
+    def _save_changes(self, excel_file: str, preview: SavePreview, typed_balances: TypedBalances) -> None:
+        """
+        Write the changed and new cells of a confirmed preview in the background.
 
+        Args:
+            excel_file: Master workbook the preview was read from
+            preview: Confirmed save preview
+            typed_balances: Balances the preview was built from, per report type
+        """
+        metrics = self.run_metrics
+        run_id = self.run_id
+        snapshot = RunSnapshot(
+            list(self.pdf_files), excel_file, self.run_type, self.validator,
+            created=self.run_created or datetime.now()
+        ) if self.validator is not None else None
+
+        def save(progress_callback, cancel_event) -> Optional[Tuple[Optional[str], Optional[int]]]:
+            started = time.perf_counter()
+            try:
+                output_file = ExcelHandler(excel_file).save_changes(
+                    preview,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event
+                )
+            except MasterChangedError as e:
+                logging.warning(str(e))
+                return None
+            if metrics is not None:
+                metrics.add_time(Stage.SAVE, time.perf_counter() - started)
+
+            # Record the balances just written; saving again updates the same run
+            if snapshot is not None:
+                progress_callback("Recording history...")
+                try:
+                    return output_file, self.history_store.record_run(snapshot, metrics, typed_balances, run_id)
+                except sqlite3.Error as e:
+                    logging.warning(f"Could not record run history: {e}")
+            return output_file, run_id
+
+        def on_saved(saved: Optional[Tuple[Optional[str], Optional[int]]]) -> None:
+            if saved is None:
+                # The master was edited while the preview was open; show a fresh one
+                messagebox.showwarning(
+                    "Excel File Changed",
+                    f"{os.path.basename(excel_file)} changed after the preview was built, so its rows "
+                    f"may have moved. Nothing was saved.\n\nReview the updated preview."
+                )
+                self._save_excel()
+                return
+            output_file, self.run_id = saved
+            self.status_label.config(text=f"{icons.SUCCESS} Saved: {output_file}")
             messagebox.showinfo(
                 "Success",
                 f"Saved successfully!\n\n"
-                f"Updated: {self.extraction_result.matched_count} items\n"
+                f"Updated: {len(preview.writes)} cells "
+                f"({len(preview.unchanged)} unchanged skipped)\n"
                 f"File: {output_file}"
             )
 
-            self.status_label.config(text=f"✓ Saved: {output_file}")
+        self._start_job("Saving Excel", save, on_saved, "Save failed")
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Save failed: {str(e)}")
+    def _typed_balances(self) -> TypedBalances:
+        """Balances that saving would write, per report type."""
+        if self.validator is not None:
+            return self.validator.balances_by_type(self.run_type)
+        return {self.run_type: dict(self.extraction_result.matched_codes)}
 
-    def _export_unmatched(self) -> None:
-        """Export unmatched codes to Excel."""
+    def _compare(self, title: str, load_baseline: Callable[[], Optional[tuple]]) -> None:
+        """
+        Compare the current balances with a baseline in the background and show the differences.
+
+        Args:
+            title: Job title
+            load_baseline: Returns (balances, description), or None if there is no baseline
+        """
         if not self.extraction_result:
+            messagebox.showwarning("Warning", "Extract data first")
             return
 
+        current = self._typed_balances()
+
+        def compare(progress_callback, cancel_event) -> Optional[DeltaReport]:
+            progress_callback("Loading baseline...")
+            baseline = load_baseline()
+            raise_if_cancelled(cancel_event)
+            if baseline is None:
+                return None
+            previous, description = baseline
+            progress_callback("Comparing balances...")
+            return compute_delta(current, previous, description)
+
+        def on_compared(report: Optional[DeltaReport]) -> None:
+            if report is None:
+                messagebox.showinfo("Compare", "No earlier run to compare with.")
+                return
+            self.delta_report = report
+            DeltaViewer(self.root, report, on_export=self._export_issue_report)
+
+        self._start_job(title, compare, on_compared, "Comparison failed")
+
+    def _compare_previous_run(self) -> None:
+        """Compare with the most recent saved run before the current one."""
+        def load_baseline() -> Optional[tuple]:
+            for path in self.snapshot_store.list_runs():
+                snapshot = self.snapshot_store.load_run(path)
+                if snapshot is not None and snapshot.created != self.run_created:
+                    description = f"run of {snapshot.created:%Y-%m-%d %H:%M}"
+                    return snapshot.validator.balances_by_type(snapshot.run_type), description
+            return None
+
+        self._compare("Comparing with previous run", load_baseline)
+
+    def _compare_history_run(self) -> None:
+        """Compare with a run chosen from the balance history."""
+        try:
+            runs = self.history_store.runs(limit=8)
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Could not read history: {e}")
+            return
+        if not runs:
+            messagebox.showinfo("Compare", "No runs recorded in the history yet.")
+            return
+
+        listing = "\n".join(f"{run.run_id}: {run.run_time} ({run.run_type}, {run.pdf_count} PDF(s))" for run in runs)
+        run_id = simpledialog.askinteger("Compare With History Run", f"Run number:\n\n{listing}", parent=self.root)
+        if run_id is None:
+            return
+
+        def load_baseline() -> Optional[tuple]:
+            balances = self.history_store.balances(run_id, matched_only=True)
+            return (balances, f"history run {run_id}") if balances else None
+
+        self._compare("Comparing with history run", load_baseline)
+
+    def _compare_excel_values(self) -> None:
+        """Compare with the values currently in the master workbook's target columns."""
+        if not self.excel_file:
+            messagebox.showerror("Error", "Please set the default Excel file in Settings.")
+            return
+        excel_file = self.excel_file
+        types = list(self._typed_balances()) or [self.run_type]
+
+        def load_baseline() -> Optional[tuple]:
+            index = self.master_index_cache.get(excel_file)
+            return master_balances(index, types), os.path.basename(excel_file)
+
+        self._compare("Comparing with Excel values", load_baseline)
+
+    def _export_issue_report(self) -> None:
+        """Export all issue lists (and the last comparison) into one workbook."""
+        if not self.extraction_result:
+            return
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[("Excel files", "*.xlsx")]
@@ -476,20 +1043,29 @@ class BalanceUpdaterApp:
         if not file_path:
             return
 
-        try:
-            ExportService.export_unmatched_codes(
-                self.extraction_result.unmatched_codes,
-                file_path
+        result, delta = self.extraction_result, self.delta_report
+
+        def export(progress_callback, cancel_event) -> str:
+            ExportService.export_issue_report(
+                result, file_path, delta, progress_callback=progress_callback, cancel_event=cancel_event
             )
-            messagebox.showinfo("Success", f"Unmatched codes exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export: {str(e)}")
+            return file_path
 
-    def _export_expired(self) -> None:
-        """Export expired items to Excel."""
-        if not self.extraction_result:
-            return
+        def on_exported(path: str) -> None:
+            self.status_label.config(text=f"{icons.SUCCESS} Issue report exported: {path}")
+            messagebox.showinfo("Success", f"Issue report exported to {path}")
+
+        self._start_job("Exporting issue report", export, on_exported, "Failed to export")
 
+    def _export_items(self, items: List, export_func: Callable, description: str) -> None:
+        """
+        Ask for a target file and export items in the background.
+
+        Args:
+            items: Rows to export
+            export_func: ExportService method taking (items, file_path, progress_callback, cancel_event)
+            description: Human-readable name of the exported data (e.g. "Expired items")
+        """
         file_path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[("Excel files", "*.xlsx")]
@@ -497,56 +1073,67 @@ class BalanceUpdaterApp:
         if not file_path:
             return
 
-        try:
-            ExportService.export_expired_items(
-                self.extraction_result.expired_items,
-                file_path
-            )
-            messagebox.showinfo("Success", f"Expired items exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export: {str(e)}")
+        items = list(items)
 
-    def _export_duplicates(self) -> None:
-        """Export duplicate codes to Excel."""
+        def export(progress_callback, cancel_event) -> str:
+            export_func(items, file_path, progress_callback=progress_callback, cancel_event=cancel_event)
+            return file_path
+
+        def on_exported(path: str) -> None:
+            self.status_label.config(text=f"{icons.SUCCESS} {description} exported: {path}")
+            messagebox.showinfo("Success", f"{description} exported to {path}")
+
+        self._start_job(f"Exporting {description.lower()}", export, on_exported, "Failed to export")
+
+    def _export_unmatched(self) -> None:
+        """Export unmatched codes to Excel."""
         if not self.extraction_result:
             return
+        self._export_items(
+            self.extraction_result.unmatched_codes,
+            ExportService.export_unmatched_codes,
+            "Unmatched codes"
+        )
 
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")]
+    def _export_expired(self) -> None:
+        """Export expired items to Excel."""
+        if not self.extraction_result:
+            return
+        self._export_items(
+            self.extraction_result.expired_items,
+            ExportService.export_expired_items,
+            "Expired items"
         )
-        if not file_path:
+
+    def _export_expiring_soon(self) -> None:
+        """Export items expiring soon to Excel."""
+        if not self.extraction_result:
             return
+        self._export_items(
+            self.extraction_result.expiring_soon_items,
+            ExportService.export_expiring_soon_items,
+            "Items expiring soon"
+        )
 
-        try:
-            ExportService.export_duplicates(
-                self.extraction_result.duplicates,
-                file_path
-            )
-            messagebox.showinfo("Success", f"Duplicate codes exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export: {str(e)}")
+    def _export_duplicates(self) -> None:
+        """Export duplicate codes to Excel."""
+        if not self.extraction_result:
+            return
+        self._export_items(
+            self.extraction_result.duplicates,
+            ExportService.export_duplicates,
+            "Duplicate codes"
+        )
 
     def _export_zero_balance(self) -> None:
         """Export zero balance items to Excel."""
         if not self.extraction_result:
             return
-
-        file_path = filedialog.asksaveasfilename(
-            defaultextension=".xlsx",
-            filetypes=[("Excel files", "*.xlsx")]
+        self._export_items(
+            self.extraction_result.zero_balance_items,
+            ExportService.export_zero_balance_items,
+            "Zero balance items"
         )
-        if not file_path:
-            return
-
-        try:
-            ExportService.export_zero_balance_items(
-                self.extraction_result.zero_balance_items,
-                file_path
-            )
-            messagebox.showinfo("Success", f"Zero balance items exported to {file_path}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export: {str(e)}")
 
     def _view_log(self) -> None:
         """Open the extraction log file in default text editor."""
@@ -2,5 +2,8 @@
 
 from .data_tree import DataTreeView
 from .loading_dialog import LoadingDialog
+from .source_viewer import SourceViewer
+from .history_viewer import HistoryViewer
+from .save_preview_dialog import SavePreviewDialog
 
-__all__ = ['DataTreeView', 'LoadingDialog']
+__all__ = ['DataTreeView', 'LoadingDialog', 'SourceViewer', 'HistoryViewer', 'SavePreviewDialog']
@@ -2,17 +2,25 @@
 
 import tkinter as tk
 from tkinter import ttk
-from typing import List, Tuple, Callable, Optional
+from typing import Any, Dict, List, Tuple, Callable, Optional
+
+from src.utils.sort_keys import natural_key
+
+SortKey = Callable[[Any], Any]
 
 
 class DataTreeView(ttk.Frame):
-    """Reusable TreeView widget with scrollbar."""
+    """Reusable TreeView widget with scrollbar and sortable columns."""
+
+    SORT_ASCENDING = " ▲"
+    SORT_DESCENDING = " ▼"
 
     def __init__(
         self,
         parent: tk.Widget,
         columns: List[Tuple[str, str, int]],
         height: int = 15,
+        sort_keys: Optional[Dict[str, SortKey]] = None,
         **kwargs
     ):
         """
@@ -22,10 +30,25 @@ class DataTreeView(ttk.Frame):
             parent: Parent widget
             columns: List of (id, heading, width) tuples
             height: Number of visible rows
+            sort_keys: Optional column id -> key function (natural order by default)
         """
         super().__init__(parent, **kwargs)
         self.columns = columns
 
+        # Key functions per column, in column order
+        sort_keys = sort_keys or {}
+        self._key_funcs: List[SortKey] = [sort_keys.get(col[0], natural_key) for col in columns]
+
+        # Precomputed sort keys per item ID (computed once on insert/update)
+        self._row_keys: Dict[str, Tuple] = {}
+
+        # Original Python values per item ID (Tk converts e.g. "01234" to 1234)
+        self._row_values: Dict[str, Tuple] = {}
+
+        # Current sort state
+        self._sort_index: Optional[int] = None
+        self._sort_reverse = False
+
         # Extract column IDs
         column_ids = [col[0] for col in columns]
 
@@ -38,8 +61,8 @@ class DataTreeView(ttk.Frame):
         )
 
         # Configure columns
-        for col_id, heading, width in columns:
-            self.tree.heading(col_id, text=heading)
+        for index, (col_id, heading, width) in enumerate(columns):
+            self.tree.heading(col_id, text=heading, command=lambda i=index: self.sort_by(i))
             self.tree.column(col_id, width=width)
 
         # Add scrollbar
@@ -54,7 +77,12 @@ class DataTreeView(ttk.Frame):
         self.tree.pack(side="left", fill="both", expand=True)
         self.scrollbar.pack(side="right", fill="y")
 
-
+    def _compute_keys(self, values: Tuple) -> Tuple:
+        """Compute the typed sort key of every column for one row."""
+        return tuple(
+            key_func(values[i] if i < len(values) else "")
+            for i, key_func in enumerate(self._key_funcs)
+        )
 
     def insert(self, values: Tuple, tags: Tuple = ()) -> str:
         """
@@ -67,19 +95,88 @@ class DataTreeView(ttk.Frame):
         Returns:
             Item ID
         """
-        return self.tree.insert("", "end", values=values, tags=tags)
+        item_id = self.tree.insert("", "end", values=values, tags=tags)
+        self._row_keys[item_id] = self._compute_keys(values)
+        self._row_values[item_id] = tuple(values)
+        return item_id
 
     def clear(self) -> None:
         """Clear all items from tree."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._row_keys.clear()
+        self._row_values.clear()
+
+    def sort_by(self, column_index: int) -> None:
+        """
+        Sort rows by a column, toggling direction when clicked again.
+
+        Args:
+            column_index: Index of the column to sort by
+        """
+        if self._sort_index == column_index:
+            self._sort_reverse = not self._sort_reverse
+        else:
+            self._sort_index = column_index
+            self._sort_reverse = False
+
+        self._update_heading_indicators()
+        self.resort()
+
+    def resort(self) -> None:
+        """Re-apply the current sort order (e.g. after populating rows)."""
+        if self._sort_index is None:
+            return
+        self._apply_order(self.sorted_ids())
+
+    def sorted_ids(self) -> List[str]:
+        """
+        Get item IDs ordered by the current sort column.
+
+        Uses only the precomputed keys, so views that materialize a subset
+        of rows can order their backing IDs without touching the widget.
+
+        Returns:
+            Ordered list of item IDs
+        """
+        if self._sort_index is None:
+            return list(self.tree.get_children())
+
+        index = self._sort_index
+        row_keys = self._row_keys
+        # Tie-break on the full key tuple so equal cells keep a stable order
+        return sorted(
+            row_keys,
+            key=lambda item_id: (row_keys[item_id][index], row_keys[item_id]),
+            reverse=self._sort_reverse
+        )
+
+    def _apply_order(self, ordered_ids: List[str]) -> None:
+        """
+        Reorder rows in place with ``move`` (no delete/reinsert).
+
+        Args:
+            ordered_ids: Item IDs in their new display order
+        """
+        for position, item_id in enumerate(ordered_ids):
+            self.tree.move(item_id, "", position)
+
+    def _update_heading_indicators(self) -> None:
+        """Show the sort direction arrow on the active column heading."""
+        for index, (col_id, heading, _width) in enumerate(self.columns):
+            if index == self._sort_index:
+                heading += self.SORT_DESCENDING if self._sort_reverse else self.SORT_ASCENDING
+            self.tree.heading(col_id, text=heading)
 
     def get_children(self) -> Tuple[str, ...]:
         """Get all child item IDs."""
         return self.tree.get_children()
 
     def get_item_values(self, item_id: str) -> Tuple:
-        """Get values for an item."""
+        """Get values for an item, as originally inserted."""
+        if item_id in self._row_values:
+            return self._row_values[item_id]
         return self.tree.item(item_id)['values']
 
     def get_selection(self) -> Tuple[str, ...]:
@@ -96,6 +193,8 @@ class DataTreeView(ttk.Frame):
             tags: New tags
         """
         self.tree.item(item_id, values=values, tags=tags)
+        self._row_keys[item_id] = self._compute_keys(values)
+        self._row_values[item_id] = tuple(values)
 
     def configure_tag(self, tag: str, **kwargs) -> None:
         """
@@ -115,3 +214,12 @@ class DataTreeView(ttk.Frame):
             callback: Function to call on selection
         """
         self.tree.bind('<<TreeviewSelect>>', callback)
+
+    def bind_double_click(self, callback: Callable) -> None:
+        """
+        Bind row double-click event.
+
+        Args:
+            callback: Function to call on double-click
+        """
+        self.tree.bind('<Double-1>', callback)
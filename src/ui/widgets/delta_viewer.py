@@ -0,0 +1,75 @@
+"""Delta viewer dialog showing how balances moved since a baseline."""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+from src.services.delta_report import DeltaKind, DeltaReport
+from src.ui.widgets.data_tree import DataTreeView
+
+
+class DeltaViewer:
+    """Dialog listing changed, new and disappeared balances, large swings highlighted."""
+
+    def __init__(self, parent: tk.Tk, report: DeltaReport, on_export: Callable[[], None]):
+        """
+        Initialize delta viewer.
+
+        Args:
+            parent: Parent window
+            report: Differences to show
+            on_export: Callback for the export button
+        """
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"Changes since {report.baseline}")
+        self.dialog.geometry("900x560")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        header = ttk.Frame(main_frame)
+        header.pack(fill="x", pady=(0, 10))
+        ttk.Label(
+            header,
+            text=(
+                f"{report.changed_count} changed ({len(report.large_swings)} large swings) | "
+                f"{len(report.new_codes)} new | {len(report.disappeared_codes)} disappeared | "
+                f"{report.unchanged_count} unchanged"
+            ),
+            anchor="w"
+        ).pack(side="left", fill="x", expand=True)
+        ttk.Button(header, text="Export Report", command=on_export).pack(side="right")
+
+        self.tree = DataTreeView(
+            main_frame,
+            columns=[
+                ("code", "National Code", 120),
+                ("type", "Type", 70),
+                ("previous", "Previous", 100),
+                ("current", "Current", 100),
+                ("change", "Change", 100),
+                ("percent", "Change %", 80),
+                ("status", "Status", 100),
+            ],
+            height=18
+        )
+        self.tree.pack(fill="both", expand=True)
+        self.tree.configure_tag("swing", background="#f8d7da")
+        self.tree.configure_tag(DeltaKind.NEW, background="#d4edda")
+        self.tree.configure_tag(DeltaKind.DISAPPEARED, background="#fff3cd")
+
+        for record in report.records:
+            tags = ("swing",) if record.large_swing and record.kind == DeltaKind.CHANGED else (record.kind,)
+            self.tree.insert(
+                (
+                    record.national_code,
+                    record.extraction_type,
+                    "" if record.previous is None else record.previous,
+                    "" if record.current is None else record.current,
+                    f"{record.change:+g}",
+                    "" if record.change_percent is None else f"{record.change_percent:+.1f}",
+                    record.kind.title(),
+                ),
+                tags=tags
+            )
@@ -0,0 +1,99 @@
+"""History viewer dialog showing a code's balances and issues over past runs."""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import List
+
+from src.services.history_store import IssueRow, TrendPoint
+from src.ui.widgets.data_tree import DataTreeView
+
+
+class HistoryViewer:
+    """Dialog listing a national code's recorded balances and issue rows."""
+
+    def __init__(
+        self,
+        parent: tk.Tk,
+        national_code: str,
+        points: List[TrendPoint],
+        issues: List[IssueRow]
+    ):
+        """
+        Initialize history viewer.
+
+        Args:
+            parent: Parent window
+            national_code: Code the history belongs to
+            points: Balances per run, oldest first
+            issues: Issue rows per run, oldest first
+        """
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(f"History of {national_code}")
+        self.dialog.geometry("900x520")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(main_frame, text=self._describe(points), anchor="w").pack(fill="x", pady=(0, 10))
+
+        notebook = ttk.Notebook(main_frame)
+        notebook.pack(fill="both", expand=True)
+
+        balances_frame = ttk.Frame(notebook)
+        notebook.add(balances_frame, text="Balances")
+        self.balances_tree = DataTreeView(
+            balances_frame,
+            columns=[
+                ("run", "Run", 60),
+                ("time", "Run Time", 160),
+                ("type", "Type", 80),
+                ("balance", "Balance", 100),
+                ("change", "Change", 100),
+                ("excel", "In Excel", 80),
+            ],
+            height=12
+        )
+        self.balances_tree.pack(fill="both", expand=True)
+
+        previous = {}  # Previous balance per type
+        for point in points:
+            last = previous.get(point.extraction_type)
+            change = "" if last is None else f"{point.balance - last:+g}"
+            previous[point.extraction_type] = point.balance
+            self.balances_tree.insert((
+                point.run_id, point.run_time, point.extraction_type, point.balance, change,
+                "Yes" if point.matched else "No"
+            ))
+
+        issues_frame = ttk.Frame(notebook)
+        notebook.add(issues_frame, text=f"Issues ({len(issues)})")
+        self.issues_tree = DataTreeView(
+            issues_frame,
+            columns=[
+                ("time", "Run Time", 160),
+                ("category", "Issue", 110),
+                ("item", "Item Code", 90),
+                ("name", "Item Name", 220),
+                ("expiry", "Expiry", 90),
+                ("pdf", "PDF File", 160),
+            ],
+            height=12
+        )
+        self.issues_tree.pack(fill="both", expand=True)
+        for issue in issues:
+            self.issues_tree.insert((
+                issue.run_time, issue.category.replace("_", " ").title(), issue.item_code or "",
+                issue.name or "", issue.expiry_date or "", issue.pdf_filename or ""
+            ))
+
+    @staticmethod
+    def _describe(points: List[TrendPoint]) -> str:
+        """One-line summary of the balance trend."""
+        if not points:
+            return "No recorded balances."
+        first, last = points[0], points[-1]
+        return (
+            f"{len({point.run_id for point in points})} run(s) from {first.run_time} to {last.run_time}; "
+            f"latest balance {last.balance:g}"
+        )
@@ -2,12 +2,19 @@
 
 import tkinter as tk
 from tkinter import ttk
+from typing import Callable, Optional
 
 
 class LoadingDialog:
     """Modern modal loading dialog with progress bar."""
 
-    def __init__(self, parent: tk.Tk, title: str = "Loading...", message: str = "Please wait..."):
+    def __init__(
+        self,
+        parent: tk.Tk,
+        title: str = "Loading...",
+        message: str = "Please wait...",
+        on_cancel: Optional[Callable[[], None]] = None
+    ):
         """
         Initialize loading dialog.
 
@@ -15,7 +22,9 @@ class LoadingDialog:
             parent: Parent window
             title: Dialog title
             message: Message to display
+            on_cancel: Optional callback; when given, a Cancel button is shown
         """
+        self.on_cancel = on_cancel
         self.dialog = tk.Toplevel(parent)
         self.dialog.title(title)
 
@@ -23,7 +32,7 @@ class LoadingDialog:
         self.dialog.overrideredirect(False)
 
         # Set size
-        width, height = 400, 150
+        width, height = 400, 190 if on_cancel else 150
         self.dialog.geometry(f"{width}x{height}")
         self.dialog.resizable(False, False)
         self.dialog.transient(parent)
@@ -64,6 +73,16 @@ class LoadingDialog:
         self.progressbar.pack()
         self.progressbar.start(10)
 
+        # Cancel button (also bound to the window close button)
+        if on_cancel:
+            self.cancel_button = ttk.Button(
+                main_frame,
+                text="Cancel",
+                command=self._cancel,
+            )
+            self.cancel_button.pack(pady=(15, 0))
+            self.dialog.protocol("WM_DELETE_WINDOW", self._cancel)
+
         # Force the window to display
         self.dialog.update_idletasks()
         self.dialog.update()
@@ -84,6 +103,16 @@ class LoadingDialog:
             # Dialog was already closed, ignore the error
             pass
 
+    def _cancel(self) -> None:
+        """Request cancellation; the dialog stays open until the job stops."""
+        try:
+            self.cancel_button.config(state="disabled")
+            self.message_label.config(text="Cancelling...")
+        except tk.TclError:
+            pass
+        if self.on_cancel:
+            self.on_cancel()
+
     def close(self) -> None:
         """Close the loading dialog."""
         try:
@@ -0,0 +1,85 @@
+"""Save preview dialog listing the target cells a save would change."""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable
+
+from src.models.save_preview import CellStatus, SavePreview
+from src.ui.widgets.data_tree import DataTreeView
+
+
+class SavePreviewDialog:
+    """Dialog comparing target cells with the balances about to be written."""
+
+    def __init__(self, parent: tk.Tk, preview: SavePreview, on_confirm: Callable[[], None]):
+        """
+        Initialize save preview dialog.
+
+        Args:
+            parent: Parent window
+            preview: Target cells of the save
+            on_confirm: Called when the user confirms the save
+        """
+        self.on_confirm = on_confirm
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Save Preview")
+        self.dialog.geometry("900x560")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(
+            main_frame,
+            text=(
+                f"{len(preview.changed)} changed | {len(preview.new)} new | "
+                f"{len(preview.unchanged)} unchanged (skipped)"
+            ),
+            anchor="w"
+        ).pack(fill="x", pady=(0, 10))
+
+        self.tree = DataTreeView(
+            main_frame,
+            columns=[
+                ("code", "National Code", 120),
+                ("type", "Type", 70),
+                ("row", "Row", 70),
+                ("current", "Current Value", 120),
+                ("new", "New Value", 120),
+                ("status", "Status", 100),
+            ],
+            height=18
+        )
+        self.tree.pack(fill="both", expand=True)
+        self.tree.configure_tag(CellStatus.CHANGED, background="#fff3cd")
+        self.tree.configure_tag(CellStatus.NEW, background="#d4edda")
+        self.tree.configure_tag(CellStatus.UNCHANGED, foreground="#6c757d")
+
+        # Cells that will be written first, skipped cells last
+        for cell in preview.writes + preview.unchanged:
+            self.tree.insert(
+                (
+                    cell.national_code,
+                    cell.extraction_type,
+                    cell.row,
+                    "" if cell.previous is None else cell.previous,
+                    cell.value,
+                    cell.status.title(),
+                ),
+                tags=(cell.status,)
+            )
+
+        buttons = ttk.Frame(main_frame)
+        buttons.pack(fill="x", pady=(10, 0))
+        ttk.Button(buttons, text="Cancel", command=self.dialog.destroy).pack(side="right")
+        ttk.Button(
+            buttons,
+            text=f"Save {len(preview.writes)} Cell(s)",
+            command=self._confirm
+        ).pack(side="right", padx=(0, 5))
+
+    def _confirm(self) -> None:
+        """Close the dialog and start the save."""
+        self.dialog.destroy()
+        self.on_confirm()
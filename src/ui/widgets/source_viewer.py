@@ -0,0 +1,99 @@
+"""Source viewer dialog showing the PDF region a record came from."""
+
+import logging
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List
+
+from PIL import Image, ImageTk
+
+from src.models.source_index import SourceEntry
+
+
+class SourceViewer:
+    """Dialog listing a record's source locations and rendering the selected one."""
+
+    def __init__(
+        self,
+        parent: tk.Tk,
+        title: str,
+        entries: List[SourceEntry],
+        render: Callable[[SourceEntry], Image.Image]
+    ):
+        """
+        Initialize source viewer.
+
+        Args:
+            parent: Parent window
+            title: Dialog title (e.g. the national code)
+            entries: Source locations to choose from (at least one)
+            render: Renders an entry to a PIL image
+        """
+        self.entries = entries
+        self.render = render
+        self._photo = None  # Keep a reference so Tk does not drop the image
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.geometry("1000x420")
+        self.dialog.transient(parent)
+
+        main_frame = ttk.Frame(self.dialog, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Location chooser
+        chooser_frame = ttk.Frame(main_frame)
+        chooser_frame.pack(fill="x", pady=(0, 10))
+        ttk.Label(chooser_frame, text="Source:").pack(side="left", padx=(0, 5))
+
+        self.location_choice = ttk.Combobox(
+            chooser_frame,
+            values=[self._describe(entry) for entry in entries],
+            state="readonly",
+            width=80
+        )
+        self.location_choice.pack(side="left", fill="x", expand=True)
+        self.location_choice.bind("<<ComboboxSelected>>", lambda event: self._show(self.location_choice.current()))
+
+        # Rendered region (scrollable)
+        canvas_frame = ttk.Frame(main_frame)
+        canvas_frame.pack(fill="both", expand=True)
+        self.canvas = tk.Canvas(canvas_frame, background="white", highlightthickness=0)
+        x_scroll = ttk.Scrollbar(canvas_frame, orient="horizontal", command=self.canvas.xview)
+        y_scroll = ttk.Scrollbar(canvas_frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        y_scroll.pack(side="right", fill="y")
+        x_scroll.pack(side="bottom", fill="x")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.status_label = ttk.Label(main_frame, text="", anchor="w")
+        self.status_label.pack(fill="x", pady=(5, 0))
+
+        self.location_choice.current(0)
+        self._show(0)
+
+    @staticmethod
+    def _describe(entry: SourceEntry) -> str:
+        """Human-readable description of a source location."""
+        location = entry.location
+        return (
+            f"{entry.pdf_filename} - page {location.page}, table {location.table}, "
+            f"row {location.row} (item {entry.item_code})"
+        )
+
+    def _show(self, index: int) -> None:
+        """Render and display one entry."""
+        entry = self.entries[index]
+        try:
+            image = self.render(entry)
+        except Exception as e:
+            logging.error(f"Failed to render source {self._describe(entry)}: {e}")
+            self.canvas.delete("all")
+            self.status_label.config(text=f"Could not render source: {e}")
+            return
+
+        self._photo = ImageTk.PhotoImage(image)
+        self.canvas.delete("all")
+        self.canvas.create_image(0, 0, image=self._photo, anchor="nw")
+        self.canvas.configure(scrollregion=(0, 0, image.width, image.height))
+        self.status_label.config(text=self._describe(entry))
@@ -3,6 +3,7 @@
 from .text_cleaner import fix_doubled_chars, clean_text
 from .date_utils import parse_expiry_date, is_expired
 from .regex_patterns import CODE_PATTERN, DATE_PATTERN
+from .sort_keys import natural_key, numeric_key, date_key
 
 __all__ = [
     'fix_doubled_chars',
@@ -11,4 +12,7 @@ __all__ = [
     'is_expired',
     'CODE_PATTERN',
     'DATE_PATTERN',
+    'natural_key',
+    'numeric_key',
+    'date_key',
 ]
@@ -0,0 +1,22 @@
+"""Cooperative cancellation helpers for long-running background operations."""
+
+import threading
+from typing import Optional
+
+
+class OperationCancelled(Exception):
+    """Raised inside a worker when the user cancels the running operation."""
+
+
+def raise_if_cancelled(cancel_event: Optional[threading.Event]) -> None:
+    """
+    Abort the current operation if cancellation was requested.
+
+    Args:
+        cancel_event: Event set by the UI when the user cancels (may be None)
+
+    Raises:
+        OperationCancelled: If the event is set
+    """
+    if cancel_event is not None and cancel_event.is_set():
+        raise OperationCancelled()
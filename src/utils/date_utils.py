@@ -1,6 +1,6 @@
 """Date parsing and validation utilities."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, Tuple
 import re
 from src.utils.regex_patterns import DATE_PATTERN
@@ -34,19 +34,22 @@ def parse_expiry_date(text: str) -> Optional[Tuple[int, int, int]]:
         return None
 
 
-def is_expired(day: int, month: int, year: int) -> bool:
+def is_expired(day: int, month: int, year: int, reference: Optional[date] = None) -> bool:
     """
     Check if a date is expired (before current month).
 
+    For many dates, use ExpiryPolicy, which fixes the reference date once.
+
     Args:
         day: Day of the month
         month: Month (1-12)
         year: Year (4 digits)
+        reference: Date to compare against (defaults to today)
 
     Returns:
         True if the date is expired, False otherwise
     """
-    now = datetime.now()
+    now = reference or datetime.now()
     return year < now.year or (year == now.year and month < now.month)
 
 
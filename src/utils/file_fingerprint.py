@@ -0,0 +1,50 @@
+"""File identity checks: cheap stat fields, with a content hash as the fallback."""
+
+import hashlib
+import os
+from dataclasses import dataclass
+
+
+@dataclass
+class FileFingerprint:
+    """Identity of a file on disk: cheap stat fields plus a content hash."""
+    size: int
+    mtime_ns: int
+    sha256: str
+
+    def matches_stat(self, stat: os.stat_result) -> bool:
+        """Check whether size and modification time are unchanged."""
+        return self.size == stat.st_size and self.mtime_ns == stat.st_mtime_ns
+
+    def matches_file(self, file_path: str) -> bool:
+        """
+        Check whether a file still has this content.
+
+        The stat fields decide when they match; otherwise (e.g. the file was
+        copied or touched) the content hash does.
+
+        Args:
+            file_path: File to check
+
+        Returns:
+            True if the file is unchanged
+        """
+        return self.matches_stat(os.stat(file_path)) or hash_file(file_path) == self.sha256
+
+
+def hash_file(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file.
+
+    Args:
+        file_path: File to hash
+        chunk_size: Read size in bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
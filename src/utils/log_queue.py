@@ -0,0 +1,122 @@
+"""Queue-backed logging: callers enqueue records, a background thread formats and writes them."""
+
+import atexit
+import copy
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves message formatting to the listener thread.
+
+    The standard QueueHandler merges the message and its arguments before
+    enqueueing, which puts the cost of formatting back on the logging
+    thread. Here only exception tracebacks (which reference live frames) are
+    rendered up front; msg and args travel as-is. Arguments must therefore
+    not be mutated after logging - the extraction code logs strings, numbers
+    and table rows it does not modify.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Copy the record, rendering only its traceback."""
+        record = copy.copy(record)
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# Listener of the active queue, stopped (and drained) at exit, and its root handler
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DeferredQueueHandler] = None
+# Listener writing the records of child processes (see process_log_queue)
+_process_listener: Optional[QueueListener] = None
+
+
+def start_queue_logging(handlers: List[logging.Handler], level: int) -> None:
+    """
+    Route the root logger through a queue to handlers run on a background thread.
+
+    Does nothing if queue logging is already active (like basicConfig).
+
+    Args:
+        handlers: Handlers that format and write records (file, console)
+        level: Root logger level
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+
+    _queue_handler = DeferredQueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+
+def process_log_queue(context: Any) -> Optional[Any]:
+    """
+    Queue through which child processes log to this process's handlers.
+
+    Child processes do not inherit the listener thread: forked children
+    would fill their copy of the queue forever and spawned ones have no
+    handlers at all. Pass the returned queue to configure_worker_logging()
+    in each child; a second listener here writes what they send.
+
+    Args:
+        context: multiprocessing context the children are started with
+
+    Returns:
+        multiprocessing queue, or None if queue logging is not active
+    """
+    global _process_listener
+    if _listener is None:
+        return None
+    if _process_listener is None:
+        _process_listener = QueueListener(context.Queue(), *_listener.handlers, respect_handler_level=True)
+        _process_listener.start()
+    return _process_listener.queue
+
+
+def configure_worker_logging(log_queue: Optional[Any], levels: Dict[str, int]) -> None:
+    """
+    Route a child process's logging to its parent (call first thing in the child).
+
+    Handlers inherited from the parent are removed. Records are merged with
+    their arguments before they are sent, so they pickle safely.
+
+    Args:
+        log_queue: Queue from process_log_queue(), or None to discard records
+        levels: Logger name ("" for root) -> level, as set in the parent
+    """
+    global _listener, _queue_handler, _process_listener
+    # Listeners belong to the parent; a forked child must not stop or feed them
+    _listener = _queue_handler = _process_listener = None
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue) if log_queue is not None else logging.NullHandler())
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def stop_queue_logging() -> None:
+    """Write the queued records and stop the listener threads."""
+    global _listener, _queue_handler, _process_listener
+    if _process_listener is not None:
+        _process_listener.stop()
+        _process_listener = None
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
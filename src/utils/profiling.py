@@ -0,0 +1,237 @@
+"""Opt-in profiling mode: per-stage cProfile statistics and tracemalloc allocation reports."""
+
+import atexit
+import cProfile
+import logging
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Frames of allocation statistics (deepest frame only, grouped by line)
+_TRACE_FRAMES = 1
+# Lines listed per stage and in the final summary
+_TOP_ALLOCATIONS = 15
+_TOP_FUNCTIONS = 40
+
+# The profiler's own allocations are left out of the reports
+_IGNORED_TRACES = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    """Snapshot of traced memory without the profiler's own allocations."""
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED_TRACES)
+
+
+class _StageReport:
+    """Accumulated profile and memory figures of one stage."""
+
+    def __init__(self):
+        self.calls = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.peak_bytes = 0  # Largest rise of traced memory during one call
+        self.allocations: List[tracemalloc.StatisticDiff] = []  # Of the first call
+
+
+class ProfileSession:
+    """
+    Collects cProfile statistics and memory figures of the stages run while active.
+
+    Stages are profiled on the thread that runs them; a stage started while
+    another is active on the same thread is counted in the outer one. The
+    tracemalloc peak is process-wide, so stages running concurrently on other
+    threads add to each other's peaks. Snapshots are costly, so allocation
+    differences are kept for the first call of each stage only.
+    """
+
+    def __init__(self, output_dir: str):
+        """
+        Start a session.
+
+        Args:
+            output_dir: Directory the reports are written to
+        """
+        self.output_dir = output_dir
+        self.started = datetime.now()
+        self._reports: Dict[str, _StageReport] = {}
+        self._lock = threading.Lock()
+        self._active = threading.local()
+        self._started_tracemalloc = not tracemalloc.is_tracing()
+        if self._started_tracemalloc:
+            tracemalloc.start(_TRACE_FRAMES)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Profile a block as one call of a stage.
+
+        Args:
+            name: Stage name (pstats file name)
+        """
+        if getattr(self._active, "stage", None) is not None:
+            yield
+            return
+
+        with self._lock:
+            report = self._reports.setdefault(name, _StageReport())
+            first_call = report.calls == 0
+            report.calls += 1
+        before = _take_snapshot() if first_call and tracemalloc.is_tracing() else None
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (e.g. a debugger); time the stage unprofiled
+            profile = None
+        self._active.stage = name
+        try:
+            yield
+        finally:
+            self._active.stage = None
+            if profile is not None:
+                profile.disable()
+            peak_bytes = tracemalloc.get_traced_memory()[1] - start_bytes
+            allocations = (
+                _take_snapshot().compare_to(before, "lineno")[:_TOP_ALLOCATIONS]
+                if before is not None and tracemalloc.is_tracing() else None
+            )
+            with self._lock:
+                report.peak_bytes = max(report.peak_bytes, peak_bytes)
+                if allocations is not None:
+                    report.allocations = allocations
+                if profile is not None:
+                    if report.stats is None:
+                        report.stats = pstats.Stats(profile)
+                    else:
+                        report.stats.add(profile)
+
+    def write_reports(self) -> str:
+        """
+        Write a pstats file and a text summary per stage, plus the allocation summary.
+
+        Returns:
+            Directory the reports were written to
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._lock:
+            reports = dict(self._reports)
+
+        lines = [f"Profile from {self.started:%Y-%m-%d %H:%M:%S} to {datetime.now():%Y-%m-%d %H:%M:%S}", ""]
+        for name, report in sorted(reports.items()):
+            if report.stats is not None:
+                report.stats.dump_stats(os.path.join(self.output_dir, f"{name}.pstats"))
+                with open(os.path.join(self.output_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+                    stats = pstats.Stats(os.path.join(self.output_dir, f"{name}.pstats"), stream=f)
+                    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(_TOP_FUNCTIONS)
+
+            lines.append(f"== {name}: {report.calls} call(s), peak +{report.peak_bytes / 1024 / 1024:.1f} MiB")
+            if report.allocations:
+                lines.append("   Allocation growth during the first call:")
+                lines.extend(f"   {statistic}" for statistic in report.allocations)
+            lines.append("")
+
+        lines.append("== Largest live allocations now:")
+        if tracemalloc.is_tracing():
+            statistics = _take_snapshot().statistics("lineno")[:_TOP_ALLOCATIONS]
+            lines.extend(f"   {statistic}" for statistic in statistics)
+
+        with open(os.path.join(self.output_dir, "allocations.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return self.output_dir
+
+    def close(self) -> str:
+        """
+        Write the reports and stop tracing.
+
+        Returns:
+            Directory the reports were written to
+        """
+        output_dir = self.write_reports()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return output_dir
+
+
+# Active session, if profiling mode is on
+_session: Optional[ProfileSession] = None
+
+
+def default_profile_dir(log_file: str) -> str:
+    """
+    Directory for a new profile, next to the log file.
+
+    Args:
+        log_file: Path of the log file
+
+    Returns:
+        Timestamped directory under "profiles" beside the log
+    """
+    log_dir = os.path.dirname(os.path.abspath(log_file))
+    return os.path.join(log_dir, "profiles", f"profile_{datetime.now():%Y%m%d_%H%M%S}")
+
+
+def start_profiling(output_dir: str) -> None:
+    """
+    Turn profiling mode on; reports are written by stop_profiling() or at exit.
+
+    Args:
+        output_dir: Directory for the reports
+    """
+    global _session
+    if _session is not None:
+        return
+    _session = ProfileSession(output_dir)
+    atexit.register(stop_profiling)
+    logging.info(f"Profiling on; reports will be written to {output_dir}")
+
+
+def stop_profiling() -> Optional[str]:
+    """
+    Turn profiling mode off and write the reports.
+
+    Returns:
+        Directory the reports were written to, or None if profiling was off
+    """
+    global _session
+    session, _session = _session, None
+    if session is None:
+        return None
+    atexit.unregister(stop_profiling)
+    output_dir = session.close()
+    logging.info(f"Profile written to {output_dir}")
+    return output_dir
+
+
+def is_profiling() -> bool:
+    """Whether profiling mode is on."""
+    return _session is not None
+
+
+@contextmanager
+def profiled(stage: str) -> Iterator[None]:
+    """
+    Profile a block (or, as a decorator, a function) when profiling mode is on.
+
+    Nearly free when profiling is off.
+
+    Args:
+        stage: Stage name
+    """
+    session = _session
+    if session is None:
+        yield
+        return
+    with session.stage(stage):
+        yield
@@ -0,0 +1,60 @@
+"""Typed sort keys for table columns."""
+
+import re
+from typing import Any, Tuple
+
+from src.utils.date_utils import parse_expiry_date
+
+_DIGIT_RUNS = re.compile(r'(\d+)')
+
+
+def natural_key(value: Any) -> Tuple:
+    """
+    Build a natural-order key so that embedded numbers sort numerically.
+
+    Example: "02-C00-9" sorts before "02-C00-10".
+
+    Args:
+        value: Cell value (converted to string)
+
+    Returns:
+        Tuple alternating lower-cased text and integer parts
+    """
+    text = "" if value is None else str(value)
+    parts = _DIGIT_RUNS.split(text)
+    return tuple(int(part) if i % 2 else part.lower() for i, part in enumerate(parts))
+
+
+def numeric_key(value: Any) -> Tuple[int, float]:
+    """
+    Build a numeric key; blank or non-numeric values sort after numbers.
+
+    Args:
+        value: Cell value (number or numeric string, commas allowed)
+
+    Returns:
+        (0, number) for numeric values, (1, 0.0) otherwise
+    """
+    if isinstance(value, (int, float)):
+        return (0, float(value))
+    try:
+        return (0, float(str(value).replace(',', '').strip()))
+    except (TypeError, ValueError):
+        return (1, 0.0)
+
+
+def date_key(value: Any) -> Tuple[int, Tuple[int, int, int]]:
+    """
+    Build a chronological key from a DD/MM/YYYY string.
+
+    Args:
+        value: Cell value containing a date
+
+    Returns:
+        (0, (year, month, day)) for parseable dates, (1, (0, 0, 0)) otherwise
+    """
+    date_parts = parse_expiry_date("" if value is None else str(value))
+    if not date_parts:
+        return (1, (0, 0, 0))
+    day, month, year = date_parts
+    return (0, (year, month, day))
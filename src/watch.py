@@ -0,0 +1,127 @@
+"""
+Headless watch mode.
+
+Watches a folder for PDF reports and, after each burst of arrivals, writes
+an updated master workbook (when any balance changed), saves the run so the GUI can reopen it and
+records it in the balance history.
+
+Usage:
+    From project root: python -m src.watch FOLDER [--excel PATH] [--type Auto|Stock|Free|Buy] [--report JSON] [--verbose] [--profile]
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Ensure src directory is in the path
+src_dir = Path(__file__).parent
+if str(src_dir.parent) not in sys.path:
+    sys.path.insert(0, str(src_dir.parent))
+
+from src.config.extraction_config import AUTO_DETECT, ExtractionType
+from src.config.settings import AppSettings, LoggingConfig
+from src.services.data_validator import IncrementalValidator
+from src.services.delta_report import TypedBalances
+from src.services.excel_handler import ExcelHandler
+from src.services.folder_watcher import FolderWatcher
+from src.services.history_store import HistoryStore
+from src.services.layout_detector import LayoutDetector
+from src.models.save_preview import SavePreview
+from src.services.master_index_cache import MasterIndexCache
+from src.services.run_snapshot import RunSnapshot, SnapshotStore
+from src.services.settings_manager import SettingsManager
+from src.utils.profiling import default_profile_dir, start_profiling
+from src.utils.run_metrics import Stage
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Parse arguments and watch until interrupted."""
+    parser = argparse.ArgumentParser(description="Extract PDF reports as they arrive in a folder.")
+    parser.add_argument("folder", help="Folder to watch for PDF files")
+    parser.add_argument("--excel", help="Master workbook (defaults to the one saved in settings.json)")
+    parser.add_argument(
+        "--type",
+        default=AUTO_DETECT,
+        choices=[AUTO_DETECT] + [extraction_type.value for extraction_type in ExtractionType],
+        help="Report type, or Auto to detect the type of each PDF (default: Auto)"
+    )
+    parser.add_argument("--report", help="Write each update's run report (stage timings and counters) as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Log debug details of every row")
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Profile extraction and Excel stages; reports are written next to the log on exit"
+    )
+    args = parser.parse_args(argv)
+
+    logging_config = LoggingConfig(level=logging.DEBUG if args.verbose else logging.INFO, console=True)
+    logging_config.configure()
+    if args.profile:
+        start_profiling(default_profile_dir(logging_config.filename))
+
+    excel_file = args.excel or SettingsManager.load_settings().get("excel_file_path")
+    if not excel_file:
+        parser.error("no master workbook given and none saved in settings.json")
+
+    settings = AppSettings()
+    auto_detect = args.type == AUTO_DETECT
+    run_type = ExtractionType.STOCK if auto_detect else ExtractionType(args.type)
+    snapshot_store = SnapshotStore(settings.CACHE_DIR)
+    history_store = HistoryStore(settings.HISTORY_FILE)
+    master_index_cache = MasterIndexCache(settings.CACHE_DIR)
+
+    # Master content and balances of the last write; a PDF that is touched or
+    # rewritten with the same balances must not produce another workbook
+    last_written: Optional[Tuple[Optional[str], TypedBalances]] = None
+
+    def write_output(validator: IncrementalValidator) -> None:
+        nonlocal last_written
+        snapshot = RunSnapshot(watcher.pdf_files, excel_file, run_type, validator)
+        snapshot_store.save_run(snapshot)
+
+        balances = validator.balances_by_type(run_type)
+        index = master_index_cache.get(excel_file)
+        written = (index.fingerprint.sha256 if index.fingerprint else None, balances)
+        if written == last_written:
+            logging.info(f"Balances unchanged since the last write; nothing written ({len(watcher.pdf_files)} PDF(s))")
+            return
+
+        # Only cells whose value changed are written; no file when nothing did
+        with watcher.metrics.stage(Stage.SAVE):
+            preview = SavePreview.build(index, balances)
+            output_file = ExcelHandler(excel_file).save_changes(preview)
+        last_written = written
+        run_id = history_store.record_run(snapshot, watcher.metrics, balances)
+        result = validator.result
+        logging.info(
+            f"{'Wrote ' + output_file if output_file else 'Excel up to date'}: "
+            f"{result.matched_count} matched, {result.unmatched_count} not in Excel, "
+            f"{len(watcher.pdf_files)} PDF(s)"
+        )
+        logging.info(f"Run {run_id}: {watcher.metrics.summary()}")
+        if args.report:
+            report = {"run_id": run_id, "run_time": snapshot.created.isoformat(timespec="seconds")}
+            report.update(watcher.metrics.to_dict())
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    watcher = FolderWatcher(
+        args.folder,
+        excel_file,
+        run_type,
+        master_index_cache,
+        snapshot_store=snapshot_store,
+        layout_detector=LayoutDetector(settings.CACHE_DIR) if auto_detect else None,
+        on_update=write_output
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        logging.info("Watch stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())